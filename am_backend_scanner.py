@@ -8,7 +8,8 @@ from datetime import time as dt_time
 import pandas as pd
 import numpy as np
 import threading
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from datetime import datetime, timedelta
 from dotenv import load_dotenv
 import yfinance as yf
 import schedule
@@ -23,9 +24,13 @@ if sys.stdout.encoding.lower() != 'utf-8':
 
 from utils.logger import setup_logger
 from services.upstox_engine import get_upstox_engine
+from services.chain_service import get_chain_service
 from config.config import OPTION_CHAIN_CONFIG, INDEX_WEIGHTS, NIFTY_50, BANKNIFTY, SENSEX, FINNIFTY
 from services.market_engine import get_expiry_details, get_mtf_confluence, calculate_indicators
 from services.upstox_streamer import get_streamer, get_live_ltp, update_live_ltp
+from services.event_scheduler import get_scan_scheduler
+from services.work_queue import get_work_queue, TaskClass, MAX_WORKERS
+from services.daily_features import get_daily_features
 from config.extended_stocks import EXTENDED_STOCKS_LIST
 from utils.cache_manager import ScanCacheManager
 
@@ -51,6 +56,14 @@ INDICES = SCAN_INDICES
 # CACHING (Optimization for Institutional Build)
 MTF_CACHE = {}
 MTF_CACHE_TTL = 300 
+MTF_BUDGET = 3.0        # Seconds a timeframe fetch may run (clock starts when it leaves the queue)
+MTF_QUEUE_WAIT = 2.0    # Extra seconds a symbol waits for queued fetches to get a thread
+MTF_TF_CACHE = {}       # (symbol, label) -> (tf score, ts), filled as fetches land
+MTF_INFLIGHT = {}       # (symbol, label) -> future still running past its budget (one per key)
+MTF_STARTED = {}        # (symbol, label) -> ts the in-flight fetch actually started
+MTF_TIMEFRAMES = 3
+MTF_POOL = ThreadPoolExecutor(max_workers=MAX_WORKERS * MTF_TIMEFRAMES, thread_name_prefix="mtf-fetch")  # every queue worker x TF
+MTF_LOCK = threading.Lock()
 OPTION_LTP_CACHE = {} 
 OPTION_LTP_TTL = 180 
 CANDLE_CACHE = {} 
@@ -87,7 +100,6 @@ VIX_VALUE = 15
 VIX_REGIME = "NORMAL_VOL"
 VIX_CHANGE_PCT = 0
 OI_STRUCTURE_MAP = {}
-PREV_OI_MAP = {} # To track OI changes
 LAST_SECTOR_SYNC = 0
 LAST_FII_SYNC = 0
 LAST_OI_SYNC = 0
@@ -412,7 +424,10 @@ def send_trade_alert(signal, is_update=False):
     
     adx_val = signal.get('adx', 25)
     est_time = estimate_target_time(adx_val=adx_val, is_scalp="SCALP" in signal.get('tag', ''))
+    if signal.get('target_minutes'):
+        est_time = (datetime.now() + timedelta(minutes=signal['target_minutes'])).strftime("%I:%M %p")
     score = signal.get('confidence_score', signal.get('score', 8.5))
+    hit_line = f"🎲 **P(TARGET BEFORE SL)**: `{signal['hit_prob']}%`\n" if signal.get('hit_prob') is not None else ""
     
     msg = (
         f"📈 **F&O ALERT - {fname} {signal['type']} {signal['strike']}**\n"
@@ -427,6 +442,7 @@ def send_trade_alert(signal, is_update=False):
         f"💎 **CONFIDENCE**: `{score}/10` 🔥\n"
         f"🚀 **TARGET**: `₹{target_px:.2f} LTP`\n"
         f"🕒 **EST. TIME**: `{est_time}`\n"
+        f"{hit_line}"
         f"━━━━━━━━━━━━━━━━━━━━━\n"
         f"✅ **SIGNAL**: `BUY {signal['type']} - High Probability`\n"
         f"⚖️ **MTF STATUS**: `{mtf_str}`\n"
@@ -533,9 +549,52 @@ def calculate_tf_score(df):
     
     return {"score": score, "trend": trend, "rsi": rsi, "adx": adx, "vol": vol_ratio}
 
-def get_mtf_signals(engine, symbol, key):
-    """🎯 Multi-Timeframe Institutional Scoring Architecture"""
-    from services.market_engine import calculate_indicators
+def _fetch_tf_candles(engine, symbol, key, label, interval):
+    """Upstox intraday -> Upstox historical -> yfinance fallback chain for one timeframe"""
+    df = engine.get_intraday_candles(key, interval=interval)
+    # If intraday is empty or insufficient for indicators (need ~50)
+    if df.empty or len(df) < 50:
+        res_days = 20 if interval == "60minute" else 10
+        df = engine.get_historical_candles(key, interval=interval, days=res_days)
+
+    # --- 🚀 TIER 2 FALLBACK: yfinance ---
+    if df.empty or len(df) < 20:
+        yf_interval = "5m" if label == "5m" else "15m" if label == "15m" else "60m"
+        logger.debug(f"🔄 Upstox candle weak for {symbol}. Trying yf fallback for {label}...")
+        df = yf.download(f"{symbol}.NS", period="5d", interval=yf_interval, progress=False, threads=False)
+        if not df.empty:
+            from services.market_engine import flatten_columns
+            df = flatten_columns(df)
+            df.columns = [c.lower() for c in df.columns]
+    return df
+
+def _score_tf(engine, symbol, key, label, interval):
+    """Fetch + score one timeframe; None on a data gap. Runs on MTF_POOL."""
+    from services.market_engine import compute_indicators
+    with MTF_LOCK:
+        MTF_STARTED[(symbol, label)] = time.time()
+    df = _fetch_tf_candles(engine, symbol, key, label, interval)
+    if df.empty or len(df) < 5:
+        return None
+    # Only RSI/ADX/VolRatio are scored - compute just that preset (renames to Title Case)
+    indicators = compute_indicators(df, "tf_score", instrument=key, timeframe=label)
+    # compute_indicators returns input df if too short, so we check for indicator column
+    if 'RSI' not in indicators.columns:
+        logger.warning(f"⚠️ Indicators (RSI) missing for {symbol} {label}")
+    score = calculate_tf_score(indicators)
+    with MTF_LOCK:
+        MTF_TF_CACHE[(symbol, label)] = (score, time.time())
+    return score
+
+def get_mtf_signals(engine, symbol, key, budget=MTF_BUDGET):
+    """
+    🎯 Multi-Timeframe Institutional Scoring Architecture
+    5m / 15m / 1h are fetched concurrently; each fetch gets `budget` seconds from the
+    moment it starts running (time spent queued for a thread is not charged to it, but
+    is capped at MTF_QUEUE_WAIT). A timeframe still loading keeps running in the
+    background (the next call picks it up) and is served from its last score, or
+    neutral, with status "partial". Returns None only on a real data gap.
+    """
     current_time = time.time()
     
     if symbol in MTF_CACHE:
@@ -544,55 +603,82 @@ def get_mtf_signals(engine, symbol, key):
             return cache_data
 
     try:
-        # 1. Fetch TFs with Historical Fallback (Essential for Off-Market testing)
-        intervals = {"5m": "5minute", "15m": "15minute", "60m": "60minute"}
-        dfs = {}
-        
-        for label, interval in intervals.items():
-            df = engine.get_intraday_candles(key, interval=interval)
-            # If intraday is empty or insufficient for indicators (need ~50)
-            if df.empty or len(df) < 50:
-                res_days = 20 if interval == "60minute" else 10
-                df = engine.get_historical_candles(key, interval=interval, days=res_days)
-            
-            # --- 🚀 TIER 2 FALLBACK: yfinance ---
-            if df.empty or len(df) < 20:
-                import yfinance as yf
-                yf_interval = "5m" if label == "5m" else "15m" if label == "15m" else "60m"
-                yf_ticker = f"{symbol}.NS"
-                logger.debug(f"🔄 Upstox candle weak for {symbol}. Trying yf fallback for {label}...")
-                df = yf.download(yf_ticker, period="5d", interval=yf_interval, progress=False, threads=False)
-                if not df.empty:
-                    from services.market_engine import flatten_columns
-                    df = flatten_columns(df)
-                    df.columns = [c.lower() for c in df.columns]
-            
-            dfs[label] = df
-            
+        intervals = {"5m": "5minute", "15m": "15minute", "1h": "60minute"}
+        scores, futures = {}, {}
+        with MTF_LOCK:
+            for label, interval in intervals.items():
+                cached = MTF_TF_CACHE.get((symbol, label))
+                if cached and current_time - cached[1] < MTF_CACHE_TTL:
+                    scores[label] = cached[0]
+                    continue
+                fut = MTF_INFLIGHT.get((symbol, label))
+                if fut is None or fut.done():
+                    MTF_STARTED.pop((symbol, label), None)
+                    fut = MTF_POOL.submit(_score_tf, engine, symbol, key, label, interval)
+                    MTF_INFLIGHT[(symbol, label)] = fut
+                futures[label] = fut
+
+        hard_stop = current_time + budget + MTF_QUEUE_WAIT
+        while True:
+            pending = [label for label, fut in futures.items() if not fut.done()]
+            now = time.time()
+            if not pending or now >= hard_stop:
+                break
+            with MTF_LOCK:
+                starts = [MTF_STARTED.get((symbol, label)) for label in pending]
+            remaining = [t + budget - now for t in starts if t is not None and t + budget > now]
+            if not remaining and None not in starts:
+                break  # everything left has run past its own budget
+            timeout = min(remaining + [hard_stop - now])
+            if None in starts:
+                timeout = min(timeout, 0.05)  # poll for queued fetches getting a thread
+            wait([futures[label] for label in pending], timeout=timeout, return_when=FIRST_COMPLETED)
+
+        gaps, late, queued = [], [], []
+        for label, fut in futures.items():
+            if not fut.done():
+                with MTF_LOCK:
+                    started = (symbol, label) in MTF_STARTED
+                (late if started else queued).append(label)
+                continue
+            with MTF_LOCK:
+                if MTF_INFLIGHT.get((symbol, label)) is fut:
+                    del MTF_INFLIGHT[(symbol, label)]
+                    MTF_STARTED.pop((symbol, label), None)
+            try:
+                score = fut.result()
+            except Exception as e:
+                logger.error(f"❌ MTF {label} fetch failed for {symbol}: {e}")
+                score = None
+            if score is None: gaps.append(label)
+            else: scores[label] = score
+
         # Verify all TFs have data
-        missing = [lbl for lbl, df in dfs.items() if df.empty or len(df) < 5]
-        if missing:
-            logger.warning(f"⚠️ MTF Data Gap for {symbol}: {missing}")
+        if gaps:
+            logger.warning(f"⚠️ MTF Data Gap for {symbol}: {gaps}")
+            return None
+        if len(late) + len(queued) == len(intervals):
+            logger.warning(f"⏱ MTF fetch for {symbol} produced no timeframe in time (late {late}, queued {queued})")
             return None
 
-        # 2. Score All TFs
-        # Ensure indicators are calculated - calculate_indicators renames to Title Case
-        indicators_5m = calculate_indicators(dfs["5m"])
-        indicators_15m = calculate_indicators(dfs["15m"])
-        indicators_60m = calculate_indicators(dfs["60m"])
-        
-        # calculate_indicators returns input df if too short, so we check for indicator column
-        if 'RSI' not in indicators_5m.columns:
-            logger.warning(f"⚠️ Indicators (RSI) missing for {symbol}")
-            # return None # Don't block, just use defaults in score
-
-        mtf_data = {
-            "5m": calculate_tf_score(indicators_5m),
-            "15m": calculate_tf_score(indicators_15m),
-            "1h": calculate_tf_score(indicators_60m)
-        }
-
-        MTF_CACHE[symbol] = (mtf_data, current_time)
+        mtf_data = {}
+        for label in intervals:
+            if label in scores:
+                mtf_data[label] = scores[label]
+            else:
+                # Last known score for a late timeframe, else a neutral one that never passes a threshold
+                stale = MTF_TF_CACHE.get((symbol, label))
+                if stale and current_time - stale[1] > 2 * MTF_CACHE_TTL: stale = None
+                mtf_data[label] = dict(stale[0], stale=True) if stale else \
+                    {"score": 0, "trend": "NEUTRAL", "rsi": 50, "adx": 0, "vol": 0, "stale": True}
+        mtf_data["status"] = "partial" if late or queued else "complete"
+        mtf_data["late"] = late
+        mtf_data["queued"] = queued
+
+        if late or queued:
+            logger.info(f"⏱ MTF partial for {symbol}: {late} past {budget}s, {queued} still queued")
+        else:
+            MTF_CACHE[symbol] = (mtf_data, current_time)
         return mtf_data
     except Exception as e:
         logger.error(f"❌ MTF Scoring Error for {symbol}: {e}")
@@ -613,42 +699,52 @@ def get_option_chain_analysis(engine, symbol, is_3pm=False):
         if not inst_key: return None
         
         # 1. Get Expiries
-        expiries = engine.get_expiry_dates_via_sdk(inst_key)
+        expiries = engine.get_expiry_dates(inst_key)
         target_expiry, near_expiry = pick_professional_expiry(expiries, is_3pm=is_3pm)
         if not target_expiry: return None
         
-        # 2. Fetch Chain
-        chain = engine.get_option_chain_via_sdk(inst_key, target_expiry)
+        # 2. Fetch Chain (shared chain service, decoded once into a columnar snapshot)
+        chain = get_chain_service().get_chain(engine, inst_key, target_expiry, underlying=symbol)
+        if not len(chain): return None
         
         # 3. Process OI & LTP
-        rows = []
-        for strike in chain:
-            rows.append({
-                "strike": strike.strike_price,
-                "call_oi": strike.call_options.market_data.oi if strike.call_options else 0,
-                "put_oi": strike.put_options.market_data.oi if strike.put_options else 0,
-                "call_ltp": strike.call_options.market_data.ltp if strike.call_options else 0,
-                "put_ltp": strike.put_options.market_data.ltp if strike.put_options else 0,
-                "raw": strike
-            })
+        df = chain.to_frame()
+        
+        # 3b. Market IV per strike, via the shared IV surface (only changed strikes are re-solved)
+        atm_iv = None
+        try:
+            spot = chain.spot
+            if spot > 0:
+                from services.iv_surface import get_iv_surface_service
+                iv_service = get_iv_surface_service()
+                iv_service.update_from_chain(symbol, target_expiry, spot, chain.strike, chain.ce_ltp, chain.pe_ltp)
+                _, df['call_iv'], df['put_iv'] = iv_service.get_surface(symbol).get_chain_ivs(target_expiry)
+                atm_iv = iv_service.get_atm_iv(symbol, expiry=target_expiry)
+                atm_iv = round(float(atm_iv), 2) if pd.notna(atm_iv) else None
+        except Exception as e:
+            logger.debug(f"IV calc skipped for {symbol}: {e}")
         
-        df = pd.DataFrame(rows)
-        if df.empty: return None
+        # 3c. Strike-level OI buildup vs the previous snapshot of this chain
+        from engine.option_oi_engine import get_oi_engine
+        oi_engine = get_oi_engine()
+        oi_engine.record_snapshot(chain)
+        buildup = oi_engine.chain_buildup(symbol, target_expiry)
         
         # 4. PCR & S/R
-        total_call_oi = df['call_oi'].sum()
-        total_put_oi = df['put_oi'].sum()
-        pcr = total_put_oi / total_call_oi if total_call_oi > 0 else 0
+        pcr = chain.pcr()
         
         max_call_row = df.loc[df['call_oi'].idxmax()]
         max_put_row = df.loc[df['put_oi'].idxmax()]
         
         analysis = {
+            "symbol": symbol,
             "pcr": round(pcr, 2),
             "resistance": max_call_row['strike'],
             "support": max_put_row['strike'],
             "expiry": target_expiry,
             "near_expiry": near_expiry,
+            "atm_iv": atm_iv,
+            "buildup": buildup,
             "df": df,
             "chain": chain
         }
@@ -685,6 +781,25 @@ def calculate_greeks(spot, strike, dte, volatility=0.20, r=0.07):
     except:
         return {"delta_ce": 0.5, "delta_pe": -0.5}
 
+def calculate_deltas(spot, strikes, dte, volatility=0.20, r=0.07):
+    """🧠 Vectorized version of calculate_greeks over an array of strikes (volatility may be per strike)"""
+    from utils.greeks_calculator import norm_cdf_vec
+    strikes = np.asarray(strikes, dtype=float)
+    volatility = np.asarray(volatility, dtype=float)
+    if dte <= 0:
+        return {"delta_ce": np.full(strikes.shape, 0.5), "delta_pe": np.full(strikes.shape, -0.5)}
+    
+    T = dte / 365.0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        d1 = (np.log(float(spot) / strikes) + (r + volatility**2 / 2) * T) / (volatility * np.sqrt(T))
+    delta_ce = norm_cdf_vec(d1)
+    delta_pe = delta_ce - 1.0
+    ok = np.isfinite(d1)
+    return {
+        "delta_ce": np.where(ok, np.round(delta_ce, 2), 0.5),
+        "delta_pe": np.where(ok, np.round(delta_pe, 2), -0.5)
+    }
+
 def choose_smart_itm_strike(analysis, spot, option_type="CE", target_delta=0.65):
     """🎯 Selects the best ITM strike based on Delta proximity"""
     if not analysis or 'df' not in analysis: return None
@@ -693,7 +808,17 @@ def choose_smart_itm_strike(analysis, spot, option_type="CE", target_delta=0.65)
     dte = (datetime.strptime(analysis['expiry'], "%Y-%m-%d") - datetime.now()).days
     if dte < 0: dte = 0
     
-    df['delta'] = df['strike'].apply(lambda k: calculate_greeks(spot, k, dte)['delta_ce' if option_type == "CE" else 'delta_pe'])
+    strikes = df['strike'].to_numpy(dtype=float)
+    
+    # Per-strike smile from the IV surface; flat 20% when the surface has no data
+    volatility = 0.20
+    if analysis.get('symbol'):
+        from services.iv_surface import get_iv_surface_service
+        volatility = get_iv_surface_service().get_iv(
+            analysis['symbol'], strikes, expiry=analysis['expiry'], fallback=20.0, spot=spot
+        ) / 100.0
+    
+    df['delta'] = calculate_deltas(spot, strikes, dte, volatility=volatility)['delta_ce' if option_type == "CE" else 'delta_pe']
     
     if option_type == "CE":
         # CE: ITM means strike < spot, positive delta
@@ -710,18 +835,23 @@ def choose_smart_itm_strike(analysis, spot, option_type="CE", target_delta=0.65)
 
 
 
+def mtf_trend(mtf_data, label):
+    """Trend of one timeframe; a stale (late / placeholder) entry never counts as directional"""
+    tf = (mtf_data or {}).get(label, {})
+    return "NEUTRAL" if tf.get("stale") else tf.get("trend", "NEUTRAL")
+
 def compute_winning_confidence_score(symbol, mtf_status, vol_ratio, delta, adx=25, oi_chg=0):
     """🏆 Multi-Factor Institutional Winning Confidence Score (0-10)"""
     score = 0.0
     
     # 1. MTF Trend Alignment (30%) -> 3.0 pts
-    # User Rule: Align with 5m, 15m, and 1h
+    # User Rule: Align with 5m, 15m, and 1h (stale timeframes of a partial result earn nothing)
     alignment_count = 0
     target_trend = "UP" if delta > 0 else "DOWN"
     
-    if mtf_status.get("5m", {}).get("trend") == target_trend: alignment_count += 1
-    if mtf_status.get("15m", {}).get("trend") == target_trend: alignment_count += 1
-    if mtf_status.get("1h", {}).get("trend") == target_trend: alignment_count += 1
+    if mtf_trend(mtf_status, "5m") == target_trend: alignment_count += 1
+    if mtf_trend(mtf_status, "15m") == target_trend: alignment_count += 1
+    if mtf_trend(mtf_status, "1h") == target_trend: alignment_count += 1
     
     score += alignment_count * 1.0 # 1 pt per aligned timeframe
     
@@ -775,13 +905,14 @@ def entry_engine(engine, symbol, spot, index_df, vix_df, pcr_value=1.0, threshol
     resistance = chain_analysis['resistance']
     pcr = chain_analysis['pcr']
 
-    # 4. Direction Decision
+    # 4. Direction Decision (stale timeframes never vote)
     final_type = None
+    short_trend, medium_trend = mtf_trend(mtf_data, "5m"), mtf_trend(mtf_data, "15m")
     # BULLISH CASE
-    if short['trend'] == "UP" and medium['trend'] == "UP" and "BULLISH" in index_bias and spot > support:
+    if short_trend == "UP" and medium_trend == "UP" and "BULLISH" in index_bias and spot > support:
         final_type = "CE"
     # BEARISH CASE
-    elif short['trend'] == "DOWN" and medium['trend'] == "DOWN" and "BEARISH" in index_bias and spot < resistance:
+    elif short_trend == "DOWN" and medium_trend == "DOWN" and "BEARISH" in index_bias and spot < resistance:
         final_type = "PE"
 
     if not final_type:
@@ -796,14 +927,22 @@ def entry_engine(engine, symbol, spot, index_df, vix_df, pcr_value=1.0, threshol
     delta = best_itm.get('delta', 0.6)
 
     # 6. Confidence Score
+    # OI change at the chosen strike since the previous chain snapshot (5% assumed until history exists)
+    oi_chg = 0.05
+    buildup = chain_analysis.get('buildup')
+    if buildup is not None:
+        row = buildup[buildup['strike'] == strike]
+        chg = row[f"{final_type.lower()}_oi_chg_pct"].iloc[0] if not row.empty else np.nan
+        if pd.notna(chg): oi_chg = float(chg)
+    
     # Use short-term volatility and ADX for precision
     conf_score = compute_winning_confidence_score(
         symbol, mtf_data, short.get('vol', 1.0), delta,
-        adx=short.get('adx', 20), oi_chg=0.05
+        adx=short.get('adx', 20), oi_chg=oi_chg
     )
 
-    # 7. Final PASS Decision
-    pass_flag = conf_score >= threshold
+    # 7. Final PASS Decision (only on a complete MTF read; a partial one can still be shown, not traded)
+    pass_flag = conf_score >= threshold and mtf_data.get("status", "complete") == "complete"
 
     return {
         "symbol": symbol,
@@ -836,6 +975,36 @@ def estimate_target_time(adx_val=25, is_scalp=False):
     target_time = datetime.now() + timedelta(minutes=offset)
     return target_time.strftime("%I:%M %p") # e.g. 02:30 PM
 
+def attach_hit_probability(engine, signal):
+    """🎲 Monte Carlo P(target before SL) + expected time to target, added to the signal in place"""
+    try:
+        from services.hit_probability import estimate_hit_probability
+        from services.iv_surface import get_iv_surface_service
+        sym, strike, expiry = signal['symbol'], signal['strike'], signal.get('expiry')
+        if not expiry or not signal.get('premium'): return signal
+        
+        now = datetime.now()
+        dte = max((datetime.strptime(expiry, "%Y-%m-%d") - now).total_seconds() / 86400 + 15.5 / 24, 0)
+        session_left = (now.replace(hour=15, minute=30, second=0) - now).total_seconds() / 60
+        iv = get_iv_surface_service().get_iv(sym, strike, expiry=expiry, fallback=20.0, spot=signal['spot'])
+        
+        # Bootstrap from today's 1m returns when there are enough bars
+        returns = None
+        inst_key = engine.get_instrument_key(sym)
+        bars = engine.get_intraday_candles(inst_key, interval="1minute") if inst_key else pd.DataFrame()
+        if not bars.empty:
+            returns = np.diff(np.log(bars['close'].to_numpy(dtype=float)))
+        
+        result = estimate_hit_probability(
+            signal['spot'], strike, signal['type'], signal['target'], signal['stop_loss'], dte, float(iv),
+            premium=signal['premium'], returns=returns, horizon_minutes=int(min(max(session_left, 30), 375))
+        )
+        signal['hit_prob'] = round(result['p_target'] * 100, 1)
+        signal['target_minutes'] = result['expected_minutes']
+    except Exception as e:
+        logger.debug(f"Hit probability skipped for {signal.get('symbol')}: {e}")
+    return signal
+
 ALERTS_COOLDOWN = {} # key -> timestamp
 
 def choose_strike_professional(spot, symbol, index_trend, ranking_score=0, is_3pm=False):
@@ -906,31 +1075,14 @@ def get_option_ltp(engine, symbol, strike, option_type, target_expiry=None):
         if not idx_key: return 0
         
         if not target_expiry:
-            expiries = engine.get_expiry_dates_via_sdk(idx_key)
+            expiries = engine.get_expiry_dates(idx_key)
             target_expiry, _ = pick_professional_expiry(expiries, symbol=symbol)
         
         if not target_expiry: return 0
         
-        # 🟢 Try 1: SDK Option Chain
-        opt_key = None
-        chain = engine.get_option_chain_via_sdk(idx_key, target_expiry)
-        if chain:
-            for item in chain:
-                if abs(item.strike_price - float(strike)) < 0.1:
-                    side_data = item.call_options if option_type == "CE" else item.put_options
-                    if side_data:
-                        opt_key = side_data.instrument_key
-                        break
-        
-        # 🟢 Try 2: HTTP Option Chain (If SDK failed or returned empty)
-        if not opt_key:
-            http_chain = engine.get_option_chain(idx_key, target_expiry)
-            for item in http_chain:
-                if abs(item.get('strike_price', 0) - float(strike)) < 0.1:
-                    side_key = 'call_options' if option_type == "CE" else 'put_options'
-                    if side_key in item and item[side_key]:
-                        opt_key = item[side_key].get('instrument_key')
-                        break
+        # 🟢 Option Chain snapshot from the shared chain service
+        chain = get_chain_service().get_chain(engine, idx_key, target_expiry, underlying=symbol)
+        opt_key = chain.instrument_key(strike, option_type)
                         
         if opt_key:
             # Try 1: Streamer (Real-time)
@@ -982,13 +1134,13 @@ def calculate_adx(df, window=14):
 
 def scalper_indicator_check(df, engine=None, symbol=None, threshold=3):
     """🏆 Multi-Timeframe Scoring Integration (User's Final Decision Logic)"""
-    from services.market_engine import calculate_indicators
+    from services.market_engine import compute_indicators
     
     if df.empty or len(df) < 5:
         return False, False, 50.0, 1.0, 0, 0.0, "NEUTRAL"
     
-    # 1. Short-Term Indicators
-    df = calculate_indicators(df)
+    # 1. Short-Term Indicators (score only needs RSI/ADX/VolRatio)
+    df = compute_indicators(df, "tf_score", instrument=symbol)
     st = calculate_tf_score(df)
     
     short_score = st['score']
@@ -1007,12 +1159,13 @@ def scalper_indicator_check(df, engine=None, symbol=None, threshold=3):
         
         if mtf_data:
             medium_score = mtf_data['15m']['score']
-            medium_trend = mtf_data['15m']['trend']
+            medium_trend = mtf_trend(mtf_data, '15m')
             long_score = mtf_data['1h']['score']
-            long_trend = mtf_data['1h']['trend']
+            long_trend = mtf_trend(mtf_data, '1h')
             
-            # 🚀 USER RULE: Final Decision Logic
+            # 🚀 USER RULE: Final Decision Logic (complete MTF reads only)
             pass_flag = (
+                mtf_data.get("status", "complete") == "complete" and
                 short_score >= threshold and
                 medium_score >= threshold and
                 short_trend == medium_trend and
@@ -1087,7 +1240,7 @@ def calculate_pcr_data(engine, look_at_next_month=False):
     }
     
     for label, target_key in targets.items():
-        expiries = engine.get_expiry_dates_via_sdk(target_key)
+        expiries = engine.get_expiry_dates(target_key)
         if not expiries: continue
         
         expiries.sort()
@@ -1097,21 +1250,15 @@ def calculate_pcr_data(engine, look_at_next_month=False):
             expiry_date = get_nearest_active_expiry(expiries)
             
         if not expiry_date: continue
-        chain_data = engine.get_option_chain_via_sdk(target_key, expiry_date)
+        chain = get_chain_service().get_chain(engine, target_key, expiry_date, underlying=label)
         
-        for contract in chain_data:
-            ce = contract.call_options
-            pe = contract.put_options
-            if ce and ce.market_data:
-                pcr_stats[label]["ce_cnt"] += 1
-                pcr_stats[label]["ce_oi"] += ce.market_data.oi
-                pcr_stats["overall"]["ce_cnt"] += 1
-                pcr_stats["overall"]["ce_oi"] += ce.market_data.oi
-            if pe and pe.market_data:
-                pcr_stats[label]["pe_cnt"] += 1
-                pcr_stats[label]["pe_oi"] += pe.market_data.oi
-                pcr_stats["overall"]["pe_cnt"] += 1
-                pcr_stats["overall"]["pe_oi"] += pe.market_data.oi
+        ce_cnt, pe_cnt = int(chain.ce_present.sum()), int(chain.pe_present.sum())
+        ce_oi, pe_oi = float(chain.ce_oi.sum()), float(chain.pe_oi.sum())
+        for k in (label, "overall"):
+            pcr_stats[k]["ce_cnt"] += ce_cnt
+            pcr_stats[k]["ce_oi"] += ce_oi
+            pcr_stats[k]["pe_cnt"] += pe_cnt
+            pcr_stats[k]["pe_oi"] += pe_oi
                 
     for k in pcr_stats:
         coi = pcr_stats[k]["ce_oi"]
@@ -1252,24 +1399,20 @@ def get_nifty_movers(engine, symbols, instrument_map):
     for k, q in quotes.items():
         update_live_ltp(k, q.get('last_price', 0))
 
+    # Previous closes come from the pre-market daily feature table (no per-symbol daily fetch)
+    prev_closes = get_daily_features().get_many([s for s in symbols if instrument_map.get(s)])["prev_close"]
+
     for sym in symbols:
         try:
             key = instrument_map.get(sym)
             if not key: continue
             
             # Use live LTP (now populated by bulk fetch)
-            ltp = get_live_ltp(key)
+            ltp, _ = get_live_ltp(key)
             if not ltp or ltp <= 0: continue
             
-            # Fetch Daily candles once per cycle
-            df = engine.get_historical_candles(key, interval="day", days=2)
-            if df.empty: continue
-            
-            # Normalize columns
-            df.columns = [c.lower() for c in df.columns]
-            if 'close' not in df.columns: continue
-            
-            prev_close = df['close'].iloc[-1]
+            prev_close = prev_closes.get(sym)
+            if not prev_close or pd.isna(prev_close): continue
             pct_chg = ((ltp - prev_close) / prev_close) * 100
             movers.append({"symbol": sym, "pct": pct_chg, "ltp": ltp, "key": key})
         except: continue
@@ -1313,6 +1456,7 @@ def get_sector_bias_v2(cand_map):
 def premarket_job():
     """PRE-MARKET SNAPSHOT (8:45 AM)"""
     logger.info("⏰ Scheduler: Running Pre-Market Job...")
+    get_daily_features().refresh()
     run_premarket_scan()
 
 def live_sentiment_job():
@@ -1387,6 +1531,7 @@ def generate_elite_index_alerts(engine, index_alerts_list, alerts_sent, current_
                             "stop_loss": prem * 0.85, "target": estimate_target_premium(prem, delta),
                             "mtf_signals": mtf_data or {}
                         }
+                        attach_hit_probability(engine, signal)
                         if send_trade_alert(signal):
                             alerts_sent[alert_key] = {"ts": current_ts, "status": "Active"}
                             save_alerts_sent(alerts_sent)
@@ -1430,6 +1575,18 @@ def index_scanner_loop(context):
     last_sentiment_time = time.time()
     sent_premarket = False
     sent_postmarket = False
+    work_queue = get_work_queue()
+    
+    def check_lifecycle(sig):
+        """True while the trade stays open"""
+        ltp = get_option_ltp(engine, sig['symbol'], sig['strike'], sig['type'])
+        if not ltp: return True
+        if ltp >= sig['target']:
+            sig['status'] = "Target Achieved ✅"; send_trade_alert(sig, is_update=True)
+        elif ltp <= sig['stop_loss']:
+            sig['status'] = "Stopped Out ❌"; send_trade_alert(sig, is_update=True)
+        else: return True
+        return False
     
     while True:
         try:
@@ -1437,6 +1594,7 @@ def index_scanner_loop(context):
             now = datetime.now()
             context.now = now
             context.power_mode = is_power_window()
+            work_queue.set_power_mode(context.power_mode)
             
             # 1. TIMED SYSTEM TRIGGERS
             if now.hour == 9 and 0 <= now.minute < 15 and not sent_premarket:
@@ -1455,16 +1613,10 @@ def index_scanner_loop(context):
                     context.active_signals = [s for s in context.active_signals if s.get('tag') != "🏛 3PM POWER CLOSE"]
                 save_active_signals(context.active_signals)
 
-            # 3. LIFECYCLE MONITORING (Target/SL Hits)
-            still_active = []
-            for sig in context.active_signals:
-                ltp = get_option_ltp(engine, sig['symbol'], sig['strike'], sig['type'])
-                if not ltp: still_active.append(sig); continue
-                if ltp >= sig['target']:
-                    sig['status'] = "Target Achieved ✅"; send_trade_alert(sig, is_update=True)
-                elif ltp <= sig['stop_loss']:
-                    sig['status'] = "Stopped Out ❌"; send_trade_alert(sig, is_update=True)
-                else: still_active.append(sig)
+            # 3. LIFECYCLE MONITORING (Target/SL Hits) - ahead of any stock work in the queue
+            signals = list(context.active_signals)
+            open_flags = work_queue.map(check_lifecycle, signals, task_class=TaskClass.MONITOR)
+            still_active = [sig for sig, still_open in zip(signals, open_flags) if still_open is not False]
             with context.lock: context.active_signals = still_active
             save_active_signals(context.active_signals)
 
@@ -1475,24 +1627,29 @@ def index_scanner_loop(context):
             nifty_df = engine.get_intraday_candles(nifty_key, interval="5minute")
             vix_df = engine.get_intraday_candles(vix_key, interval="5minute")
             
+            # Compute outside the lock; the stock workers only block for the swap
+            if not nifty_df.empty:
+                nifty_df = calculate_indicators(nifty_df, instrument=nifty_key, timeframe="5minute")
+                n_col = 'Close' if 'Close' in nifty_df.columns else 'close'
+                n_ema = nifty_df[n_col].ewm(span=20, adjust=False).mean()
+                idx_trend = "BULLISH" if nifty_df[n_col].iloc[-1] > n_ema.iloc[-1] else "BEARISH"
+            if not vix_df.empty: vix_df = calculate_indicators(vix_df, instrument=vix_key, timeframe="5minute")
+            nifty_analysis = get_option_chain_analysis(engine, "NIFTY", is_3pm=context.power_mode)
+            
             with context.lock:
-                if not nifty_df.empty: 
-                    context.nifty_df = calculate_indicators(nifty_df)
-                    n_col = 'Close' if 'Close' in context.nifty_df.columns else 'close'
-                    n_ema = context.nifty_df[n_col].ewm(span=20, adjust=False).mean()
-                    context.idx_trend = "BULLISH" if context.nifty_df[n_col].iloc[-1] > n_ema.iloc[-1] else "BEARISH"
-                if not vix_df.empty: context.vix_df = calculate_indicators(vix_df)
-                
-                nifty_analysis = get_option_chain_analysis(engine, "NIFTY", is_3pm=context.power_mode)
+                if not nifty_df.empty:
+                    context.nifty_df, context.idx_trend = nifty_df, idx_trend
+                if not vix_df.empty: context.vix_df = vix_df
                 context.pcr_value = nifty_analysis['pcr'] if nifty_analysis else 1.0
                 
-                # --- 🚀 ELITE INDEX ALERTS ---
-                index_alerts = calculate_index_bias({"NIFTY": context.nifty_df})
-                generate_elite_index_alerts(engine, index_alerts, context.alerts_sent, current_ts)
+            # --- 🚀 ELITE INDEX ALERTS --- (inline: this thread is the index tier, the queue is for stock fan-out)
+            index_alerts = calculate_index_bias({"NIFTY": context.nifty_df})
+            generate_elite_index_alerts(engine, index_alerts, context.alerts_sent, current_ts)
 
             # 5. PERIODIC SUMMARY
             if current_ts - last_summary_time >= SUMMARY_INTERVAL:
                 send_15min_summary({"NIFTY": {"pcr": context.pcr_value}}, False)
+                work_queue.log_report()
                 last_summary_time = current_ts
             
             schedule.run_pending()
@@ -1502,64 +1659,80 @@ def index_scanner_loop(context):
             logger.error(f"❌ Index Loop Error: {e}"); time.sleep(10)
 
 def stock_scanner_loop(context):
-    """🏛 TIER 2: STOCK SCANNER (High-Speed Batch Scanning)"""
+    """🏛 TIER 2: STOCK SCANNER (Event-Driven: Ticks, Bar Closes & OI Changes)"""
     logger.info("📡 Stock Scanner Loop Active — Processing Global Stocks")
     engine = context.engine
     instrument_map = context.map
     fo_symbols = [s.replace(".NS", "") for s in STOCKS]
-    prev_prices = {}
-    last_cycle_min = -1
-    
+    deep_scan_list = [s for s in fo_symbols if s in instrument_map]
+
+    # Symbols are only evaluated when something changed: a >0.3% move (0.15% in the
+    # power window), a bar close or a chain OI shift. Bursts coalesce per symbol.
+    scheduler = get_scan_scheduler()
+    scheduler.watch({s: instrument_map[s] for s in deep_scan_list})
+    get_streamer().add_tick_listener(scheduler.on_tick)
+    get_chain_service().add_listener(scheduler.on_chain_refresh)
+    scheduler.start_clock()
+    scheduler.on_bar_close()  # Full pass at startup
+    last_movers_time = 0
+    work_queue = get_work_queue()
+
+    def evaluate(sym, reasons):
+        key = instrument_map.get(sym)
+        spot, _ = get_live_ltp(key)
+        if not spot: return
+
+        with context.lock:
+            n_df, v_df, pcr = context.nifty_df, context.vix_df, context.pcr_value
+
+        decision = entry_engine(engine, sym, spot, n_df, v_df, pcr_value=pcr)
+        price_jump = scheduler.move_since_last(sym, spot)
+        scheduler.done(sym, spot)
+        if any(r.startswith("BAR") for r in reasons) or price_jump > 0.5:
+            print(f"🔍 DEBUG [{sym}] | LTP: {spot:.2f} | {'+'.join(reasons)} | Score: {decision['confidence']} | PASS: {decision['PASS']}")
+
+        if decision["PASS"]:
+            with context.lock:
+                if not can_take_trade(sym, context.active_signals): return
+            # Premium fetch + Monte Carlo run without the lock; the index loop needs it
+            prem = get_option_ltp(engine, sym, decision['strike'], decision['type'], target_expiry=decision.get("expiry"))
+            if prem <= 0: return
+            entry = {
+                "symbol": sym, "type": decision['type'], "strike": decision['strike'], 
+                "spot": spot, "premium": prem, "score": decision['confidence'], 
+                "expiry": decision['expiry'], "target": estimate_target_premium(prem, 0.65), 
+                "stop_loss": round(prem * 0.85, 2), "time": datetime.now().strftime("%H:%M:%S"), "tag": "🏛 UNIFIED"
+            }
+            attach_hit_probability(engine, entry)
+            with context.lock:
+                # Re-checked: another worker may have taken a slot meanwhile
+                if can_take_trade(sym, context.active_signals) and send_trade_alert(entry):
+                    context.active_signals.append(entry)
+                    save_active_signals(context.active_signals)
+                    logger.info(f"🏆 Unified signal: {sym}")
+
     while True:
         try:
-            now = datetime.now()
+            scheduler.set_power_mode(context.power_mode)
+            batch = scheduler.next_batch(max_items=5, timeout=1.0)
+            if not batch: continue
+
             current_ts = time.time()
-            context.is_new_cycle = is_new_5min_candle() and now.minute != last_cycle_min
-            if context.is_new_cycle: last_cycle_min = now.minute
-            
-            if context.is_new_cycle or not MOVERS_CACHE["bulls"]:
-                get_nifty_movers(engine, STOCKS, instrument_map)
+            context.is_new_cycle = any(r.startswith("BAR") for _, reasons in batch for r in reasons)
 
-            deep_scan_list = [s for s in fo_symbols if s in instrument_map]
-            
-            batch_size = 5
-            for i in range(0, len(deep_scan_list), batch_size):
-                batch = deep_scan_list[i : i + batch_size]
-                for sym in batch:
-                    key = instrument_map.get(sym)
-                    spot = get_live_ltp(key)
-                    if not spot: continue
-                    
-                    price_jump = abs(spot - prev_prices.get(key, spot)) / spot * 100
-                    prev_prices[key] = spot
-                    
-                    if context.is_new_cycle or price_jump > 0.3 or context.power_mode:
-                        with context.lock:
-                            n_df, v_df, pcr = context.nifty_df, context.vix_df, context.pcr_value
-                        
-                        decision = entry_engine(engine, sym, spot, n_df, v_df, pcr_value=pcr)
-                        
-                        if context.is_new_cycle or price_jump > 0.5:
-                            print(f"🔍 DEBUG [{sym}] | LTP: {spot:.2f} | Score: {decision['confidence']} | PASS: {decision['PASS']}")
-
-                        if decision["PASS"]:
-                            with context.lock:
-                                if can_take_trade(sym, context.active_signals):
-                                    prem = get_option_ltp(engine, sym, decision['strike'], decision['type'], target_expiry=decision.get("expiry"))
-                                    if prem > 0:
-                                        entry = {
-                                            "symbol": sym, "type": decision['type'], "strike": decision['strike'], 
-                                            "spot": spot, "premium": prem, "score": decision['confidence'], 
-                                            "expiry": decision['expiry'], "target": estimate_target_premium(prem, 0.65), 
-                                            "stop_loss": round(prem * 0.85, 2), "time": now.strftime("%H:%M:%S"), "tag": "🏛 UNIFIED"
-                                        }
-                                        if send_trade_alert(entry):
-                                            context.active_signals.append(entry)
-                                            save_active_signals(context.active_signals)
-                                            logger.info(f"🏆 Unified signal: {sym}")
-                
-                time.sleep(0.5) 
-            time.sleep(1)
+            if (context.is_new_cycle and current_ts - last_movers_time >= 60) or not MOVERS_CACHE["bulls"]:
+                get_nifty_movers(engine, STOCKS, instrument_map)
+                last_movers_time = current_ts
+
+            # Movers and real events are shortlist work; plain bar-close passes are the sweep
+            # (shed by the work queue when late, they are re-queued on the next bar close)
+            shortlist = {m['symbol'] for m in MOVERS_CACHE["bulls"] + MOVERS_CACHE["bears"]}
+            futures = []
+            for sym, reasons in batch:
+                is_event = sym in shortlist or any(not r.startswith("BAR") for r in reasons)
+                futures.append(work_queue.submit(evaluate, sym, reasons, name=sym,
+                                                 task_class=TaskClass.SHORTLIST if is_event else TaskClass.SWEEP))
+            wait(futures)
             
         except Exception as e:
             logger.error(f"❌ Stock Loop Error: {e}"); time.sleep(10)
@@ -25,6 +25,7 @@ TRADING_CONFIG = {
     "brokerage_per_lot": 20,    # Brokerage per lot (INR)
     "stt_percent": 0.0005,      # STT 0.05% on sell side
     "exchange_charges": 0.0003, # Exchange charges 0.03%
+    "position_persist_interval": 30,  # Seconds between batched position writes
 }
 
 # Risk Management
@@ -132,6 +133,13 @@ INDICATOR_PARAMS = {
     "support_resistance_period": 20,
 }
 
+# Universe Funnel (bulk quote screen -> candle fetch)
+FUNNEL_CONFIG = {
+    "shortlist_size": 60,   # Stage 1 -> stage 2: symbols that get candle fetches
+    "final_size": 25,       # Stage 2 output (momentum list)
+    "quote_batch": 450,     # Instruments per bulk quote request
+}
+
 # IV Regime Thresholds
 IV_THRESHOLDS = {
     "LOW": 15,
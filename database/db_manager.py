@@ -168,31 +168,47 @@ class DatabaseManager:
         with self.get_connection() as conn:
             rows = conn.execute(query, params).fetchall()
         
-        trades = []
-        for row in rows:
-            trade = Trade(
-                id=row['id'],
-                strategy_id=row['strategy_id'],
-                symbol=row['symbol'],
-                option_type=OptionType[row['option_type']],
-                strike_price=row['strike_price'],
-                entry_price=row['entry_price'],
-                exit_price=row['exit_price'],
-                quantity=row['quantity'],
-                entry_time=datetime.fromisoformat(row['entry_time']),
-                exit_time=datetime.fromisoformat(row['exit_time']) if row['exit_time'] else None,
-                status=TradeStatus[row['status']],
-                pnl=row['pnl'],
-                fees=row['fees'],
-                notes=row['notes'],
-                stop_loss=row['stop_loss'],
-                target=row['target'],
-                max_profit=row['max_profit'],
-                max_loss=row['max_loss']
-            )
-            trades.append(trade)
-        
-        return trades
+        return [self._row_to_trade(row) for row in rows]
+    
+    @staticmethod
+    def _row_to_trade(row) -> Trade:
+        """Convert a trades row into a Trade"""
+        return Trade(
+            id=row['id'],
+            strategy_id=row['strategy_id'],
+            symbol=row['symbol'],
+            option_type=OptionType[row['option_type']],
+            strike_price=row['strike_price'],
+            entry_price=row['entry_price'],
+            exit_price=row['exit_price'],
+            quantity=row['quantity'],
+            entry_time=datetime.fromisoformat(row['entry_time']),
+            exit_time=datetime.fromisoformat(row['exit_time']) if row['exit_time'] else None,
+            status=TradeStatus[row['status']],
+            pnl=row['pnl'],
+            fees=row['fees'],
+            notes=row['notes'],
+            stop_loss=row['stop_loss'],
+            target=row['target'],
+            max_profit=row['max_profit'],
+            max_loss=row['max_loss']
+        )
+    
+    def get_trade_by_id(self, trade_id: int) -> Optional[Trade]:
+        """Get a single trade by primary key"""
+        with self.get_connection() as conn:
+            row = conn.execute("SELECT * FROM trades WHERE id = ?", (trade_id,)).fetchone()
+        return self._row_to_trade(row) if row else None
+    
+    def get_trades_by_ids(self, trade_ids: List[int]) -> Dict[int, Trade]:
+        """Get several trades by id in one query -> {id: Trade}"""
+        trade_ids = list(trade_ids)
+        if not trade_ids:
+            return {}
+        placeholders = ",".join("?" * len(trade_ids))
+        with self.get_connection() as conn:
+            rows = conn.execute(f"SELECT * FROM trades WHERE id IN ({placeholders})", trade_ids).fetchall()
+        return {row['id']: self._row_to_trade(row) for row in rows}
     
     def get_open_trades(self, symbol: Optional[str] = None) -> List[Trade]:
         """Get all open trades"""
@@ -259,6 +275,35 @@ class DatabaseManager:
                 position.id
             ))
     
+    def update_positions_batch(self, positions: List[Position]):
+        """Update prices, P&L and Greeks of many positions in one transaction"""
+        if not positions:
+            return
+        query = """
+            UPDATE positions SET
+                current_price = ?, pnl = ?,
+                delta = ?, gamma = ?, theta = ?, vega = ?, rho = ?,
+                updated_at = ?
+            WHERE id = ?
+        """
+        now = datetime.now().isoformat()
+        params = []
+        for position in positions:
+            greeks = position.greeks
+            params.append((
+                position.current_price,
+                position.pnl,
+                greeks.delta if greeks else None,
+                greeks.gamma if greeks else None,
+                greeks.theta if greeks else None,
+                greeks.vega if greeks else None,
+                greeks.rho if greeks else None,
+                position.updated_at.isoformat() if position.updated_at else now,
+                position.id
+            ))
+        with self.get_connection() as conn:
+            conn.executemany(query, params)
+    
     def get_positions(self, active_only: bool = True) -> List[Position]:
         """Get all positions"""
         query = "SELECT p.*, t.status FROM positions p JOIN trades t ON p.trade_id = t.id"
@@ -52,6 +52,7 @@ class IntelligenceEngine:
                 "close": close,
                 "pcr": pcr,
                 "max_pain": sentiment_data['max_pain'],
+                "max_pain_next": sentiment_data.get('max_pain_next'),
                 "oi_build": sentiment_data['sentiment'],
                 "bias": bias,
                 "prob": probability,
@@ -1,12 +1,69 @@
 import logging
+import numpy as np
 import pandas as pd
+from collections import deque
 from datetime import datetime
 
 logger = logging.getLogger("OptionOI")
 
+BUILDUP_LABELS = ["NO_CHANGE", "LONG BUILDUP", "SHORT BUILDUP", "SHORT COVERING", "LONG UNWINDING", "NEUTRAL"]
+SNAPSHOT_HISTORY = 12  # Chain snapshots kept per underlying/expiry
+
+def classify_buildup(ltp, oi, last_ltp, last_oi):
+    """Vectorized analyze_buildup over whole arrays (NaN previous = no history)"""
+    ltp, oi = np.asarray(ltp, dtype=float), np.asarray(oi, dtype=float)
+    last_ltp, last_oi = np.nan_to_num(np.asarray(last_ltp, dtype=float)), np.nan_to_num(np.asarray(last_oi, dtype=float))
+    no_change = (last_ltp == 0) | (last_oi == 0) | (oi == last_oi)
+    price_up, price_down = ltp > last_ltp, ltp < last_ltp
+    oi_up, oi_down = oi > last_oi, oi < last_oi
+    labels = np.select(
+        [no_change, price_up & oi_up, price_down & oi_up, price_up & oi_down, price_down & oi_down],
+        BUILDUP_LABELS[:5], default="NEUTRAL"
+    )
+    return labels
+
+def diff_snapshots(prev, curr):
+    """
+    Per-strike price/OI deltas between two (non-empty) ChainSnapshots of the same chain.
+    Strikes missing from `prev` get NaN deltas and NO_CHANGE.
+    """
+    pos = np.minimum(np.searchsorted(prev.strike, curr.strike), len(prev) - 1)
+    matched = prev.strike[pos] == curr.strike
+
+    out = {"strike": curr.strike}
+    for side in ("CE", "PE"):
+        ltp, oi = curr.side(side, "ltp"), curr.side(side, "oi")
+        last_ltp = np.where(matched, prev.side(side, "ltp")[pos], np.nan)
+        last_oi = np.where(matched, prev.side(side, "oi")[pos], np.nan)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            out[f"{side.lower()}_ltp_chg"] = ltp - last_ltp
+            out[f"{side.lower()}_oi_chg"] = oi - last_oi
+            out[f"{side.lower()}_oi_chg_pct"] = np.where(last_oi > 0, (oi - last_oi) / last_oi, np.nan)
+        out[f"{side}_BUILDP"] = classify_buildup(ltp, oi, last_ltp, last_oi)
+    return pd.DataFrame(out)
+
 class OptionOIEngine:
-    def __init__(self):
-        self.last_oi_data = {} # Key: option_key, Value: {oi, timestamp}
+    def __init__(self, history=SNAPSHOT_HISTORY):
+        self.history = history
+        self.snapshots = {} # Key: (underlying, expiry), Value: deque of ChainSnapshot
+
+    def record_snapshot(self, snapshot):
+        """Pushes a chain snapshot into its ring buffer (identical timestamps are ignored)"""
+        if snapshot is None or not len(snapshot): return
+        key = (snapshot.underlying, snapshot.expiry)
+        ring = self.snapshots.setdefault(key, deque(maxlen=self.history))
+        if ring and ring[-1].timestamp == snapshot.timestamp: return
+        ring.append(snapshot)
+
+    def chain_buildup(self, underlying, expiry, lookback=1):
+        """
+        Buildup table for the latest snapshot vs the one `lookback` snapshots ago.
+        Returns None until two snapshots exist.
+        """
+        ring = self.snapshots.get((underlying, str(expiry)[:10]))
+        if not ring or len(ring) < 2: return None
+        lookback = min(lookback, len(ring) - 1)
+        return diff_snapshots(ring[-1 - lookback], ring[-1])
 
     def analyze_buildup(self, ltp, oi, last_ltp, last_oi):
         """
@@ -34,26 +91,18 @@ class OptionOIEngine:
 
     def process_chain(self, chain_data):
         """
-        Analyzes the full option chain for OI shifts
+        Analyzes the full option chain for OI shifts.
+        A ChainSnapshot is diffed against the previous snapshot of the same
+        (underlying, expiry) chain, so overlapping strikes of other chains never mix.
         """
-        analysis = []
-        for strike in chain_data:
-            # Analyze CE
-            ce = strike.get("CE", {})
-            ce_oi = ce.get("oi", 0)
-            ce_ltp = ce.get("ltp", 0)
-            
-            # Analyze PE
-            pe = strike.get("PE", {})
-            pe_oi = pe.get("oi", 0)
-            pe_ltp = pe.get("ltp", 0)
-
-            analysis.append({
-                "strike": strike.get("strike"),
-                "CE_BUILDP": self.analyze_buildup(ce_ltp, ce_oi, 0, 0), # Simplified for now
-                "PE_BUILDP": self.analyze_buildup(pe_ltp, pe_oi, 0, 0)
-            })
-        return analysis
+        if not hasattr(chain_data, "strike"):
+            logger.warning("process_chain expects a ChainSnapshot; raw strike lists are no longer supported")
+            return []
+        self.record_snapshot(chain_data)
+        table = self.chain_buildup(chain_data.underlying, chain_data.expiry)
+        if table is None:
+            return [{"strike": float(k), "CE_BUILDP": "NO_CHANGE", "PE_BUILDP": "NO_CHANGE"} for k in chain_data.strike]
+        return table[["strike", "CE_BUILDP", "PE_BUILDP"]].to_dict("records")
 
     def get_market_bias(self, chain):
         """
@@ -57,31 +57,15 @@ def get_option_ltp(engine, symbol, strike, option_type, target_expiry=None):
         if not idx_key: return 0, None, 0
         
         if not target_expiry:
-            expiries = engine.get_expiry_dates_via_sdk(idx_key)
+            expiries = engine.get_expiry_dates(idx_key)
             target_expiry = pick_professional_expiry(expiries, symbol=symbol)
         
         if not target_expiry: return 0, None, 0
         
-        opt_key = None
-        # Try SDK Option Chain
-        chain = engine.get_option_chain_via_sdk(idx_key, target_expiry)
-        if chain:
-            for item in chain:
-                if abs(item.strike_price - float(strike)) < 0.1:
-                    side_data = item.call_options if option_type == "CE" else item.put_options
-                    if side_data:
-                        opt_key = side_data.instrument_key
-                        break
-        
-        # Fallback to HTTP Option Chain
-        if not opt_key:
-            http_chain = engine.get_option_chain(idx_key, target_expiry)
-            for item in http_chain:
-                if abs(item.get('strike_price', 0) - float(strike)) < 0.1:
-                    side_key = 'call_options' if option_type == "CE" else 'put_options'
-                    if side_key in item and item[side_key]:
-                        opt_key = item[side_key].get('instrument_key')
-                        break
+        # Option Chain snapshot from the shared chain service
+        from services.chain_service import get_chain_service
+        chain = get_chain_service().get_chain(engine, idx_key, target_expiry, underlying=symbol)
+        opt_key = chain.instrument_key(strike, option_type)
                         
         if opt_key:
             # 🚀 DYNAMIC SUBSCRIPTION
@@ -0,0 +1,134 @@
+"""
+Panel Indicator Engine - cross-sectional indicator pass
+Stacks N instruments x T bars into 2-D arrays (right aligned, so the last
+column is every symbol's latest bar) and computes the scanner indicators for
+the whole universe at once instead of one small DataFrame per symbol.
+
+Numerics follow services.market_engine.calculate_indicators (Wilder RSI/ADX/ATR,
+ewm(adjust=False) EMAs, cumulative VWAP, 20-bar VolRatio).
+"""
+import numpy as np
+import pandas as pd
+
+PANEL_COLUMNS = ["EMA20", "EMA50", "EMA200", "VWAP", "RSI", "ADX", "ATR", "VolRatio"]
+
+
+def _ewm(x, alpha):
+    """Row-wise ewm(adjust=False) over axis 1; leading NaNs are padding"""
+    out = np.full_like(x, np.nan)
+    state = np.full(x.shape[0], np.nan)
+    for t in range(x.shape[1]):
+        col = x[:, t]
+        seed = np.isnan(state) & ~np.isnan(col)
+        state = np.where(seed, col, np.where(np.isnan(col), state, alpha * col + (1 - alpha) * state))
+        out[:, t] = state
+    return out
+
+
+def _rolling_mean(x, window):
+    """Row-wise rolling(window).mean(); NaN until the window is full"""
+    out = np.full_like(x, np.nan)
+    if x.shape[1] >= window:
+        view = np.lib.stride_tricks.sliding_window_view(x, window, axis=1)
+        out[:, window - 1:] = view.mean(axis=2)
+    return out
+
+
+def _nz(x, repl=0.001):
+    """Mirror of pandas `.replace(0, 0.001)`"""
+    return np.where(x == 0, repl, x)
+
+
+def build_panel(frames, min_bars=20):
+    """
+    Stack candle frames {symbol: df} into right-aligned (N, T) arrays.
+    Accepts lower or Title case OHLCV columns; rows with a NaN close are dropped.
+    """
+    symbols, series = [], []
+    for sym, df in frames.items():
+        if df is None or df.empty: continue
+        cols = {c.lower(): c for c in df.columns}
+        if not all(k in cols for k in ("open", "high", "low", "close", "volume")): continue
+        sub = df[[cols[k] for k in ("open", "high", "low", "close", "volume")]].astype(float)
+        sub = sub[sub.iloc[:, 3].notna()]
+        if len(sub) < min_bars: continue
+        symbols.append(sym)
+        series.append(sub.to_numpy())
+
+    lengths = np.array([len(s) for s in series], dtype=int)
+    T = int(lengths.max()) if len(series) else 0
+    data = np.full((5, len(series), T), np.nan)
+    for i, s in enumerate(series):
+        data[:, i, T - len(s):] = s.T
+
+    return {
+        "symbols": symbols, "lengths": lengths,
+        "open": data[0], "high": data[1], "low": data[2], "close": data[3], "volume": data[4],
+    }
+
+
+def compute_panel_indicators(panel):
+    """Adds EMA/RSI/ADX/ATR/VWAP/VolRatio (N, T) arrays to the panel in one pass"""
+    o, h, l, c, v = panel["open"], panel["high"], panel["low"], panel["close"], panel["volume"]
+    valid = ~np.isnan(c)
+    a14 = 1 / 14
+    with np.errstate(invalid="ignore", divide="ignore"):
+        panel["EMA20"] = _ewm(c, 2 / 21)
+        panel["EMA50"] = _ewm(c, 2 / 51)
+        panel["EMA200"] = _ewm(c, 2 / 201)
+
+        tp_v = np.where(valid, (h + l + c) / 3 * v, 0.0)
+        cum_v = np.where(valid, v, 0.0).cumsum(axis=1)
+        panel["VWAP"] = np.where(valid, tp_v.cumsum(axis=1) / cum_v, np.nan)
+
+        # RSI (Wilder)
+        prev_c = np.concatenate([np.full((c.shape[0], 1), np.nan), c[:, :-1]], axis=1)
+        delta = c - prev_c
+        gain = np.where(valid, np.where(delta > 0, delta, 0.0), np.nan)
+        loss = np.where(valid, np.where(delta < 0, -delta, 0.0), np.nan)
+        panel["RSI"] = 100 - (100 / (1 + _ewm(gain, a14) / _nz(_ewm(loss, a14))))
+
+        # ATR / ADX (Wilder)
+        tr = np.fmax(h - l, np.fmax(np.abs(h - prev_c), np.abs(l - prev_c)))
+        prev_h = np.concatenate([np.full((h.shape[0], 1), np.nan), h[:, :-1]], axis=1)
+        prev_l = np.concatenate([np.full((l.shape[0], 1), np.nan), l[:, :-1]], axis=1)
+        up_move = h - prev_h
+        down_move = prev_l - l
+        plus_dm = np.where(valid, np.where((up_move > down_move) & (up_move > 0), up_move, 0.0), np.nan)
+        minus_dm = np.where(valid, np.where((down_move > up_move) & (down_move > 0), down_move, 0.0), np.nan)
+
+        atr = _ewm(tr, a14)
+        plus_di = 100 * (_ewm(plus_dm, a14) / _nz(atr))
+        minus_di = 100 * (_ewm(minus_dm, a14) / _nz(atr))
+        dx = 100 * np.abs(plus_di - minus_di) / _nz(plus_di + minus_di)
+        panel["ADX"] = _ewm(dx, a14)
+        panel["ATR"] = atr
+
+        panel["VolRatio"] = v / _rolling_mean(v, 20)
+    return panel
+
+
+def latest_table(panel, prev=False):
+    """Per-symbol last-bar table (index = symbol) ready for ranking"""
+    cols = ["Open", "High", "Low", "Close", "Volume"] + PANEL_COLUMNS
+    if not panel["symbols"]:
+        return pd.DataFrame(columns=cols + ["Bars"])
+    data = {col: panel[col.lower() if col in ("Open", "High", "Low", "Close", "Volume") else col][:, -1] for col in cols}
+    if prev:
+        for col in ("Close", "ATR"):
+            src = panel[col.lower() if col == "Close" else col]
+            data[f"{col}_Prev"] = src[:, -2] if src.shape[1] > 1 else np.full(src.shape[0], np.nan)
+    data["Bars"] = panel["lengths"]
+    return pd.DataFrame(data, index=pd.Index(panel["symbols"], name="Symbol"))
+
+
+def symbol_frame_columns(panel, symbol, length):
+    """Returns {column: array} of the panel indicators for one symbol's last `length` bars"""
+    i = panel["symbols"].index(symbol)
+    return {col: panel[col][i, -length:] for col in PANEL_COLUMNS}
+
+
+def scan_panel(frames, min_bars=20, prev=False):
+    """🏛 Frames {symbol: df} -> latest-row indicator table for the universe"""
+    panel = compute_panel_indicators(build_panel(frames, min_bars=min_bars))
+    return latest_table(panel, prev=prev)
@@ -0,0 +1,395 @@
+"""
+Streaming Indicator Engine - O(1) per-bar updates
+Keeps per-(instrument, timeframe) state so scanners only fold in the bars that
+changed instead of recomputing EMA/RSI/ADX/ATR/VWAP/Supertrend/StochRSI over
+the whole history every cycle.
+
+Two styles mirror the two batch implementations:
+- "wilder": services.market_engine.calculate_indicators (Title Case columns)
+- "sma":    engine.indicators.calculate_indicators (lower case columns)
+"""
+import json
+import math
+import os
+import threading
+from collections import deque
+
+import pandas as pd
+
+STYLE_WILDER = "wilder"
+STYLE_SMA = "sma"
+STATE_FILE = "data/indicator_state.json"
+
+NAN = float("nan")
+
+
+def _isnan(x):
+    return x is None or (isinstance(x, float) and math.isnan(x))
+
+
+def _div(a, b):
+    """Division with numpy semantics (x/0 -> ±inf, 0/0 -> nan)"""
+    if _isnan(a) or _isnan(b):
+        return NAN
+    if b == 0:
+        if a == 0:
+            return NAN
+        return math.copysign(math.inf, a) * math.copysign(1.0, b)
+    return a / b
+
+
+def _nz(x, repl=0.001):
+    """Mirror of pandas `.replace(0, 0.001)`"""
+    return repl if x == 0 else x
+
+
+def _ewm(prev, x, alpha):
+    """ewm(adjust=False) step: first value seeds the average"""
+    if prev is None:
+        return x
+    return alpha * x + (1 - alpha) * prev
+
+
+def _window_mean(window):
+    """rolling(n).mean() over a full deque (NaN if short or any NaN)"""
+    if len(window) < window.maxlen:
+        return NAN
+    total = 0.0
+    for v in window:
+        if _isnan(v):
+            return NAN
+        total += v
+    return total / window.maxlen
+
+
+class IndicatorState:
+    """Committed indicator state for one (instrument, timeframe) pair"""
+
+    __slots__ = (
+        "style", "n", "first_ts", "last_ts",
+        "prev_close", "prev_high", "prev_low",
+        "ema20", "ema50", "ema200", "cum_tpv", "cum_vol",
+        "gain", "loss", "atr", "plus_dm", "minus_dm", "adx",
+        "gain_win", "loss_win", "tr_win", "pdm_win", "mdm_win", "dx_win",
+        "st_tr_win", "st_upper", "st_lower", "st_dir",
+        "ha_open", "ha_close", "ha_gain", "ha_loss", "ha_rsi_win",
+        "vol_win",
+    )
+
+    DEQUES = {
+        "gain_win": 14, "loss_win": 14, "tr_win": 14, "pdm_win": 14, "mdm_win": 14, "dx_win": 14,
+        "st_tr_win": 10, "ha_rsi_win": 14, "vol_win": 20,
+    }
+
+    def __init__(self, style=STYLE_WILDER):
+        self.style = style
+        self.n = 0
+        self.first_ts = None
+        self.last_ts = None
+        for name in self.__slots__:
+            if name in ("style", "n", "first_ts", "last_ts"):
+                continue
+            if name in self.DEQUES:
+                setattr(self, name, deque(maxlen=self.DEQUES[name]))
+            else:
+                setattr(self, name, None)
+        self.st_dir = 0
+
+    def clone(self):
+        other = IndicatorState.__new__(IndicatorState)
+        for name in self.__slots__:
+            val = getattr(self, name)
+            if isinstance(val, deque):
+                val = deque(val, maxlen=val.maxlen)
+            setattr(other, name, val)
+        return other
+
+    def to_dict(self):
+        data = {}
+        for name in self.__slots__:
+            val = getattr(self, name)
+            if isinstance(val, deque):
+                val = list(val)
+            elif isinstance(val, pd.Timestamp):
+                val = val.isoformat()
+            data[name] = val
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        state = cls(data.get("style", STYLE_WILDER))
+        for name in cls.__slots__:
+            if name not in data:
+                continue
+            val = data[name]
+            if name in cls.DEQUES:
+                val = deque(val or [], maxlen=cls.DEQUES[name])
+            elif name in ("first_ts", "last_ts") and val is not None:
+                val = pd.Timestamp(val)
+            setattr(state, name, val)
+        return state
+
+
+def _step_wilder(s, o, h, l, c, v):
+    """Advance a Title Case (market_engine) state by one bar, return the row"""
+    a14 = 1 / 14
+    first = s.n == 0
+
+    s.ema20 = _ewm(s.ema20, c, 2 / 21)
+    s.ema50 = _ewm(s.ema50, c, 2 / 51)
+    s.ema200 = _ewm(s.ema200, c, 2 / 201)
+
+    s.cum_tpv = (s.cum_tpv or 0.0) + (h + l + c) / 3 * v
+    s.cum_vol = (s.cum_vol or 0.0) + v
+    vwap = _div(s.cum_tpv, s.cum_vol)
+
+    # RSI (Wilder)
+    delta = NAN if first else c - s.prev_close
+    s.gain = _ewm(s.gain, delta if (not first and delta > 0) else 0.0, a14)
+    s.loss = _ewm(s.loss, -delta if (not first and delta < 0) else 0.0, a14)
+    rsi = 100 - (100 / (1 + s.gain / _nz(s.loss)))
+
+    # ATR / ADX (Wilder)
+    if first:
+        tr = h - l
+        up_move = down_move = NAN
+    else:
+        tr = max(h - l, abs(h - s.prev_close), abs(l - s.prev_close))
+        up_move = h - s.prev_high
+        down_move = s.prev_low - l
+    pdm = up_move if (not first and up_move > down_move and up_move > 0) else 0.0
+    mdm = down_move if (not first and down_move > up_move and down_move > 0) else 0.0
+    s.atr = _ewm(s.atr, tr, a14)
+    s.plus_dm = _ewm(s.plus_dm, pdm, a14)
+    s.minus_dm = _ewm(s.minus_dm, mdm, a14)
+    plus_di = 100 * (s.plus_dm / _nz(s.atr))
+    minus_di = 100 * (s.minus_dm / _nz(s.atr))
+    dx = 100 * abs(plus_di - minus_di) / _nz(plus_di + minus_di)
+    s.adx = _ewm(s.adx, dx, a14)
+
+    # Supertrend (10, 3) with carried bands
+    s.st_tr_win.append(tr)
+    atr_st = _window_mean(s.st_tr_win)
+    hl2 = (h + l) / 2
+    upper = hl2 + 3.0 * atr_st
+    lower = hl2 - 3.0 * atr_st
+    if first:
+        supertrend = 0.0
+    else:
+        if c > s.st_upper:
+            s.st_dir = 1
+        elif c < s.st_lower:
+            s.st_dir = -1
+        else:
+            if s.st_dir == 1 and lower < s.st_lower: lower = s.st_lower
+            if s.st_dir == -1 and upper > s.st_upper: upper = s.st_upper
+        supertrend = lower if s.st_dir == 1 else upper
+    s.st_upper, s.st_lower = upper, lower
+
+    # Heikin Ashi + StochRSI on HA close
+    ha_close = (o + h + l + c) / 4
+    ha_open = o if first else (s.ha_open + s.ha_close) / 2
+    ha_delta = NAN if first else ha_close - s.ha_close
+    s.ha_gain = _ewm(s.ha_gain, ha_delta if (not first and ha_delta > 0) else 0.0, a14)
+    s.ha_loss = _ewm(s.ha_loss, -ha_delta if (not first and ha_delta < 0) else 0.0, a14)
+    ha_rsi = 100 - (100 / (1 + s.ha_gain / _nz(s.ha_loss)))
+    s.ha_rsi_win.append(ha_rsi)
+    if len(s.ha_rsi_win) == s.ha_rsi_win.maxlen:
+        lo, hi = min(s.ha_rsi_win), max(s.ha_rsi_win)
+        stoch_rsi = (ha_rsi - lo) / _nz(hi - lo)
+    else:
+        stoch_rsi = NAN
+    s.ha_open, s.ha_close = ha_open, ha_close
+
+    s.vol_win.append(v)
+    vol_ratio = _div(v, _window_mean(s.vol_win))
+
+    return {
+        "Open": o, "High": h, "Low": l, "Close": c, "Volume": v,
+        "EMA20": s.ema20, "EMA50": s.ema50, "EMA200": s.ema200, "VWAP": vwap,
+        "RSI": rsi, "ADX": s.adx, "ATR": s.atr, "Supertrend": supertrend,
+        "StochRSI": stoch_rsi, "HA_Close": ha_close,
+        "HA_Status": "Bullish HA" if ha_close > ha_open else "Bearish HA",
+        "VolRatio": vol_ratio,
+    }
+
+
+def _step_sma(s, o, h, l, c, v):
+    """Advance a lower case (engine.indicators) state by one bar, return the row"""
+    first = s.n == 0
+
+    delta = NAN if first else c - s.prev_close
+    s.gain_win.append(delta if (not first and delta > 0) else 0.0)
+    s.loss_win.append(-delta if (not first and delta < 0) else 0.0)
+    rsi = 100 - _div(100, 1 + _div(_window_mean(s.gain_win), _window_mean(s.loss_win)))
+
+    s.ema20 = _ewm(s.ema20, c, 2 / 21)
+
+    if first:
+        tr = NAN
+        up_move = down_move = NAN
+    else:
+        tr = max(h - l, abs(h - s.prev_close), abs(l - s.prev_close))
+        up_move = h - s.prev_high
+        down_move = s.prev_low - l
+    s.tr_win.append(tr)
+    atr = _window_mean(s.tr_win)
+
+    s.pdm_win.append(up_move if (not first and up_move > down_move and up_move > 0) else 0.0)
+    s.mdm_win.append(down_move if (not first and down_move > up_move and down_move > 0) else 0.0)
+    plus_di = 100 * _div(_window_mean(s.pdm_win), atr)
+    minus_di = 100 * _div(_window_mean(s.mdm_win), atr)
+    dx = 100 * _div(abs(plus_di - minus_di), plus_di + minus_di)
+    s.dx_win.append(dx)
+    adx = _window_mean(s.dx_win)
+
+    s.cum_tpv = (s.cum_tpv or 0.0) + (h + l + c) / 3 * v
+    s.cum_vol = (s.cum_vol or 0.0) + v
+
+    return {
+        "open": o, "high": h, "low": l, "close": c, "volume": v,
+        "rsi": rsi, "ema20": s.ema20, "atr": atr, "plus_di": plus_di, "minus_di": minus_di,
+        "adx": adx, "vwap": _div(s.cum_tpv, s.cum_vol),
+    }
+
+
+_STEPS = {STYLE_WILDER: _step_wilder, STYLE_SMA: _step_sma}
+
+
+def advance(state, bar, ts=None):
+    """Fold one closed bar (o, h, l, c, v) into `state` in place, return the row"""
+    o, h, l, c, v = (float(x) for x in bar)
+    row = _STEPS[state.style](state, o, h, l, c, v)
+    state.prev_close, state.prev_high, state.prev_low = c, h, l
+    if state.n == 0:
+        state.first_ts = ts
+    state.n += 1
+    state.last_ts = ts
+    return row
+
+
+def _bar_rows(df):
+    """Yield (ts, (o, h, l, c, v)) from a candle frame of either column case"""
+    cols = {c.lower(): c for c in df.columns}
+    o, h, l, c, v = (df[cols[k]].to_numpy(dtype=float) for k in ("open", "high", "low", "close", "volume"))
+    for i, ts in enumerate(df.index):
+        yield ts, (o[i], h[i], l[i], c[i], v[i])
+
+
+class StreamingIndicatorEngine:
+    """
+    Incremental indicator engine
+    - on_bar_close(): commit a finished bar (O(1))
+    - on_bar_update(): evaluate the forming bar without committing (O(1))
+    - sync(): feed a candle frame, only bars newer than the state are processed
+    """
+
+    def __init__(self, state_file=STATE_FILE):
+        self.state_file = state_file
+        self.states = {}   # (instrument, timeframe) -> IndicatorState
+        self.latest_rows = {}  # (instrument, timeframe) -> last evaluated row
+        self.lock = threading.Lock()
+
+    def _get_state(self, instrument, timeframe, style):
+        key = (instrument, timeframe)
+        state = self.states.get(key)
+        if state is None or state.style != style:
+            state = IndicatorState(style)
+            self.states[key] = state
+        return state
+
+    def on_bar_close(self, instrument, timeframe, bar, ts=None, style=STYLE_WILDER):
+        with self.lock:
+            state = self._get_state(instrument, timeframe, style)
+            row = advance(state, bar, ts)
+            self.latest_rows[(instrument, timeframe)] = row
+            return row
+
+    def on_bar_update(self, instrument, timeframe, bar, ts=None, style=STYLE_WILDER):
+        with self.lock:
+            state = self._get_state(instrument, timeframe, style).clone()
+            row = advance(state, bar, ts)
+            self.latest_rows[(instrument, timeframe)] = row
+            return row
+
+    def sync(self, instrument, timeframe, df, style=STYLE_WILDER):
+        """
+        Bring the state up to date with a candle frame and return the last row.
+        All rows but the last are committed; the last row is treated as the
+        forming bar. If the frame no longer starts where the state started
+        (new session, different lookback) the state is rebuilt from the frame
+        so results stay identical to the batch calculation on that frame.
+        """
+        if df is None or df.empty:
+            return None
+        key = (instrument, timeframe)
+        with self.lock:
+            state = self.states.get(key)
+            if (state is None or state.style != style or state.n == 0
+                    or state.first_ts != df.index[0] or df.index[-1] <= state.last_ts):
+                state = IndicatorState(style)
+                self.states[key] = state
+
+            rows = list(_bar_rows(df))
+            for ts, bar in rows[:-1]:
+                if state.n and ts <= state.last_ts:
+                    continue
+                advance(state, bar, ts)
+
+            last_ts, last_bar = rows[-1]
+            row = advance(state.clone(), last_bar, last_ts)
+            self.latest_rows[key] = row
+            return row
+
+    def latest(self, instrument, timeframe):
+        return self.latest_rows.get((instrument, timeframe))
+
+    def reset(self, instrument=None, timeframe=None):
+        with self.lock:
+            if instrument is None:
+                self.states.clear()
+                self.latest_rows.clear()
+                return
+            for key in [k for k in self.states if k[0] == instrument and (timeframe is None or k[1] == timeframe)]:
+                self.states.pop(key, None)
+                self.latest_rows.pop(key, None)
+
+    def save_state(self, path=None):
+        """Persist committed states so a restart resumes without a full warm-up"""
+        path = path or self.state_file
+        try:
+            with self.lock:
+                data = {f"{inst}@{tf}": st.to_dict() for (inst, tf), st in self.states.items()}
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            with open(path, "w") as f:
+                json.dump(data, f, default=str)
+            return True
+        except Exception as e:
+            print(f"Indicator state save error: {e}")
+            return False
+
+    def load_state(self, path=None):
+        path = path or self.state_file
+        if not os.path.exists(path):
+            return 0
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+            with self.lock:
+                for k, v in data.items():
+                    inst, _, tf = k.rpartition("@")
+                    self.states[(inst, tf)] = IndicatorState.from_dict(v)
+            return len(data)
+        except Exception as e:
+            print(f"Indicator state load error: {e}")
+            return 0
+
+
+# Singleton
+_streaming_engine = None
+
+def get_streaming_engine():
+    global _streaming_engine
+    if _streaming_engine is None:
+        _streaming_engine = StreamingIndicatorEngine()
+    return _streaming_engine
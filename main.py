@@ -8,8 +8,10 @@ from services.upstox_engine import get_upstox_engine
 from services.upstox_streamer import get_streamer, get_live_ltp
 from scanners.index_scanner import get_index_bias, run_index_scan
 from scanners.stock_scanner import run_parallel_stock_scan
+from scanners.sharded_scanner import run_sharded_stock_scan
+from services.event_scheduler import get_scan_scheduler
 from utils.logger import setup_logger
-from pro_config import SCAN_INDICES, NIFTY_50_STOCKS
+from pro_config import SCAN_INDICES, NIFTY_50_STOCKS, SHARDED_SCAN_MIN
 
 # --- STARTUP VALIDATION ---
 logger = setup_logger("MainController")
@@ -64,8 +66,15 @@ def main():
     
     logger.info("🏛 Initializing Institutional Control Architecture...")
 
-    last_scan_time = 0
-    SCAN_INTERVAL = 300 # 5 Minutes Default
+    # 5. Event-Driven Stock Scheduling (ticks, 5m bar closes -> 1m in power window, chain OI)
+    from services.chain_service import get_chain_service
+    scan_scheduler = get_scan_scheduler()
+    scan_scheduler.watch({s: instrument_map[s] for s in fo_symbols if s in instrument_map})
+    streamer.add_tick_listener(scan_scheduler.on_tick)
+    get_chain_service().add_listener(scan_scheduler.on_chain_refresh)
+    scan_scheduler.start_clock()
+    scan_scheduler.on_bar_close()  # Full sweep on startup
+
     POWER_WINDOW_SENT = False
     bias = {}
 
@@ -83,7 +92,7 @@ def main():
 
             # --- 📡 INSTITUTIONAL MODE CHECK ---
             nifty_key = instrument_map.get("NIFTY")
-            nifty_ltp = (get_live_ltp(nifty_key) or 0) if nifty_key else 0
+            nifty_ltp = (get_live_ltp(nifty_key)[0] or 0) if nifty_key else 0
             if nifty_ltp == 0 and 'bias' in locals() and isinstance(bias, dict) and not bias.get('nifty_df', pd.DataFrame()).empty:
                 nifty_ltp = bias['nifty_df']['close'].iloc[-1]
                 
@@ -100,13 +109,10 @@ def main():
 
             # --- ⚡ 3 PM POWER WINDOW OVERRIDE ---
             is_power_window = (now.hour == 15 and 0 <= now.minute < 20)
-            if is_power_window:
-                SCAN_INTERVAL = 60 
-                if not POWER_WINDOW_SENT:
-                    logger.info("🔥 3 PM POWER WINDOW ACTIVE - High Frequency (Every 60s)...")
-                    POWER_WINDOW_SENT = True
-            else:
-                SCAN_INTERVAL = 300 # Reset to 5 mins
+            scan_scheduler.set_power_mode(is_power_window)
+            if is_power_window and not POWER_WINDOW_SENT:
+                logger.info("🔥 3 PM POWER WINDOW ACTIVE - High Frequency (1m bars, 0.15% moves)...")
+                POWER_WINDOW_SENT = True
 
             # TIER 1: Get Index Bias & Sentiment
             logger.info(f"📡 Index Scan Started [Mode: {mode}]...")
@@ -115,14 +121,19 @@ def main():
             # Run Index Scan with Sentiment Integration
             run_index_scan(engine, instrument_map, bias)
             
-            # TIER 2: Run Stock Scanner if Interval Reached
-            if current_ts - last_scan_time >= SCAN_INTERVAL:
+            # TIER 2: Scan only the stocks with a pending event (move / bar close / OI)
+            pending = scan_scheduler.drain()
+            if pending:
                 tag_suffix = " 🏛️ 3PM POWER" if is_power_window else ""
                 if mode == "VOLATILE": tag_suffix += " ⚠️ VOLATILE"
                 
-                logger.info(f"🚀 Stock Scan Started{tag_suffix} (ADX: {bias.get('adx', 0):.1f})...")
-                run_parallel_stock_scan(engine, instrument_map, bias)
-                last_scan_time = current_ts
+                logger.info(f"🚀 Stock Scan Started{tag_suffix} ({len(pending)} symbols, ADX: {bias.get('adx', 0):.1f})...")
+                if len(pending) >= SHARDED_SCAN_MIN:
+                    run_sharded_stock_scan(engine, instrument_map, bias, symbols=pending)
+                else:
+                    run_parallel_stock_scan(engine, instrument_map, bias, symbols=pending)
+                for sym in pending:
+                    scan_scheduler.done(sym, get_live_ltp(instrument_map[sym])[0])
                 logger.info("✅ Parallel Scan Cycle Complete.")
 
             time.sleep(5) 
@@ -18,8 +18,12 @@ if sys.stdout.encoding.lower() != 'utf-8':
 
 from utils.logger import setup_logger
 from services.upstox_engine import get_upstox_engine
-from config.config import ALL_FO_STOCKS, OPTION_CHAIN_CONFIG, INDEX_WEIGHTS
+from services.chain_service import get_chain_service
+from config.config import ALL_FO_STOCKS, OPTION_CHAIN_CONFIG, INDEX_WEIGHTS, FUNNEL_CONFIG
 from services.market_engine import calculate_indicators, flatten_columns
+from engine.panel_indicators import scan_panel
+from services.universe_funnel import screen_universe, log_funnel
+from services.daily_features import get_daily_features
 from services.upstox_streamer import get_streamer, get_live_ltp
 from config.extended_stocks import EXTENDED_STOCKS_LIST
 
@@ -83,7 +87,7 @@ def is_new_5min_candle():
 def get_expiry_list(engine, key):
     """🗂 Step 1: Fetch Expiry Dates"""
     try:
-        expiries = engine.get_expiry_dates_via_sdk(key)
+        expiries = engine.get_expiry_dates(key)
         return sorted(expiries)
     except: return []
 
@@ -175,11 +179,11 @@ def calculate_position_sizing(capital, entry_px, sl_px, symbol):
     """🏛️ Risk-Based Position Sizing (2% Rule)"""
     risk_amount = capital * RISK_PER_TRADE_PCT
     
-    # Get Lot Size
+    # Get Lot Size (stocks: instrument master lot via the daily feature table)
     lot_size = LOT_SIZES.get(symbol, 1)
     if lot_size == 1:
-        # Try to infer for stocks (usually 250-1000)
-        lot_size = 1 # We'll fetch real one in main loop or use 1 for cash
+        feat_lot = get_daily_features().get(symbol).get("lot_size")
+        lot_size = int(feat_lot) if feat_lot and not pd.isna(feat_lot) else 1
         
     risk_per_point = abs(entry_px - sl_px)
     if risk_per_point == 0: return 0
@@ -215,7 +219,17 @@ def classify_trend(df, mtf_df=None):
         
     last = df.iloc[-1]
     prev = df.iloc[-2]
-    
+    return classify_trend_row(last, last['ATR'] > prev['ATR'], mtf_df)
+
+def classify_daily_trend(feat):
+    """🏛️ Daily leg of the trend model from the pre-market feature table (last full day)"""
+    if not feat or not feat.get("bars", 0) >= 50: return "NEUTRAL"
+    last = {"Close": feat["prev_close"], "EMA20": feat["d_ema20"], "EMA50": feat["d_ema50"],
+            "EMA200": feat["d_ema200"], "ADX": feat["d_adx"], "RSI": feat["d_rsi"], "VWAP": feat["d_vwap"]}
+    return classify_trend_row(last, feat["atr"] > feat["d_atr_prev"])
+
+def classify_trend_row(last, atr_expanding, mtf_df=None):
+    """🏛️ Trend classification from a single latest row (DataFrame row or panel table row)"""
     close = last['Close']
     ema20 = last['EMA20']
     ema50 = last['EMA50']
@@ -223,7 +237,6 @@ def classify_trend(df, mtf_df=None):
     adx = last['ADX']
     rsi = last['RSI']
     vwap = last['VWAP']
-    atr_expanding = last['ATR'] > prev['ATR']
     
     # --- 1. STRONG BULLISH ---
     if (close > ema20 > ema50 > ema200 and 
@@ -380,12 +393,17 @@ class MarshMuthuProScanner:
         self.refresh_momentum_list()
         
     def refresh_momentum_list(self):
-        """🔍 Layer 2: Momentum Expansion Detection (Filter 180 -> Top 20)"""
+        """🔍 Layer 2: Momentum Expansion Detection (Filter 180 -> Quote Shortlist -> Top 20)"""
         logger.info("Refreshing Momentum Shortlist (Deep Scan)...")
         candidates = []
-        symbols = list(self.instrument_map.keys())
+        stock_keys = {s: k for s, k in self.instrument_map.items() if s not in ["NIFTY", "BANKNIFTY", "FINNIFTY"]}
+        
+        # Stage 1: one bulk quote screen over the universe; only the shortlist gets candle fetches
+        symbols, _, report = screen_universe(self.engine, stock_keys, size=FUNNEL_CONFIG["shortlist_size"])
         
-        # We can't scan all 180 perfectly in one go without high API load, so we batch
+        # Stage 2: candle fetches are batched to limit API load
+        t0 = time.time()
+        frames = {}
         for i in range(0, len(symbols), 20):
             chunk = symbols[i:i+20]
             for sym in chunk:
@@ -393,23 +411,28 @@ class MarshMuthuProScanner:
                     key = self.instrument_map[sym]
                     df = self.engine.get_intraday_candles(key, interval="5minute")
                     if df.empty or len(df) < 50: continue
-                    
-                    df = calculate_indicators(df)
-                    
-                    # 🏛️ Apply Trend Classification (Filtering 180 -> Momentum Stocks)
-                    trend = classify_trend(df)
-                    
-                    if trend in ["STRONG BULLISH", "STRONG BEARISH"]:
-                        # Calculate Score for ranking
-                        vol_spike = df['volume'].iloc[-1] / df['volume'].rolling(20).mean().iloc[-1]
-                        score = vol_spike * 1.5 + df['ADX'].iloc[-1] * 0.5
-                        candidates.append({"symbol": sym, "m_score": score, "trend": trend})
+                    frames[sym] = df
                 except: continue
             time.sleep(0.5)
+        
+        # 📊 One panel pass over the shortlist instead of per-symbol DataFrames
+        table = scan_panel(frames, min_bars=50, prev=True)
+        for sym, last in table.iterrows():
+            try:
+                # 🏛️ Apply Trend Classification (Filtering Shortlist -> Momentum Stocks)
+                trend = classify_trend_row(last, last['ATR'] > last['ATR_Prev'])
+                
+                if trend in ["STRONG BULLISH", "STRONG BEARISH"]:
+                    # Calculate Score for ranking
+                    score = last['VolRatio'] * 1.5 + last['ADX'] * 0.5
+                    candidates.append({"symbol": sym, "m_score": score, "trend": trend})
+            except: continue
             
-        # Sort and take top 25
+        # Sort and take the configured top N
         candidates.sort(key=lambda x: x['m_score'], reverse=True)
-        self.momentum_list = [c['symbol'] for c in candidates[:25]]
+        self.momentum_list = [c['symbol'] for c in candidates[:FUNNEL_CONFIG["final_size"]]]
+        report.update(with_candles=len(frames), selected=len(self.momentum_list), candles_s=round(time.time() - t0, 2))
+        log_funnel("momentum", report)
         # Always include indices
         for idx in ["NIFTY", "BANKNIFTY", "FINNIFTY"]:
             if idx not in self.momentum_list: self.momentum_list.append(idx)
@@ -467,11 +490,9 @@ class MarshMuthuProScanner:
                 # Fetch Multi-Timeframe Data
                 df5m = self.engine.get_intraday_candles(key, interval="5minute")
                 df15m = self.engine.get_intraday_candles(key, interval="15minute")
-                df_daily = self.engine.get_historical_candles(key, interval="day", days=30)
                 
                 df5m = calculate_indicators(df5m)
                 df15m = calculate_indicators(df15m)
-                df_daily = calculate_indicators(df_daily)
                 
                 # RS Calculation vs Nifty
                 rs_val = calculate_relative_strength(df5m, nifty_df)
@@ -479,7 +500,7 @@ class MarshMuthuProScanner:
                 # MTF Trend Alignment
                 trend_5m = classify_trend(df5m)
                 trend_15m = classify_trend(df15m)
-                trend_daily = classify_trend(df_daily)
+                trend_daily = classify_daily_trend(get_daily_features().get(sym))
                 alignment = mtf_alignment(trend_5m, trend_15m, trend_daily)
                 
                 direction = "LONG" if "BULLISH" in trend_5m else "SHORT" if "BEARISH" in trend_5m else None
@@ -502,22 +523,20 @@ class MarshMuthuProScanner:
                 strike = get_atm_strike(spot_px, sym)
                 
                 # Step 4: Suggest CE/PE Entry with Real Premium
-                chain = self.engine.get_option_chain_via_sdk(key, next_expiry)
-                if not chain: continue
+                chain = get_chain_service().get_chain(self.engine, key, next_expiry, underlying=sym)
+                if not len(chain): continue
                 
                 # Calculate Stock PCR & Bias for real-time edge
-                total_ce_oi = sum(c.call_options.market_data.oi for c in chain if c.call_options and c.call_options.market_data)
-                total_pe_oi = sum(c.put_options.market_data.oi for c in chain if c.put_options and c.put_options.market_data)
-                stock_pcr = round(total_pe_oi / total_ce_oi, 2) if total_ce_oi > 0 else 1.0
+                stock_pcr = round(chain.pcr(), 2) if chain.ce_oi.sum() > 0 else 1.0
                 
                 # Find Target ATM Contract LTP
-                target_contract = next((c for c in chain if c.strike_price == strike), None)
-                if not target_contract: continue
+                idx = chain.find(strike, tol=1e-6)
+                if idx is None: continue
                 
-                option_data = target_contract.call_options if direction == "LONG" else target_contract.put_options
-                if not option_data or not option_data.market_data: continue
+                opt_side = "CE" if direction == "LONG" else "PE"
+                if not chain.side(opt_side, "present")[idx]: continue
                 
-                entry_premium = float(option_data.market_data.ltp)
+                entry_premium = float(chain.side(opt_side, "ltp")[idx])
                 if entry_premium < 20: continue # Filter low-value junk options
                 
                 # Scoring with RS bonus
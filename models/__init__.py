@@ -3,9 +3,10 @@ from .trade_models import (
     Greeks, Strategy, Trade, Position, PerformanceMetrics,
     MarketCondition, OptionContract, StrategySignal
 )
+from .chain_snapshot import ChainSnapshot
 
 __all__ = [
     'OptionType', 'StrategyType', 'TradeStatus', 'RiskLevel', 'TrendType',
     'Greeks', 'Strategy', 'Trade', 'Position', 'PerformanceMetrics',
-    'MarketCondition', 'OptionContract', 'StrategySignal'
+    'MarketCondition', 'OptionContract', 'StrategySignal', 'ChainSnapshot'
 ]
@@ -0,0 +1,153 @@
+"""
+Option chain snapshot - columnar, immutable view of one underlying/expiry chain
+Decoded once from the Upstox response (SDK objects or HTTP dicts) into typed
+NumPy arrays so consumers never walk the SDK objects again.
+"""
+import time
+from dataclasses import dataclass, field
+from typing import Optional, List, Dict, Any
+
+import numpy as np
+import pandas as pd
+
+
+def _field(obj, name, default=None):
+    """Attribute or key access (SDK model or HTTP dict)"""
+    if obj is None:
+        return default
+    if isinstance(obj, dict):
+        value = obj.get(name, default)
+    else:
+        value = getattr(obj, name, default)
+    return default if value is None else value
+
+
+def _frozen(values, dtype):
+    arr = np.asarray(values, dtype=dtype)
+    arr.flags.writeable = False
+    return arr
+
+
+@dataclass(frozen=True, eq=False)
+class ChainSnapshot:
+    """Option chain for one underlying and expiry, sorted by strike"""
+    underlying: str
+    expiry: str
+    spot: float
+    strike: np.ndarray
+    ce_present: np.ndarray
+    pe_present: np.ndarray
+    ce_oi: np.ndarray
+    pe_oi: np.ndarray
+    ce_oi_chg: np.ndarray
+    pe_oi_chg: np.ndarray
+    ce_ltp: np.ndarray
+    pe_ltp: np.ndarray
+    ce_volume: np.ndarray
+    pe_volume: np.ndarray
+    ce_iv: np.ndarray
+    pe_iv: np.ndarray
+    ce_key: np.ndarray
+    pe_key: np.ndarray
+    timestamp: float = field(default_factory=time.time)
+
+    @classmethod
+    def from_response(cls, chain, underlying: str = "", expiry: str = "", spot: Optional[float] = None) -> "ChainSnapshot":
+        """Decodes an SDK chain (list of OptionStrikeData) or the HTTP chain (list of dicts)"""
+        chain = list(chain or [])
+        n = len(chain)
+        cols = {name: np.zeros(n) for name in ("strike", "ce_oi", "pe_oi", "ce_oi_chg", "pe_oi_chg",
+                                               "ce_ltp", "pe_ltp", "ce_volume", "pe_volume")}
+        cols["ce_iv"] = np.full(n, np.nan)
+        cols["pe_iv"] = np.full(n, np.nan)
+        present = {"ce": np.zeros(n, dtype=bool), "pe": np.zeros(n, dtype=bool)}
+        keys = {"ce": np.full(n, "", dtype=object), "pe": np.full(n, "", dtype=object)}
+
+        for i, item in enumerate(chain):
+            cols["strike"][i] = float(_field(item, "strike_price", 0))
+            if spot is None:
+                spot = float(_field(item, "underlying_spot_price", 0)) or None
+            for side, attr in (("ce", "call_options"), ("pe", "put_options")):
+                opt = _field(item, attr)
+                if not opt:
+                    continue
+                keys[side][i] = _field(opt, "instrument_key", "")
+                md = _field(opt, "market_data")
+                if md:
+                    present[side][i] = True
+                    oi = float(_field(md, "oi", 0))
+                    prev_oi = _field(md, "prev_oi")
+                    oi_chg = _field(md, "oi_day_change") or _field(md, "oi_change")
+                    if not oi_chg and prev_oi:
+                        oi_chg = oi - float(prev_oi)
+                    cols[f"{side}_oi"][i] = oi
+                    cols[f"{side}_oi_chg"][i] = float(oi_chg or 0)
+                    cols[f"{side}_ltp"][i] = float(_field(md, "ltp", 0))
+                    cols[f"{side}_volume"][i] = float(_field(md, "volume", 0))
+                iv = _field(_field(opt, "option_greeks"), "iv")
+                if iv:
+                    cols[f"{side}_iv"][i] = float(iv)
+
+        order = np.argsort(cols["strike"], kind="stable")
+        return cls(
+            underlying=underlying, expiry=str(expiry)[:10], spot=float(spot or 0),
+            ce_present=_frozen(present["ce"][order], bool), pe_present=_frozen(present["pe"][order], bool),
+            ce_key=_frozen(keys["ce"][order], object), pe_key=_frozen(keys["pe"][order], object),
+            **{name: _frozen(arr[order], float) for name, arr in cols.items()}
+        )
+
+    def __len__(self):
+        return len(self.strike)
+
+    def find(self, strike: float, tol: float = 0.1) -> Optional[int]:
+        """Index of a strike (binary search), None if not listed"""
+        i = int(np.searchsorted(self.strike, float(strike) - tol))
+        if i < len(self.strike) and abs(self.strike[i] - float(strike)) < tol:
+            return i
+        return None
+
+    def atm_index(self, spot: Optional[float] = None) -> Optional[int]:
+        if not len(self):
+            return None
+        return int(np.abs(self.strike - (spot or self.spot)).argmin())
+
+    def side(self, option_type: str, name: str) -> np.ndarray:
+        """Column for one side: side("CE", "ltp") -> ce_ltp"""
+        return getattr(self, f"{'ce' if option_type == 'CE' else 'pe'}_{name}")
+
+    def instrument_key(self, strike: float, option_type: str) -> Optional[str]:
+        i = self.find(strike)
+        if i is None:
+            return None
+        return self.side(option_type, "key")[i] or None
+
+    def ltp(self, strike: float, option_type: str) -> float:
+        i = self.find(strike)
+        return float(self.side(option_type, "ltp")[i]) if i is not None else 0.0
+
+    def pcr(self) -> float:
+        """PUT/CALL OI ratio (0 when no call OI)"""
+        ce = self.ce_oi.sum()
+        return float(self.pe_oi.sum() / ce) if ce > 0 else 0.0
+
+    def to_frame(self) -> pd.DataFrame:
+        """Analysis DataFrame (strike, call_/put_ oi, oi_chg, ltp, volume, iv)"""
+        return pd.DataFrame({
+            "strike": self.strike,
+            "call_oi": self.ce_oi, "put_oi": self.pe_oi,
+            "call_oi_chg": self.ce_oi_chg, "put_oi_chg": self.pe_oi_chg,
+            "call_ltp": self.ce_ltp, "put_ltp": self.pe_ltp,
+            "call_volume": self.ce_volume, "put_volume": self.pe_volume,
+            "call_iv": self.ce_iv, "put_iv": self.pe_iv,
+        })
+
+    def to_records(self) -> List[Dict[str, Any]]:
+        """Per-strike dicts in the {"strike", "CE": {...}, "PE": {...}} shape"""
+        return [
+            {
+                "strike": float(self.strike[i]),
+                "CE": {"oi": float(self.ce_oi[i]), "oi_change": float(self.ce_oi_chg[i]), "ltp": float(self.ce_ltp[i])},
+                "PE": {"oi": float(self.pe_oi[i]), "oi_change": float(self.pe_oi_chg[i]), "ltp": float(self.pe_ltp[i])},
+            }
+            for i in range(len(self))
+        ]
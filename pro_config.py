@@ -59,6 +59,14 @@ DAILY_LIMITS = {
 SUMMARY_INTERVAL = 900  # 15 mins
 CANDLE_CYCLE = 300      # 5 mins
 
+# Shared option chain service (seconds)
+CHAIN_TTL = int(os.getenv("CHAIN_TTL", 60))              # Served as fresh
+CHAIN_STALE_TTL = int(os.getenv("CHAIN_STALE_TTL", 600)) # Served stale while one refresh runs
+
+# Multi-process stock scan (scanners.sharded_scanner)
+SCAN_PROCESSES = int(os.getenv("SCAN_PROCESSES", os.cpu_count() or 2))
+SHARDED_SCAN_MIN = 10   # pending symbols below this stay on the in-process thread scan
+
 # ==========================================
 # 📂 FILE PATHS
 # ==========================================
@@ -3,6 +3,7 @@ import time
 import pandas as pd
 from datetime import datetime
 from engine.indicators import calculate_indicators
+from engine.streaming_indicators import get_streaming_engine, STYLE_SMA
 from engine.regime_detector import detect_market_regime
 from utils.logger import setup_logger
 from utils.telegram_alert import send_trade_alert
@@ -78,11 +79,10 @@ def run_index_scan(engine, instrument_map, bias):
             
             if df_5m.empty or len(df_5m) < 20 or df_1m.empty: continue
             
-            df_5m = calculate_indicators(df_5m)
-            df_1m = calculate_indicators(df_1m)
-            
-            lat_5m = df_5m.iloc[-1]
-            lat_1m = df_1m.iloc[-1]
+            # Incremental indicators: only bars newer than the cached state are folded in
+            stream = get_streaming_engine()
+            lat_5m = stream.sync(key, "5minute", df_5m, style=STYLE_SMA)
+            lat_1m = stream.sync(key, "1minute", df_1m, style=STYLE_SMA)
             
             # Signal Detection (Simple Logic for MTF check)
             def get_sig(latest):
@@ -167,7 +167,7 @@ def run_index_scan(engine, instrument_map, bias):
             is_3pm = (now_hour == 15)
             force_next = (expiry_pref == "NEXT_WEEK" or is_3pm)
             
-            expiries = engine.get_expiry_dates_via_sdk(key)
+            expiries = engine.get_expiry_dates(key)
             target_expiry = pick_professional_expiry(expiries, symbol=idx_sym, force_next=force_next)
             # 🏛️ 4️⃣ OPTION PICKER & PRICER
             from engine.option_selector import pick_best_strike, get_option_ltp, estimate_target_sl
@@ -0,0 +1,176 @@
+"""
+Sharded Stock Scanner - Multi-process universe scan over shared candle panels
+The coordinator fetches 5m / 1m candles (I/O bound, threads) and packs them
+into two shared-memory OHLCV panels. Worker processes attach to the panels,
+run the indicator + MTF signal pass for their shard of rows and return
+compact SignalRecords. Reversal state, risk gates, option pricing, alerting
+and persistence stay in the coordinator.
+"""
+import time
+import atexit
+import multiprocessing as mp
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from pro_config import NIFTY_50_STOCKS, SCAN_PROCESSES
+from engine.indicators import calculate_indicators
+from scanners.stock_scanner import SignalRecord, stock_signal, build_stock_alert, dispatch_stock_alert, sync_dashboard
+from utils.helpers import load_active_signals, load_daily_stats
+from services.upstox_streamer import get_live_ltp
+from utils.logger import setup_logger
+
+logger = setup_logger("ShardedScanner")
+
+OHLCV = ["open", "high", "low", "close", "volume"]
+MIN_5M_BARS = 20
+FETCH_WORKERS = 10
+
+
+class SharedCandlePanel:
+    """Symbols x bars x OHLCV float64 panel in one shared-memory block (right aligned, NaN padded)"""
+
+    def __init__(self, frames: Dict[str, pd.DataFrame], symbols: List[str]):
+        lengths = [len(frames[s]) if s in frames else 0 for s in symbols]
+        shape = (len(symbols), max(lengths, default=0) or 1, len(OHLCV))
+        self.shm = shared_memory.SharedMemory(create=True, size=int(np.prod(shape)) * 8)
+        panel = None
+        try:
+            panel = np.ndarray(shape, dtype=np.float64, buffer=self.shm.buf)
+            panel[:] = np.nan
+            for i, sym in enumerate(symbols):
+                if lengths[i]:
+                    # Lower-cased view for the lookup; the caller's frame is left as is
+                    df = frames[sym].rename(columns=str.lower)
+                    panel[i, shape[1] - lengths[i]:] = df[OHLCV].to_numpy(dtype=np.float64)
+        except Exception:
+            panel = None  # release the exported buffer before unlinking
+            self.close()
+            raise
+        del panel
+        self.meta = {"name": self.shm.name, "shape": shape, "lengths": lengths}
+
+    def close(self):
+        self.shm.close()
+        self.shm.unlink()
+
+
+def _frame(panel: np.ndarray, row: int, length: int) -> pd.DataFrame:
+    return pd.DataFrame(panel[row, panel.shape[1] - length:], columns=OHLCV)
+
+
+def _scan_shard(meta_5m: Dict, meta_1m: Dict, rows: List[int], symbols: List[str]) -> List[SignalRecord]:
+    """Worker: indicator + MTF signal pass over `rows` of the shared panels"""
+    shm_5m = shared_memory.SharedMemory(name=meta_5m["name"])
+    shm_1m = shared_memory.SharedMemory(name=meta_1m["name"])
+    try:
+        p5 = np.ndarray(meta_5m["shape"], dtype=np.float64, buffer=shm_5m.buf)
+        p1 = np.ndarray(meta_1m["shape"], dtype=np.float64, buffer=shm_1m.buf)
+        records = []
+        for row in rows:
+            n5, n1 = meta_5m["lengths"][row], meta_1m["lengths"][row]
+            if n5 < MIN_5M_BARS or not n1:
+                continue
+            try:
+                df_5m = calculate_indicators(_frame(p5, row, n5))
+                df_1m = calculate_indicators(_frame(p1, row, n1))
+                rec = stock_signal(symbols[row], df_5m.iloc[-1].to_dict(), df_1m.iloc[-1].to_dict(), df_1m)
+                if rec: records.append(rec)
+            except Exception as e:
+                logger.debug(f"Shard error on {symbols[row]}: {e}")
+        del p5, p1
+        return records
+    finally:
+        shm_5m.close()
+        shm_1m.close()
+
+
+# Persistent worker pool (spawned once; workers never inherit the streamer / API threads)
+_scan_pool = None
+
+def get_scan_pool(processes: int = SCAN_PROCESSES) -> ProcessPoolExecutor:
+    global _scan_pool
+    if _scan_pool is None:
+        _scan_pool = ProcessPoolExecutor(max_workers=processes, mp_context=mp.get_context("spawn"))
+        atexit.register(_scan_pool.shutdown, wait=False, cancel_futures=True)
+    return _scan_pool
+
+
+def fetch_candle_panels(engine, instrument_map, symbols):
+    """Concurrent 5m + 1m intraday fetch -> ({sym: df_5m}, {sym: df_1m})"""
+    frames_5m, frames_1m = {}, {}
+
+    def _fetch(sym):
+        key = instrument_map[sym]
+        return sym, engine.get_intraday_candles(key, interval="5minute"), engine.get_intraday_candles(key, interval="1minute")
+
+    with ThreadPoolExecutor(max_workers=FETCH_WORKERS) as pool:
+        for fut in as_completed([pool.submit(_fetch, s) for s in symbols]):
+            try:
+                sym, df_5m, df_1m = fut.result()
+                if not df_5m.empty: frames_5m[sym] = df_5m
+                if not df_1m.empty: frames_1m[sym] = df_1m
+            except Exception as e:
+                logger.debug(f"Candle fetch failed: {e}")
+    return frames_5m, frames_1m
+
+
+def scan_signals(frames_5m, frames_1m, symbols, processes: int = SCAN_PROCESSES) -> List[SignalRecord]:
+    """Shards `symbols` across the process pool; candles travel through shared memory, not pickles"""
+    if not symbols:
+        return []
+    panel_5m = SharedCandlePanel(frames_5m, symbols)
+    try:
+        panel_1m = SharedCandlePanel(frames_1m, symbols)
+        try:
+            shards = [list(map(int, rows)) for rows in np.array_split(np.arange(len(symbols)), max(processes, 1)) if len(rows)]
+            pool = get_scan_pool(processes)
+            futures = [pool.submit(_scan_shard, panel_5m.meta, panel_1m.meta, rows, symbols) for rows in shards]
+            records = []
+            for fut in futures:
+                try:
+                    records.extend(fut.result(timeout=30))
+                except Exception as e:
+                    logger.error(f"Shard failed: {e}")
+            return records
+        finally:
+            panel_1m.close()
+    finally:
+        panel_5m.close()
+
+
+def run_sharded_stock_scan(engine, instrument_map, bias, symbols: Optional[List[str]] = None,
+                           processes: int = SCAN_PROCESSES):
+    """
+    Drop-in for run_parallel_stock_scan: fetch (threads) -> signal pass (processes) ->
+    reversal / risk / pricing / alerts (coordinator).
+    """
+    if symbols is None:
+        symbols = [s.replace(".NS", "") for s in NIFTY_50_STOCKS]
+    symbols = [s for s in symbols if instrument_map.get(s)]
+    active_signals = load_active_signals()
+    daily_stats = load_daily_stats()
+
+    t0 = time.time()
+    frames_5m, frames_1m = fetch_candle_panels(engine, instrument_map, symbols)
+    t1 = time.time()
+    records = scan_signals(frames_5m, frames_1m, symbols, processes)
+    t2 = time.time()
+    logger.info(f"⚙️ Sharded scan: {len(symbols)} symbols | fetch {t1 - t0:.1f}s | "
+                f"signals {t2 - t1:.2f}s on {processes} procs | {len(records)} candidates")
+
+    for rec in sorted(records, key=lambda r: r.strength, reverse=True):
+        try:
+            spot, _ = get_live_ltp(instrument_map[rec.symbol])
+            if not spot: continue
+            alert = build_stock_alert(engine, rec, spot, bias, active_signals, daily_stats)
+            if alert:
+                dispatch_stock_alert(alert, active_signals, daily_stats)
+        except Exception as e:
+            logger.error(f"Coordinator error on {rec.symbol}: {e}")
+
+    sync_dashboard(active_signals)
+    return records
@@ -12,6 +12,7 @@ from services.market_engine import (
     get_days_to_expiry,
     calculate_indicators
 )
+from services.iv_surface import get_iv_surface_service
 
 # NSE F&O Stock Universe (180+ stocks)
 NSE_FNO_STOCKS = [
@@ -90,8 +91,9 @@ def scan_stock_atm_options(stock_symbol):
         # Get days to expiry
         days_to_expiry = get_days_to_expiry()
         
-        # Estimate IV (simplified)
-        iv = 30  # Default 30% IV
+        # ATM IV from the live surface; 30% when no chain has been seen for this stock
+        iv = get_iv_surface_service().get_iv(stock_symbol, atm_strike, days_to_expiry=days_to_expiry,
+                                             fallback=30.0, spot=spot_price)
         
         # Get real option prices for ATM CE and PE
         ce_price = get_real_option_price(
@@ -0,0 +1,134 @@
+"""
+Option Chain Service - Shared chain cache keyed by (underlying, expiry)
+One fetch per chain per TTL for every scanner. Within the stale window the
+cached snapshot is served immediately while a single background refresh runs;
+concurrent misses for the same chain wait on one in-flight fetch.
+"""
+import time
+import threading
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, Tuple
+
+from models.chain_snapshot import ChainSnapshot
+from pro_config import CHAIN_TTL, CHAIN_STALE_TTL
+
+logger = logging.getLogger("ChainService")
+
+ChainKey = Tuple[str, str]
+
+
+class OptionChainService:
+    """TTL + stale-while-revalidate cache of ChainSnapshots"""
+
+    def __init__(self, ttl: float = CHAIN_TTL, stale_ttl: float = CHAIN_STALE_TTL, max_workers: int = 2):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._entries: Dict[ChainKey, Tuple[ChainSnapshot, float]] = {}
+        self._inflight: Dict[ChainKey, threading.Event] = {}
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="chain-refresh")
+        self.lock = threading.Lock()
+        self.stats = {"hits": 0, "stale_hits": 0, "misses": 0, "refreshes": 0, "errors": 0}
+        self.listeners = []  # fn(underlying, previous_snapshot, snapshot) after each refresh
+
+    def add_listener(self, fn):
+        """Registers fn(underlying, previous, current) called after every successful refresh"""
+        if fn not in self.listeners:
+            self.listeners.append(fn)
+
+    def _fetch(self, engine, key: ChainKey, underlying: Optional[str]) -> Optional[ChainSnapshot]:
+        """Fetches one chain; the caller must own the in-flight slot for `key`"""
+        instrument_key, expiry = key
+        snapshot = None
+        try:
+            snapshot = engine.get_option_chain_snapshot(instrument_key, expiry, underlying=underlying)
+            with self.lock:
+                self.stats["refreshes"] += 1
+                previous = self._entries.get(key)
+                if len(snapshot):
+                    self._entries[key] = (snapshot, time.time())
+            if len(snapshot):
+                for listener in self.listeners:
+                    try:
+                        listener(underlying, previous[0] if previous else None, snapshot)
+                    except Exception as e:
+                        logger.debug(f"Chain listener failed: {e}")
+        except Exception as e:
+            logger.error(f"Chain fetch failed for {instrument_key} {expiry}: {e}")
+            with self.lock:
+                self.stats["errors"] += 1
+        finally:
+            with self.lock:
+                event = self._inflight.pop(key, None)
+            if event: event.set()
+        return snapshot
+
+    def get_chain(self, engine, instrument_key: str, expiry: str, underlying: Optional[str] = None,
+                  max_age: Optional[float] = None) -> ChainSnapshot:
+        """
+        Snapshot for (instrument_key, expiry).
+        Fresh (< ttl): cached. Stale (< stale_ttl): cached + one background refresh.
+        Older / missing: fetched now (single flight). Returns an empty snapshot on failure.
+        """
+        key = (instrument_key, str(expiry)[:10])
+        ttl = self.ttl if max_age is None else max_age
+        now = time.time()
+
+        with self.lock:
+            entry = self._entries.get(key)
+            age = now - entry[1] if entry else None
+            if entry and age < ttl:
+                self.stats["hits"] += 1
+                return entry[0]
+            if entry and age < self.stale_ttl:
+                self.stats["stale_hits"] += 1
+                if key not in self._inflight:
+                    self._inflight[key] = threading.Event()
+                    self._executor.submit(self._fetch, engine, key, underlying)
+                return entry[0]
+            self.stats["misses"] += 1
+            waiter = self._inflight.get(key)
+            if waiter is None:
+                self._inflight[key] = threading.Event()
+
+        if waiter is not None:
+            waiter.wait(timeout=30)
+            with self.lock:
+                entry = self._entries.get(key)
+            return entry[0] if entry else ChainSnapshot.from_response([], underlying or instrument_key, key[1])
+
+        snapshot = self._fetch(engine, key, underlying)
+        return snapshot if snapshot is not None else ChainSnapshot.from_response([], underlying or instrument_key, key[1])
+
+    def invalidate(self, instrument_key: Optional[str] = None):
+        with self.lock:
+            if instrument_key is None:
+                self._entries.clear()
+            else:
+                for key in [k for k in self._entries if k[0] == instrument_key]:
+                    self._entries.pop(key, None)
+
+    def metrics(self) -> Dict:
+        """Hit-rate and per-chain freshness (age in seconds)"""
+        now = time.time()
+        with self.lock:
+            served = self.stats["hits"] + self.stats["stale_hits"]
+            total = served + self.stats["misses"]
+            return {
+                **self.stats,
+                "hit_rate": round(served / total * 100, 1) if total else 0.0,
+                "fresh_rate": round(self.stats["hits"] / total * 100, 1) if total else 0.0,
+                "entries": len(self._entries),
+                "refreshing": len(self._inflight),
+                "ages": {f"{k[0]}@{k[1]}": round(now - ts, 1) for k, (_, ts) in self._entries.items()},
+            }
+
+
+# Singleton
+_chain_service = None
+
+def get_chain_service() -> OptionChainService:
+    global _chain_service
+    if _chain_service is None:
+        _chain_service = OptionChainService()
+    return _chain_service
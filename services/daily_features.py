@@ -0,0 +1,259 @@
+"""
+Daily Features - Pre-market per-symbol feature table for the whole universe
+One batched daily-bar download per trading day (persisted under data/) gives
+the slow-changing facts the intraday paths need - previous day OHLC, ATR,
+20-day average volume, classic pivots, 52-week levels, the daily trend inputs
+and the option lot size / strike step - served from memory for the rest of
+the day. Built by the pre-market job, or lazily on first use.
+"""
+import json
+import time
+import threading
+import logging
+from datetime import datetime, date
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+import yfinance as yf
+
+from config.config import DATA_DIR, SYMBOLS, STOCK_NAME_MAP, OPTION_CHAIN_CONFIG
+from config.extended_stocks import EXTENDED_STOCKS_LIST
+from engine.panel_indicators import scan_panel
+from services.volatility_service import to_ticker
+
+logger = logging.getLogger("DailyFeatures")
+
+FEATURE_FILE = DATA_DIR / "daily_features.json"
+FEATURE_COLUMNS = [
+    "prev_close", "prev_high", "prev_low", "atr", "avg_volume_20",
+    "pivot", "r1", "s1", "r2", "s2", "high_52w", "low_52w",
+    # Daily trend inputs (last full day, market_engine numerics)
+    "d_ema20", "d_ema50", "d_ema200", "d_rsi", "d_adx", "d_vwap", "d_atr_prev", "bars",
+    "lot_size", "strike_step",
+]
+HISTORY = "1y"
+YEAR_BARS = 252
+MIN_COVERAGE = 0.5     # fraction of symbols that must come back with bars
+RETRY_SECONDS = 300    # back-off after a failed universe download
+
+
+def daily_feature_table(open_: pd.DataFrame, high: pd.DataFrame, low: pd.DataFrame, close: pd.DataFrame,
+                        volume: pd.DataFrame, today: Optional[date] = None) -> pd.DataFrame:
+    """
+    Features from wide (date x symbol) daily frames. Bars dated `today` (a partial
+    session when built intraday) are excluded, so every level refers to the last full day.
+    """
+    today = today or date.today()
+    done = pd.to_datetime(close.index).date < today
+    frames = {}
+    for sym in close.columns:
+        df = pd.DataFrame({"open": open_[sym], "high": high[sym], "low": low[sym],
+                           "close": close[sym], "volume": volume[sym]})[done].dropna(subset=["close"])
+        if len(df): frames[sym] = df
+
+    table = scan_panel(frames, min_bars=1, prev=True)
+    if table.empty:
+        return pd.DataFrame(columns=FEATURE_COLUMNS)
+    h, l, c = table["High"], table["Low"], table["Close"]
+    pivot = (h + l + c) / 3
+    year = {sym: df.tail(YEAR_BARS) for sym, df in frames.items()}
+    return pd.DataFrame({
+        "prev_close": c, "prev_high": h, "prev_low": l,
+        "atr": table["ATR"],
+        "avg_volume_20": pd.Series({s: df["volume"].tail(20).mean() for s, df in frames.items()}),
+        "pivot": pivot, "r1": 2 * pivot - l, "s1": 2 * pivot - h,
+        "r2": pivot + (h - l), "s2": pivot - (h - l),
+        "high_52w": pd.Series({s: df["high"].max() for s, df in year.items()}),
+        "low_52w": pd.Series({s: df["low"].min() for s, df in year.items()}),
+        "d_ema20": table["EMA20"], "d_ema50": table["EMA50"], "d_ema200": table["EMA200"],
+        "d_rsi": table["RSI"], "d_adx": table["ADX"], "d_vwap": table["VWAP"],
+        "d_atr_prev": table["ATR_Prev"], "bars": table["Bars"].astype(float),
+    }, index=table.index).reindex(columns=FEATURE_COLUMNS)
+
+
+def fallback_strike_step(symbol: str, price: float) -> float:
+    """Index gaps from OPTION_CHAIN_CONFIG, else the price-band steps the scanners use"""
+    for idx_name, idx_step in OPTION_CHAIN_CONFIG.get("strike_gap", {}).items():
+        if idx_name in symbol.upper():
+            return float(idx_step)
+    if not np.isfinite(price): return float("nan")
+    if price > 5000: return 100.0
+    if price > 1000: return 20.0
+    if price > 500: return 10.0
+    return 5.0
+
+
+def contract_specs(symbols: List[str]) -> Dict[str, Dict[str, float]]:
+    """symbol -> {lot_size, strike_step} from the Upstox instrument master (empty if unavailable)"""
+    try:
+        from services.upstox_engine import get_upstox_engine
+        engine = get_upstox_engine()
+        if not engine.contract_specs:
+            engine.load_expiry_master()
+    except Exception as e:
+        logger.warning(f"Instrument master unavailable for contract specs: {e}")
+        return {}
+    specs = {}
+    for sym in symbols:
+        try:
+            lot, step = engine.get_contract_spec(engine.get_instrument_key(sym))
+            specs[sym] = {"lot_size": float(lot) if lot else float("nan"),
+                          "strike_step": float(step) if step else float("nan")}
+        except Exception:
+            continue
+    return specs
+
+
+class DailyFeatureService:
+    """symbol -> {prev_close, atr, pivots, 52w levels, lot_size, ...}, rebuilt once per day"""
+
+    def __init__(self, symbols: Optional[Iterable[str]] = None):
+        self.symbols: List[str] = list(symbols) if symbols else \
+            list(dict.fromkeys(list(SYMBOLS) + list(STOCK_NAME_MAP) + EXTENDED_STOCKS_LIST))
+        self._features: Dict[str, Dict[str, float]] = {}
+        self._day: Optional[date] = None
+        self.lock = threading.Lock()
+        self._build_lock = threading.Lock()  # one universe download at a time; readers keep self.lock
+        self._retry_at = 0.0
+        self.stats = {"hits": 0, "misses": 0, "downloads": 0}
+
+    def _download(self, symbols: List[str]) -> Dict[str, Dict[str, float]]:
+        """One batched daily download + instrument master pass -> per-symbol features (NaN where missing)"""
+        tickers = {to_ticker(s): s for s in symbols}
+        self.stats["downloads"] += 1
+        try:
+            data = yf.download(" ".join(tickers), period=HISTORY, interval="1d",
+                               group_by="column", progress=False, threads=True)
+        except Exception as e:
+            logger.error(f"Daily feature download failed: {e}")
+            data = pd.DataFrame()
+
+        features = {s: {c: float("nan") for c in FEATURE_COLUMNS} for s in symbols}
+        if data is not None and not data.empty:
+            if not isinstance(data.columns, pd.MultiIndex):  # single ticker
+                data.columns = pd.MultiIndex.from_product([data.columns, list(tickers)])
+            table = daily_feature_table(data["Open"], data["High"], data["Low"], data["Close"], data["Volume"])
+            for ticker, row in table.iterrows():
+                if ticker in tickers:
+                    features[tickers[ticker]] = {c: float(row[c]) for c in FEATURE_COLUMNS}
+
+        specs = contract_specs(symbols)
+        for sym, feat in features.items():
+            feat.update(specs.get(sym, {}))
+            if not np.isfinite(feat["strike_step"]):
+                feat["strike_step"] = fallback_strike_step(sym, feat["prev_close"])
+        return features
+
+    def _load(self) -> bool:
+        try:
+            if FEATURE_FILE.exists():
+                saved = json.loads(FEATURE_FILE.read_text())
+                if saved.get("date") == date.today().isoformat() and saved.get("columns") == FEATURE_COLUMNS:
+                    self._features = saved.get("features", {})
+                    return True
+        except Exception as e:
+            logger.warning(f"Could not read {FEATURE_FILE.name}: {e}")
+        return False
+
+    def _save(self):
+        try:
+            FEATURE_FILE.write_text(json.dumps({"date": date.today().isoformat(), "columns": FEATURE_COLUMNS,
+                                                "features": self._features}, allow_nan=True))
+        except Exception as e:
+            logger.warning(f"Could not write {FEATURE_FILE.name}: {e}")
+
+    def _usable(self, features: Dict[str, Dict[str, float]]) -> bool:
+        """A download counts only if enough symbols came back with daily bars"""
+        if not features:
+            return False
+        ok = sum(np.isfinite(f.get("bars", float("nan"))) for f in features.values())
+        return ok >= MIN_COVERAGE * len(features)
+
+    def _adopt(self, features: Dict[str, Dict[str, float]], day: date) -> bool:
+        """Installs a full-universe build as the day's table; a failed one is kept in memory only and retried"""
+        with self.lock:
+            if self._usable(features):
+                self._features = features
+                self._day = day
+                self._save()
+                return True
+            for sym, feat in features.items():
+                self._features.setdefault(sym, feat)
+            self._retry_at = time.time() + RETRY_SECONDS
+            return False
+
+    def _merge(self, features: Dict[str, Dict[str, float]]):
+        """Adds on-demand symbols; persisted only when the download actually returned bars"""
+        with self.lock:
+            self._features.update(features)
+            if self._usable(features):
+                self._save()
+
+    def _rollover(self):
+        """Loads today's table from disk, or rebuilds it with one download (never under self.lock)"""
+        today = datetime.now().date()
+        with self.lock:
+            if self._day == today or time.time() < self._retry_at:
+                return
+        with self._build_lock:
+            with self.lock:
+                if self._day == today:
+                    return
+                if self._load():
+                    self._day = today
+                    return
+            if self._adopt(self._download(self.symbols), today):
+                logger.info(f"📋 Daily feature table built for {len(self._features)} symbols")
+            else:
+                logger.warning(f"Daily feature download came back empty - retrying in {RETRY_SECONDS}s")
+
+    def refresh(self):
+        """Forces a rebuild (pre-market job)"""
+        with self._build_lock:
+            if self._adopt(self._download(self.symbols), datetime.now().date()):
+                logger.info(f"📋 Pre-market feature table refreshed for {len(self._features)} symbols")
+            else:
+                logger.warning("Pre-market feature refresh failed - keeping the current table")
+
+    def get(self, symbol: str) -> Dict[str, float]:
+        """All features for one symbol (NaNs if unavailable)"""
+        symbol = symbol.replace(".NS", "")
+        self._rollover()
+        with self.lock:
+            if symbol in self._features:
+                self.stats["hits"] += 1
+                return dict(self._features[symbol])
+            self.stats["misses"] += 1
+        # Outside the universe: fetched once and kept for the day (NaN included)
+        self._merge(self._download([symbol]))
+        with self.lock:
+            return dict(self._features[symbol])
+
+    def get_many(self, symbols: Iterable[str]) -> pd.DataFrame:
+        """Symbol-indexed features; symbols missing from the table are fetched in one batch"""
+        symbols = [s.replace(".NS", "") for s in symbols]
+        self._rollover()
+        with self.lock:
+            missing = list(dict.fromkeys(s for s in symbols if s not in self._features))
+            self.stats["misses"] += len(missing)
+            self.stats["hits"] += len(symbols) - len(missing)
+        if missing:
+            self._merge(self._download(missing))
+        with self.lock:
+            return pd.DataFrame.from_dict({s: self._features[s] for s in symbols}, orient="index", columns=FEATURE_COLUMNS)
+
+    def get_table(self) -> pd.DataFrame:
+        self._rollover()
+        with self.lock:
+            return pd.DataFrame.from_dict(self._features, orient="index", columns=FEATURE_COLUMNS)
+
+
+# Singleton
+_daily_features = None
+
+def get_daily_features() -> DailyFeatureService:
+    global _daily_features
+    if _daily_features is None:
+        _daily_features = DailyFeatureService()
+    return _daily_features
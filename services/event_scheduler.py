@@ -0,0 +1,175 @@
+"""
+Event Scheduler - Event-driven symbol evaluation queue for the scanners
+Price moves (ticks), bar closes and OI changes enqueue symbol evaluations.
+Pending work is de-duplicated per symbol and served highest-priority first
+(largest move), so scanners only spend CPU and API budget where something
+actually changed.
+"""
+import heapq
+import time
+import threading
+import logging
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger("EventScheduler")
+
+MOVE_THRESHOLD = 0.3        # % move since the last evaluation
+POWER_MOVE_THRESHOLD = 0.15  # tighter during the 3 PM power window
+OI_THRESHOLD = 5.0          # % change in total chain OI
+BAR_INTERVAL = 5            # minutes
+POWER_BAR_INTERVAL = 1
+BAR_PRIORITY = 0.01         # bar closes rank below any real move
+
+
+class ScanEventScheduler:
+    """symbol -> pending evaluation (priority = move size %), served from a max-heap"""
+
+    def __init__(self, move_threshold: float = MOVE_THRESHOLD, oi_threshold: float = OI_THRESHOLD):
+        self.move_threshold = move_threshold
+        self.oi_threshold = oi_threshold
+        self.power_mode = False
+        self._keys: Dict[str, str] = {}            # instrument_key -> symbol
+        self._watched: Set[str] = set()
+        self._ref_price: Dict[str, float] = {}     # price at the last evaluation
+        self._pending: Dict[str, Tuple[float, List[str]]] = {}
+        self._heap: List[Tuple[float, int, str]] = []
+        self._seq = 0
+        self._cond = threading.Condition()
+        self._clock = None
+        self.stats = {"events": 0, "enqueued": 0, "coalesced": 0, "dispatched": 0}
+
+    # --- Universe -----------------------------------------------------------
+
+    def watch(self, instrument_map: Dict[str, str]):
+        """Registers {symbol: instrument_key} for tick routing"""
+        with self._cond:
+            for sym, key in instrument_map.items():
+                if key:
+                    self._keys[key.replace(":", "|")] = sym
+                    self._watched.add(sym)
+
+    @property
+    def symbols(self) -> List[str]:
+        return list(self._keys.values())
+
+    def set_power_mode(self, active: bool):
+        self.power_mode = active
+        self.move_threshold = POWER_MOVE_THRESHOLD if active else MOVE_THRESHOLD
+
+    # --- Events -------------------------------------------------------------
+
+    def enqueue(self, symbol: str, priority: float, reason: str):
+        """Adds / upgrades a pending evaluation; a symbol is queued at most once"""
+        with self._cond:
+            self.stats["events"] += 1
+            current = self._pending.get(symbol)
+            if current:
+                self.stats["coalesced"] += 1
+                if reason not in current[1]: current[1].append(reason)
+                if priority <= current[0]:
+                    return
+                self._pending[symbol] = (priority, current[1])
+            else:
+                self.stats["enqueued"] += 1
+                self._pending[symbol] = (priority, [reason])
+            self._seq += 1
+            heapq.heappush(self._heap, (-priority, self._seq, symbol))
+            self._cond.notify()
+
+    def on_tick(self, instrument_key: str, ltp: float):
+        """Streamer listener: enqueues a symbol once it moves past the threshold"""
+        symbol = self._keys.get(instrument_key)
+        if symbol is None or not ltp:
+            return
+        ref = self._ref_price.get(symbol)
+        if ref is None:
+            self._ref_price[symbol] = ltp
+            return
+        move = abs(ltp - ref) / ref * 100
+        if move >= self.move_threshold:
+            self.enqueue(symbol, move, "MOVE")
+
+    def on_bar_close(self, symbols: Optional[Iterable[str]] = None, interval: str = "5minute"):
+        """Bar close: every watched (or given) symbol gets a low-priority evaluation"""
+        for sym in (symbols if symbols is not None else self.symbols):
+            self.enqueue(sym, BAR_PRIORITY, f"BAR_{interval}")
+
+    def on_oi_change(self, symbol: str, oi_chg_pct: float):
+        if abs(oi_chg_pct) >= self.oi_threshold:
+            self.enqueue(symbol, abs(oi_chg_pct) / 10, "OI")
+
+    def on_chain_refresh(self, underlying: Optional[str], previous, current):
+        """Chain service listener: total OI change between consecutive snapshots of a watched stock"""
+        symbol = (underlying or current.underlying or "").replace(".NS", "")
+        if symbol not in self._watched or previous is None or not len(previous) or not len(current):
+            return
+        prev_oi = float((previous.ce_oi + previous.pe_oi).sum())
+        if prev_oi > 0:
+            self.on_oi_change(symbol, (float((current.ce_oi + current.pe_oi).sum()) - prev_oi) / prev_oi * 100)
+
+    # --- Consumers ----------------------------------------------------------
+
+    def next_batch(self, max_items: int = 5, timeout: float = 1.0) -> List[Tuple[str, List[str]]]:
+        """Pops up to `max_items` (symbol, reasons), highest priority first; waits up to `timeout`"""
+        batch = []
+        with self._cond:
+            if not self._pending:
+                self._cond.wait(timeout)
+            while self._heap and len(batch) < max_items:
+                neg_priority, _, symbol = heapq.heappop(self._heap)
+                entry = self._pending.get(symbol)
+                if entry is None or entry[0] != -neg_priority:
+                    continue  # Superseded by a higher-priority push
+                del self._pending[symbol]
+                batch.append((symbol, entry[1]))
+            self.stats["dispatched"] += len(batch)
+        return batch
+
+    def drain(self) -> List[str]:
+        """All pending symbols in priority order (non-blocking)"""
+        return [sym for sym, _ in self.next_batch(max_items=len(self._pending) or 1, timeout=0)]
+
+    def move_since_last(self, symbol: str, price: float) -> float:
+        """% move of `price` from the price the last evaluation ran at (0 if none yet)"""
+        ref = self._ref_price.get(symbol)
+        return abs(price - ref) / ref * 100 if ref else 0.0
+
+    def done(self, symbol: str, price: Optional[float] = None):
+        """Records the price an evaluation ran at; the next move is measured from it"""
+        if price:
+            self._ref_price[symbol] = price
+
+    def pending(self) -> int:
+        return len(self._pending)
+
+    # --- Bar clock ----------------------------------------------------------
+
+    def start_clock(self):
+        """Background thread firing on_bar_close at each bar boundary (1m in power mode)"""
+        if self._clock is not None:
+            return
+
+        def _run():
+            last = None
+            while True:
+                now = datetime.now()
+                interval = POWER_BAR_INTERVAL if self.power_mode else BAR_INTERVAL
+                stamp = (now.hour, now.minute)
+                if now.minute % interval == 0 and stamp != last:
+                    last = stamp
+                    self.on_bar_close(interval=f"{interval}minute")
+                time.sleep(1)
+
+        self._clock = threading.Thread(target=_run, daemon=True, name="scan-bar-clock")
+        self._clock.start()
+
+
+# Singleton
+_scan_scheduler = None
+
+def get_scan_scheduler() -> ScanEventScheduler:
+    global _scan_scheduler
+    if _scan_scheduler is None:
+        _scan_scheduler = ScanEventScheduler()
+    return _scan_scheduler
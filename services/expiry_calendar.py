@@ -0,0 +1,95 @@
+"""
+Expiry Calendar - Daily in-memory expiry lists for every F&O underlying
+Built once per session from the instrument master (one bulk pass) and rebuilt
+at day rollover. Nearest / next / monthly lookups are answered from memory;
+the per-underlying contracts API is only hit for underlyings missing from the
+master, and then at most once per day.
+"""
+import threading
+import logging
+from datetime import datetime, date
+from typing import Dict, List, Optional
+
+logger = logging.getLogger("ExpiryCalendar")
+
+
+class ExpiryCalendar:
+    """underlying instrument_key -> sorted future expiries (YYYY-MM-DD)"""
+
+    def __init__(self):
+        self._expiries: Dict[str, List[str]] = {}
+        self._day: Optional[date] = None
+        self.lock = threading.Lock()
+        self._build_lock = threading.Lock()  # one master download at a time; lookups keep self.lock
+        self.stats = {"hits": 0, "api_fallbacks": 0, "rebuilds": 0}
+
+    def _rollover(self, engine):
+        """Rebuilds from the instrument master when the trading day changes (download never under self.lock)"""
+        today = datetime.now().date()
+        with self.lock:
+            if self._day == today:
+                return
+        with self._build_lock:
+            with self.lock:
+                if self._day == today:
+                    return
+                rebuild = self._day is not None
+            master = getattr(engine, "expiry_master", None) or {}
+            if rebuild or getattr(engine, "expiry_master_date", None) != today:
+                master = engine.load_expiry_master() if hasattr(engine, "load_expiry_master") else master
+            today_str = today.strftime("%Y-%m-%d")
+            expiries = {k: sorted(e for e in v if e >= today_str) for k, v in master.items()}
+            with self.lock:
+                self._expiries = expiries
+                self._day = today
+                self.stats["rebuilds"] += 1
+        logger.info(f"📅 Expiry calendar built for {len(expiries)} underlyings")
+
+    def get_expiries(self, engine, instrument_key: str) -> List[str]:
+        """Sorted future expiries for an underlying"""
+        self._rollover(engine)
+        with self.lock:
+            expiries = self._expiries.get(instrument_key)
+            if expiries:
+                self.stats["hits"] += 1
+                return list(expiries)
+
+        # Not in the master (or master unavailable): one API call, memoized for the day
+        expiries = sorted(engine.get_expiry_dates_via_sdk(instrument_key) or [])
+        with self.lock:
+            self.stats["api_fallbacks"] += 1
+            if expiries:  # empty answers may be transient failures; retried next call
+                self._expiries[instrument_key] = expiries
+        return list(expiries)
+
+    def nearest(self, engine, instrument_key: str) -> Optional[str]:
+        expiries = self.get_expiries(engine, instrument_key)
+        return expiries[0] if expiries else None
+
+    def next(self, engine, instrument_key: str) -> Optional[str]:
+        expiries = self.get_expiries(engine, instrument_key)
+        return expiries[1] if len(expiries) > 1 else (expiries[0] if expiries else None)
+
+    def monthly(self, engine, instrument_key: str, offset: int = 0) -> Optional[str]:
+        """Last expiry of each calendar month; offset=0 current month, 1 next month"""
+        expiries = self.get_expiries(engine, instrument_key)
+        month_end = {}
+        for e in expiries:
+            month_end[e[:7]] = e
+        months = sorted(month_end)
+        return month_end[months[offset]] if offset < len(months) else None
+
+    def clear(self):
+        with self.lock:
+            self._expiries = {}
+            self._day = None
+
+
+# Singleton
+_expiry_calendar = None
+
+def get_expiry_calendar() -> ExpiryCalendar:
+    global _expiry_calendar
+    if _expiry_calendar is None:
+        _expiry_calendar = ExpiryCalendar()
+    return _expiry_calendar
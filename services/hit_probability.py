@@ -0,0 +1,119 @@
+"""
+Hit Probability - Monte Carlo P(target before stop) for option alerts
+Simulates the underlying (GBM from IV, or bootstrap from recent 1m returns)
+and reprices the option along the paths. Because a premium is monotonic in
+spot at each time step, the target / stop premiums are solved once per step
+into spot barriers; the paths are then only compared against two vectors.
+"""
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+from utils.greeks_calculator import bs_price_vec, implied_volatility_vec
+
+MINUTES_PER_YEAR = 252 * 375  # NSE trading minutes
+DEFAULT_PATHS = 20000
+DEFAULT_HORIZON = 120  # minutes
+DEFAULT_SEED = 42
+
+
+def premium_barriers(level: float, spot: float, strike: float, T, r: float, sigma: float,
+                     is_call: bool, iterations: int = 48) -> np.ndarray:
+    """
+    Spot at which the option is worth `level` at each remaining time T (vectorized bisection
+    in log-spot). Unreachable levels map to +inf (call) / 0 (put) so they never trigger.
+    """
+    T = np.asarray(T, dtype=float)
+    lo = np.full(T.shape, np.log(spot) - 3.0)
+    hi = np.full(T.shape, np.log(spot) + 3.0)
+    for _ in range(iterations):
+        mid = (lo + hi) / 2
+        above = bs_price_vec(np.exp(mid), strike, T, r, sigma, bool(is_call)) > level
+        # Call premium rises with spot, put premium falls
+        if is_call:
+            hi, lo = np.where(above, mid, hi), np.where(above, lo, mid)
+        else:
+            lo, hi = np.where(above, mid, lo), np.where(above, hi, mid)
+    barrier = np.exp((lo + hi) / 2)
+    edge = np.isclose(barrier, spot * np.exp(3.0 if is_call else -3.0), rtol=1e-3)
+    return np.where(edge, np.inf if is_call else 0.0, barrier)
+
+
+def simulate_log_paths(n_paths: int, n_steps: int, step_sigma: float = 0.0,
+                       returns: Optional[Sequence[float]] = None, seed: int = DEFAULT_SEED) -> np.ndarray:
+    """
+    Cumulative log-returns (n_paths x n_steps).
+    Bootstraps from `returns` (demeaned 1-step log returns) when given, else driftless GBM.
+    """
+    rng = np.random.default_rng(seed)
+    if returns is not None and len(returns) >= 30:
+        pool = np.asarray(returns, dtype=np.float32)
+        pool = pool - pool.mean()
+        steps = pool[rng.integers(0, len(pool), size=(n_paths, n_steps))]
+    else:
+        steps = rng.standard_normal((n_paths, n_steps), dtype=np.float32) * np.float32(step_sigma)
+        steps -= np.float32(0.5 * step_sigma ** 2)
+    return np.cumsum(steps, axis=1)
+
+
+def estimate_hit_probability(spot: float, strike: float, option_type: str, target: float, stop_loss: float,
+                             days_to_expiry: float, iv: float, premium: Optional[float] = None,
+                             returns: Optional[Sequence[float]] = None,
+                             horizon_minutes: int = DEFAULT_HORIZON, step_minutes: int = 1,
+                             n_paths: int = DEFAULT_PATHS, r: float = 0.06, seed: int = DEFAULT_SEED) -> Dict:
+    """
+    Probability that the option premium reaches `target` before `stop_loss` within the horizon.
+
+    Args:
+        iv: Annualised IV as % (drives the GBM paths and the repricing)
+        premium: Entry premium; when given, the IV implied by it is used instead of `iv`
+                 so the model prices the entry exactly (iv stays the fallback)
+        returns: Optional recent 1m log returns of the underlying for bootstrap paths
+
+    Returns:
+        Dict with p_target, p_stop, p_open (neither hit), expected_minutes (to target,
+        given target first) and the model used
+    """
+    is_call = option_type == "CE"
+    sigma = max(float(iv), 1.0) / 100
+    if premium:
+        implied = float(implied_volatility_vec(premium, spot, strike, days_to_expiry / 365, r, option_type))
+        if np.isfinite(implied): sigma = max(implied, 0.01)
+    n_steps = max(int(horizon_minutes // step_minutes), 1)
+    dt = step_minutes / MINUTES_PER_YEAR
+    T = np.maximum(days_to_expiry / 365 - dt * np.arange(1, n_steps + 1), 0.0)
+
+    up = premium_barriers(target, spot, strike, T, r, sigma, is_call)
+    down = premium_barriers(stop_loss, spot, strike, T, r, sigma, is_call)
+    # Log-spot barriers relative to entry (a call's target sits above spot, a put's below)
+    with np.errstate(divide="ignore"):
+        log_target = np.log(up / spot).astype(np.float32)
+        log_stop = np.log(down / spot).astype(np.float32)
+
+    bootstrap = returns is not None and len(returns) >= 30 and step_minutes == 1
+    if bootstrap:
+        paths = simulate_log_paths(n_paths, n_steps, returns=returns, seed=seed)
+    else:
+        paths = simulate_log_paths(n_paths, n_steps, step_sigma=sigma * np.sqrt(dt), seed=seed)
+
+    if is_call:
+        hit_t, hit_s = paths >= log_target, paths <= log_stop
+    else:
+        hit_t, hit_s = paths <= log_target, paths >= log_stop
+
+    never = n_steps + 1
+    first_t = np.where(hit_t.any(axis=1), hit_t.argmax(axis=1), never)
+    first_s = np.where(hit_s.any(axis=1), hit_s.argmax(axis=1), never)
+    target_first = first_t < first_s
+    stop_first = first_s < first_t
+
+    return {
+        "p_target": round(float(target_first.mean()), 4),
+        "p_stop": round(float(stop_first.mean()), 4),
+        "p_open": round(float(1 - target_first.mean() - stop_first.mean()), 4),
+        "expected_minutes": round(float((first_t[target_first] + 1).mean() * step_minutes), 1) if target_first.any() else None,
+        "model": "bootstrap" if bootstrap else "gbm",
+        "iv": round(sigma * 100, 2),
+        "paths": n_paths,
+        "horizon_minutes": n_steps * step_minutes,
+    }
@@ -0,0 +1,270 @@
+"""
+IV Surface Service - Cached implied-volatility surface per underlying
+Builds strike x expiry IV grids from live option chain prices, re-solves only
+the strikes whose price changed (or whose spot drifted), and serves constant-time smile / term
+structure lookups for pricing, delta-targeted strike picks and theta projections.
+"""
+import threading
+import time
+from datetime import datetime, date
+from typing import Dict, Optional, Union
+
+import numpy as np
+
+from utils.greeks_calculator import implied_volatility_vec
+from config.config import BS_PARAMS
+
+# Smile grid in moneyness (strike / spot); lookups index straight into it
+MONEYNESS_LO = 0.70
+MONEYNESS_HI = 1.30
+MONEYNESS_STEP = 0.0025
+MONEYNESS_GRID = np.round(np.arange(MONEYNESS_LO, MONEYNESS_HI + MONEYNESS_STEP / 2, MONEYNESS_STEP), 6)
+
+SPOT_RESOLVE_PCT = 0.05   # Re-solve an unchanged quote once spot drifts this far (%) from its solve spot
+SURFACE_MAX_AGE = 900     # Seconds before a surface is considered stale
+
+ExpiryLike = Union[str, date, datetime]
+
+
+def _expiry_datetime(expiry: ExpiryLike) -> datetime:
+    """Expiry as a datetime at the 15:30 settlement"""
+    if isinstance(expiry, str):
+        expiry = datetime.strptime(expiry[:10], "%Y-%m-%d")
+    elif not isinstance(expiry, datetime):
+        expiry = datetime.combine(expiry, datetime.min.time())
+    if expiry.hour == 0 and expiry.minute == 0:
+        expiry = expiry.replace(hour=15, minute=30)
+    return expiry
+
+
+def _years_to(expiry_dt: datetime, now: Optional[datetime] = None) -> float:
+    now = now or datetime.now()
+    return max((expiry_dt - now).total_seconds(), 0) / (365 * 24 * 3600)
+
+
+class ExpirySmile:
+    """IV smile for one expiry: raw per-strike IVs plus the resampled moneyness grid"""
+
+    def __init__(self, expiry_dt: datetime):
+        self.expiry_dt = expiry_dt
+        self.strikes = np.array([], dtype=float)
+        self.call_ltp = np.array([], dtype=float)
+        self.put_ltp = np.array([], dtype=float)
+        self.call_iv = np.array([], dtype=float)
+        self.put_iv = np.array([], dtype=float)
+        self.call_spot = np.array([], dtype=float)  # spot each cached IV was solved at
+        self.put_spot = np.array([], dtype=float)
+        self.spot = 0.0
+        self.grid = np.full(MONEYNESS_GRID.shape, np.nan)  # IV (fraction) on MONEYNESS_GRID
+        self.atm_iv = np.nan
+        self.updated_at = 0.0
+        self.solved = 0  # contracts re-solved on the last update
+
+    def update(self, spot: float, strikes, call_ltp, put_ltp, r: float) -> int:
+        """
+        Refresh IVs against the current spot and time to expiry. Quotes whose LTP changed are
+        re-solved; an unchanged quote keeps its cached IV until spot drifts more than
+        SPOT_RESOLVE_PCT from the spot it was solved at.
+        """
+        strikes = np.asarray(strikes, dtype=float)
+        call_ltp = np.nan_to_num(np.asarray(call_ltp, dtype=float))
+        put_ltp = np.nan_to_num(np.asarray(put_ltp, dtype=float))
+        order = np.argsort(strikes)
+        strikes, call_ltp, put_ltp = strikes[order], call_ltp[order], put_ltp[order]
+
+        T = _years_to(self.expiry_dt)
+        same_ladder = len(strikes) == len(self.strikes) and np.array_equal(strikes, self.strikes)
+
+        if same_ladder:
+            ce_dirty = (call_ltp != self.call_ltp) | (np.abs(spot / self.call_spot - 1) * 100 > SPOT_RESOLVE_PCT)
+            pe_dirty = (put_ltp != self.put_ltp) | (np.abs(spot / self.put_spot - 1) * 100 > SPOT_RESOLVE_PCT)
+            call_iv, put_iv = self.call_iv.copy(), self.put_iv.copy()
+            call_spot, put_spot = self.call_spot.copy(), self.put_spot.copy()
+        else:
+            ce_dirty = np.ones(len(strikes), dtype=bool)
+            pe_dirty = ce_dirty.copy()
+            call_iv = np.full(len(strikes), np.nan)
+            put_iv = np.full(len(strikes), np.nan)
+            call_spot = np.full(len(strikes), float(spot))
+            put_spot = call_spot.copy()
+        self.spot = spot
+
+        if ce_dirty.any():
+            call_iv[ce_dirty] = implied_volatility_vec(call_ltp[ce_dirty], spot, strikes[ce_dirty], T, r, "CE")
+            call_spot[ce_dirty] = spot
+        if pe_dirty.any():
+            put_iv[pe_dirty] = implied_volatility_vec(put_ltp[pe_dirty], spot, strikes[pe_dirty], T, r, "PE")
+            put_spot[pe_dirty] = spot
+
+        self.strikes, self.call_ltp, self.put_ltp = strikes, call_ltp, put_ltp
+        self.call_iv, self.put_iv = call_iv, put_iv
+        self.call_spot, self.put_spot = call_spot, put_spot
+        self.solved = int(ce_dirty.sum() + pe_dirty.sum())
+        if self.solved:
+            self._rebuild_grid()
+        self.updated_at = time.time()
+        return self.solved
+
+    def _rebuild_grid(self):
+        """OTM side of the smile (puts below spot, calls above), resampled onto the moneyness grid"""
+        otm_iv = np.where(self.strikes < self.spot, self.put_iv, self.call_iv)
+        other = np.where(self.strikes < self.spot, self.call_iv, self.put_iv)
+        smile = np.where(np.isfinite(otm_iv), otm_iv, other)
+        ok = np.isfinite(smile) & (smile > 0)
+        if not ok.any():
+            self.grid = np.full(MONEYNESS_GRID.shape, np.nan)
+            self.atm_iv = np.nan
+            return
+        m = self.strikes[ok] / self.spot
+        # Linear in moneyness inside the quoted range, flat beyond the wings
+        self.grid = np.interp(MONEYNESS_GRID, m, smile[ok])
+        self.atm_iv = float(np.interp(1.0, m, smile[ok]))
+
+    def smile_at(self, moneyness):
+        """Constant-time lookup: direct index into the grid plus one linear blend"""
+        pos = (np.clip(moneyness, MONEYNESS_LO, MONEYNESS_HI) - MONEYNESS_LO) / MONEYNESS_STEP
+        i = np.minimum(np.floor(pos).astype(int), len(MONEYNESS_GRID) - 2)
+        w = pos - i
+        return self.grid[i] * (1 - w) + self.grid[i + 1] * w
+
+
+class IVSurface:
+    """Strike x expiry IV surface for one underlying"""
+
+    def __init__(self, underlying: str, r: float = BS_PARAMS.get('risk_free_rate', 0.06)):
+        self.underlying = underlying
+        self.r = r
+        self.smiles: Dict[datetime, ExpirySmile] = {}
+        self.lock = threading.Lock()
+
+    def update_expiry(self, expiry: ExpiryLike, spot: float, strikes, call_ltp, put_ltp) -> int:
+        expiry_dt = _expiry_datetime(expiry)
+        with self.lock:
+            smile = self.smiles.get(expiry_dt)
+            if smile is None:
+                smile = ExpirySmile(expiry_dt)
+                self.smiles[expiry_dt] = smile
+            solved = smile.update(spot, strikes, call_ltp, put_ltp, self.r)
+            # Drop expired smiles
+            now = datetime.now()
+            for dt in [d for d in self.smiles if d < now]:
+                self.smiles.pop(dt, None)
+            return solved
+
+    def _live_smiles(self, max_age: float):
+        now = time.time()
+        items = [(s.expiry_dt, s) for s in self.smiles.values()
+                 if np.isfinite(s.atm_iv) and now - s.updated_at <= max_age]
+        return sorted(items, key=lambda x: x[0])
+
+    def get_iv(self, strike, expiry: Optional[ExpiryLike] = None, days_to_expiry: Optional[float] = None,
+               spot: Optional[float] = None, max_age: float = SURFACE_MAX_AGE):
+        """
+        IV (as %) for strike(s) at an expiry or days-to-expiry.
+        Smile: linear in moneyness. Term: linear in total variance (sigma^2 * T)
+        between the two bracketing expiries, flat outside. Returns NaN if no data.
+        """
+        with self.lock:
+            smiles = self._live_smiles(max_age)
+            if not smiles:
+                return np.full(np.shape(strike), np.nan) if np.ndim(strike) else np.nan
+
+            if expiry is not None:
+                target_dt = _expiry_datetime(expiry)
+                T = _years_to(target_dt)
+            else:
+                T = max(float(days_to_expiry or 0), 0) / 365.0
+
+            ref_spot = spot or smiles[0][1].spot
+            m = np.asarray(strike, dtype=float) / ref_spot
+            times = [_years_to(dt) for dt, _ in smiles]
+
+            if T <= times[0] or len(smiles) == 1:
+                iv = smiles[0][1].smile_at(m)
+            elif T >= times[-1]:
+                iv = smiles[-1][1].smile_at(m)
+            else:
+                j = int(np.searchsorted(times, T))
+                t0, t1 = times[j - 1], times[j]
+                v0 = smiles[j - 1][1].smile_at(m)
+                v1 = smiles[j][1].smile_at(m)
+                w = (T - t0) / (t1 - t0) if t1 > t0 else 0.0
+                total_var = (v0 ** 2 * t0) * (1 - w) + (v1 ** 2 * t1) * w
+                iv = np.sqrt(np.maximum(total_var, 0) / T)
+
+        iv = iv * 100
+        return float(iv) if np.ndim(iv) == 0 else iv
+
+    def get_atm_iv(self, expiry: Optional[ExpiryLike] = None, days_to_expiry: Optional[float] = None):
+        with self.lock:
+            smiles = self._live_smiles(SURFACE_MAX_AGE)
+            spot = smiles[0][1].spot if smiles else None
+        if not spot:
+            return np.nan
+        return self.get_iv(spot, expiry=expiry, days_to_expiry=days_to_expiry, spot=spot)
+
+    def get_chain_ivs(self, expiry: ExpiryLike):
+        """Raw per-strike (strikes, call_iv %, put_iv %) for one expiry (consistent copies)"""
+        with self.lock:
+            smile = self.smiles.get(_expiry_datetime(expiry))
+            if smile is None:
+                return None
+            return smile.strikes.copy(), smile.call_iv * 100, smile.put_iv * 100
+
+
+class IVSurfaceService:
+    """Registry of IV surfaces keyed by underlying symbol"""
+
+    def __init__(self):
+        self.surfaces: Dict[str, IVSurface] = {}
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def _key(symbol: str) -> str:
+        return symbol.replace(".NS", "").replace(".BO", "").strip().upper()
+
+    def get_surface(self, symbol: str, create: bool = False) -> Optional[IVSurface]:
+        key = self._key(symbol)
+        with self.lock:
+            surface = self.surfaces.get(key)
+            if surface is None and create:
+                surface = IVSurface(key)
+                self.surfaces[key] = surface
+            return surface
+
+    def update_from_chain(self, symbol: str, expiry: ExpiryLike, spot: float, strikes, call_ltp, put_ltp) -> int:
+        """Feed a chain snapshot; returns the number of contracts re-solved"""
+        if not spot or spot <= 0:
+            return 0
+        return self.get_surface(symbol, create=True).update_expiry(expiry, spot, strikes, call_ltp, put_ltp)
+
+    def get_iv(self, symbol: str, strike, expiry: Optional[ExpiryLike] = None,
+               days_to_expiry: Optional[float] = None, fallback: Optional[float] = None, spot: Optional[float] = None):
+        """IV % for strike(s); `fallback` is returned (or filled in) where the surface has no data"""
+        surface = self.get_surface(symbol)
+        if surface is None:
+            if fallback is None: return np.nan if not np.ndim(strike) else np.full(np.shape(strike), np.nan)
+            return fallback if not np.ndim(strike) else np.full(np.shape(strike), float(fallback))
+        iv = surface.get_iv(strike, expiry=expiry, days_to_expiry=days_to_expiry, spot=spot)
+        if fallback is not None:
+            if np.ndim(iv):
+                iv = np.where(np.isfinite(iv), iv, fallback)
+            elif not np.isfinite(iv):
+                iv = fallback
+        return iv
+
+    def get_atm_iv(self, symbol: str, expiry: Optional[ExpiryLike] = None,
+                   days_to_expiry: Optional[float] = None, fallback: Optional[float] = None):
+        surface = self.get_surface(symbol)
+        iv = surface.get_atm_iv(expiry, days_to_expiry) if surface else np.nan
+        return fallback if (fallback is not None and not np.isfinite(iv)) else iv
+
+
+# Singleton
+_iv_surface_service = None
+
+def get_iv_surface_service() -> IVSurfaceService:
+    global _iv_surface_service
+    if _iv_surface_service is None:
+        _iv_surface_service = IVSurfaceService()
+    return _iv_surface_service
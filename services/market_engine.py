@@ -3,6 +3,7 @@ import yfinance as yf
 import pandas as pd
 import numpy as np
 import math
+import time
 import re
 import urllib.request
 import urllib.parse
@@ -10,6 +11,11 @@ import json
 from datetime import datetime, timedelta
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from services.upstox_engine import get_upstox_engine
+from engine.panel_indicators import build_panel, compute_panel_indicators, symbol_frame_columns
+from utils.indicator_cache import get_indicator_cache
+from services.universe_funnel import screen_universe, log_funnel
+from services.daily_features import get_daily_features
+from config.config import FUNNEL_CONFIG
 import streamlit as st
 import functools
 
@@ -269,58 +275,83 @@ def load_data(ticker, interval="5m", period="5d"):
     except Exception as e:
         return pd.DataFrame()
 
-@safe_cache(ttl=300, show_spinner=False)
-def calculate_indicators(df):
-    if df.empty or len(df) < 20: return df
-    
-    # Skip if already calculated (Fix A: Indicators recalculated repeatedly)
-    if 'EMA200' in df.columns: return df
-    
-    df = df.copy()
-    df.columns = [c.capitalize() for c in df.columns]
-    close = df['Close']; high = df['High']; low = df['Low']; open_px = df['Open']; vol = df['Volume']
-    
-    # 1. EMAs & VWAP
-    df['EMA20'] = close.ewm(span=20, adjust=False).mean()
-    df['EMA50'] = close.ewm(span=50, adjust=False).mean()
-    df['EMA200'] = close.ewm(span=200, adjust=False).mean()
-    tp = (high + low + close) / 3
-    df['VWAP'] = (tp * vol).cumsum() / vol.cumsum()
-
-    # 2. RSI & ADX (Wilder's Implementation)
-    delta = close.diff()
+# 🧩 INDICATOR REGISTRY
+# Each step declares the steps it depends on and the columns it produces, so a
+# caller can ask for named outputs and only the required computations run.
+# Shared intermediates (TR, ATR, HA close, ...) live in `ctx` and are built once.
+INDICATOR_STEPS = {}
+
+def indicator_step(name, outputs=(), deps=()):
+    def decorator(func):
+        INDICATOR_STEPS[name] = {"func": func, "outputs": tuple(outputs), "deps": tuple(deps)}
+        return func
+    return decorator
+
+@indicator_step("ema20", outputs=["EMA20"])
+def _ind_ema20(ctx, out):
+    out['EMA20'] = ctx['close'].ewm(span=20, adjust=False).mean()
+
+@indicator_step("ema50", outputs=["EMA50"])
+def _ind_ema50(ctx, out):
+    out['EMA50'] = ctx['close'].ewm(span=50, adjust=False).mean()
+
+@indicator_step("ema200", outputs=["EMA200"])
+def _ind_ema200(ctx, out):
+    out['EMA200'] = ctx['close'].ewm(span=200, adjust=False).mean()
+
+@indicator_step("vwap", outputs=["VWAP"])
+def _ind_vwap(ctx, out):
+    tp = (ctx['high'] + ctx['low'] + ctx['close']) / 3
+    out['VWAP'] = (tp * ctx['vol']).cumsum() / ctx['vol'].cumsum()
+
+@indicator_step("rsi", outputs=["RSI"])
+def _ind_rsi(ctx, out):
+    # Wilder's RSI
+    delta = ctx['close'].diff()
     gain = delta.where(delta > 0, 0).ewm(alpha=1/14, adjust=False).mean()
     loss = (-delta.where(delta < 0, 0)).ewm(alpha=1/14, adjust=False).mean()
-    df['RSI'] = 100 - (100 / (1 + gain / loss.replace(0, 0.001)))
-    
+    out['RSI'] = 100 - (100 / (1 + gain / loss.replace(0, 0.001)))
+
+@indicator_step("tr")
+def _ind_tr(ctx, out):
+    high, low, close = ctx['high'], ctx['low'], ctx['close']
+    ctx['tr'] = pd.concat([high - low, abs(high - close.shift(1)), abs(low - close.shift(1))], axis=1).max(axis=1)
+
+@indicator_step("atr", outputs=["ATR"], deps=["tr"])
+def _ind_atr(ctx, out):
+    out['ATR'] = ctx['tr'].ewm(alpha=1/14, adjust=False).mean()
+
+@indicator_step("adx", outputs=["ADX"], deps=["atr"])
+def _ind_adx(ctx, out):
     # 🕵️ ROBUST ADX (Wilder's Smoothing)
-    tr = pd.concat([high - low, abs(high - close.shift(1)), abs(low - close.shift(1))], axis=1).max(axis=1)
+    high, low, atr = ctx['high'], ctx['low'], out['ATR']
     up_move = high.diff(); down_move = -low.diff()
     plus_dm = np.where((up_move > down_move) & (up_move > 0), up_move, 0)
     minus_dm = np.where((down_move > up_move) & (down_move > 0), down_move, 0)
-    
-    atr = tr.ewm(alpha=1/14, adjust=False).mean()
-    plus_di = 100 * (pd.Series(plus_dm, index=df.index).ewm(alpha=1/14, adjust=False).mean() / atr.replace(0, 0.001))
-    minus_di = 100 * (pd.Series(minus_dm, index=df.index).ewm(alpha=1/14, adjust=False).mean() / atr.replace(0, 0.001))
-    
+
+    plus_di = 100 * (pd.Series(plus_dm, index=ctx['index']).ewm(alpha=1/14, adjust=False).mean() / atr.replace(0, 0.001))
+    minus_di = 100 * (pd.Series(minus_dm, index=ctx['index']).ewm(alpha=1/14, adjust=False).mean() / atr.replace(0, 0.001))
+
     dx = 100 * abs(plus_di - minus_di) / (plus_di + minus_di).replace(0, 0.001)
-    df['ADX'] = dx.ewm(alpha=1/14, adjust=False).mean()
-    df['ATR'] = atr
+    out['ADX'] = dx.ewm(alpha=1/14, adjust=False).mean()
 
-    # 3. Supertrend Calculation
+@indicator_step("supertrend", outputs=["Supertrend"], deps=["tr"])
+def _ind_supertrend(ctx, out):
+    high, low = ctx['high'], ctx['low']
     multiplier = 3.0
-    atr_st = tr.rolling(10).mean() # Standard for Supertrend
+    atr_st = ctx['tr'].rolling(10).mean() # Standard for Supertrend
     hl2 = (high + low) / 2
     upper = hl2 + (multiplier * atr_st)
     lower = hl2 - (multiplier * atr_st)
-    
-    v_close = close.values
+
+    v_close = ctx['close'].values
     v_upper = upper.values
     v_lower = lower.values
-    st_vals = np.zeros(len(df))
-    st_dir = np.zeros(len(df))
-    
-    for i in range(1, len(df)):
+    n = ctx['n']
+    st_vals = np.zeros(n)
+    st_dir = np.zeros(n)
+
+    for i in range(1, n):
         if v_close[i] > v_upper[i-1]:
             st_dir[i] = 1
         elif v_close[i] < v_lower[i-1]:
@@ -330,96 +361,218 @@ def calculate_indicators(df):
             if st_dir[i] == 1 and v_lower[i] < v_lower[i-1]: v_lower[i] = v_lower[i-1]
             if st_dir[i] == -1 and v_upper[i] > v_upper[i-1]: v_upper[i] = v_upper[i-1]
         st_vals[i] = v_lower[i] if st_dir[i] == 1 else v_upper[i]
-        
-    df['Supertrend'] = st_vals
-
-    # 4. Support & Resistance
-    df['Support'] = low.rolling(20).min()
-    df['Resistance'] = high.rolling(20).max()
 
-    # 5. Volume Pressure & Strength
-    avg_vol = vol.rolling(20).mean()
-    df['VolRatio'] = vol / avg_vol
-    df['Vol_Pressure'] = np.where(close > open_px, "🟢 BUY PRESSURE", "🔴 SELL PRESSURE")
-    df['PressureStatus'] = np.where(close > open_px, "Buy Pressure", "Sell Pressure")
-
-    # 6. SMC / BOS
-    df['SMC'] = "Neutral"
-    df.iloc[20:, df.columns.get_loc('SMC')] = np.where(close.iloc[20:] > high.shift(1).rolling(20).max().iloc[20:], "BOS Bullish", 
-                                               np.where(close.iloc[20:] < low.shift(1).rolling(20).min().iloc[20:], "BOS Bearish", "Neutral"))
-
-    # 7. Heikin Ashi
-    ha_close = (open_px + high + low + close) / 4
+    out['Supertrend'] = st_vals
+
+@indicator_step("levels", outputs=["Support", "Resistance"])
+def _ind_levels(ctx, out):
+    out['Support'] = ctx['low'].rolling(20).min()
+    out['Resistance'] = ctx['high'].rolling(20).max()
+
+@indicator_step("vol_ratio", outputs=["VolRatio"])
+def _ind_vol_ratio(ctx, out):
+    avg_vol = ctx['vol'].rolling(20).mean()
+    out['VolRatio'] = ctx['vol'] / avg_vol
+
+@indicator_step("pressure", outputs=["Vol_Pressure", "PressureStatus"])
+def _ind_pressure(ctx, out):
+    up = ctx['close'] > ctx['open']
+    out['Vol_Pressure'] = np.where(up, "🟢 BUY PRESSURE", "🔴 SELL PRESSURE")
+    out['PressureStatus'] = np.where(up, "Buy Pressure", "Sell Pressure")
+
+@indicator_step("smc", outputs=["SMC"])
+def _ind_smc(ctx, out):
+    # SMC / BOS
+    close, high, low = ctx['close'], ctx['high'], ctx['low']
+    smc = np.full(ctx['n'], "Neutral", dtype=object)
+    smc[20:] = np.where(close.iloc[20:] > high.shift(1).rolling(20).max().iloc[20:], "BOS Bullish",
+                        np.where(close.iloc[20:] < low.shift(1).rolling(20).min().iloc[20:], "BOS Bearish", "Neutral"))
+    out['SMC'] = smc
+
+@indicator_step("heikin_ashi", outputs=["HA_Status", "HA_Close"])
+def _ind_heikin_ashi(ctx, out):
+    ha_close = (ctx['open'] + ctx['high'] + ctx['low'] + ctx['close']) / 4
     v_ha_close = ha_close.values
-    v_open = open_px.values
-    v_ha_open = np.zeros(len(df))
+    v_open = ctx['open'].values
+    v_ha_open = np.zeros(ctx['n'])
     v_ha_open[0] = v_open[0]
-    for j in range(1, len(df)):
+    for j in range(1, ctx['n']):
         v_ha_open[j] = (v_ha_open[j-1] + v_ha_close[j-1]) / 2
-    df['HA_Status'] = np.where(ha_close > v_ha_open, "Bullish HA", "Bearish HA")
-    df['HA_Close'] = ha_close
+    out['HA_Status'] = np.where(ha_close > v_ha_open, "Bullish HA", "Bearish HA")
+    out['HA_Close'] = ha_close
 
-    # 8. Stochastic RSI
-    ha_rsi_delta = df['HA_Close'].diff()
+@indicator_step("stoch_rsi", outputs=["StochRSI"], deps=["heikin_ashi"])
+def _ind_stoch_rsi(ctx, out):
+    ha_rsi_delta = out['HA_Close'].diff()
     ha_gain = ha_rsi_delta.where(ha_rsi_delta > 0, 0).ewm(alpha=1/14, adjust=False).mean()
     ha_loss = (-ha_rsi_delta.where(ha_rsi_delta < 0, 0)).ewm(alpha=1/14, adjust=False).mean()
     ha_rsi = 100 - (100 / (1 + ha_gain / ha_loss.replace(0, 0.001)))
     stoch_rsi_min = ha_rsi.rolling(14).min()
     stoch_rsi_max = ha_rsi.rolling(14).max()
-    df['StochRSI'] = (ha_rsi - stoch_rsi_min) / (stoch_rsi_max - stoch_rsi_min).replace(0, 0.001)
+    out['StochRSI'] = (ha_rsi - stoch_rsi_min) / (stoch_rsi_max - stoch_rsi_min).replace(0, 0.001)
 
-    # 9. TREND CLASSIFICATION (User Suggested Directional Bias)
-    rsi_vals = df['RSI']
-    adx_vals = df['ADX']
-    
+@indicator_step("trend", outputs=["Trend"], deps=["rsi", "adx"])
+def _ind_trend(ctx, out):
+    # TREND CLASSIFICATION (User Suggested Directional Bias)
+    rsi_vals = out['RSI']
+    adx_vals = out['ADX']
     conditions = [
         (rsi_vals > 60) & (adx_vals > 20),
         (rsi_vals < 40) & (adx_vals > 20)
     ]
     choices = ['UP', 'DOWN']
-    df['Trend'] = np.select(conditions, choices, default='NEUTRAL')
-    
-    # 10. Signal Logic
-    df['Signal'] = "WAIT"
+    out['Trend'] = np.select(conditions, choices, default='NEUTRAL')
+
+@indicator_step("signal", outputs=["Signal"], deps=["trend", "stoch_rsi", "heikin_ashi", "rsi", "adx", "vol_ratio"])
+def _ind_signal(ctx, out):
+    close, high, low = ctx['close'], ctx['high'], ctx['low']
+    trend = pd.Series(out['Trend'], index=ctx['index'])
+    ha_status = pd.Series(out['HA_Status'], index=ctx['index'])
+    rsi, adx, stoch = out['RSI'], out['ADX'], out['StochRSI']
+
+    signal = pd.Series("WAIT", index=ctx['index'])
     # Fix: Pullback Too Loose (Add RSI filter)
-    buy_scalp = (df['Trend'] == "Bullish") & (df['StochRSI'] < 0.25) & (df['HA_Status'] == "Bullish HA") & (df['RSI'] > 45) & (df['RSI'] < 65)
-    sell_scalp = (df['Trend'] == "Bearish") & (df['StochRSI'] > 0.75) & (df['HA_Status'] == "Bearish HA") & (df['RSI'] > 35) & (df['RSI'] < 55)
-    
+    buy_scalp = (trend == "Bullish") & (stoch < 0.25) & (ha_status == "Bullish HA") & (rsi > 45) & (rsi < 65)
+    sell_scalp = (trend == "Bearish") & (stoch > 0.75) & (ha_status == "Bearish HA") & (rsi > 35) & (rsi < 55)
+
     recent_high = high.shift(1).rolling(20).max()
     recent_low = low.shift(1).rolling(20).min()
-    vol_spike = df['VolRatio'] > 1.2
-    
+    vol_spike = out['VolRatio'] > 1.2
+
     # Fix: Breakout Too Sensitive (Add 0.2% confirmation buffer)
-    buy_breakout = (close > recent_high * 1.002) & vol_spike & (df['RSI'] > 60) & (df['ADX'] > 25)
-    sell_breakout = (close < recent_low * 0.998) & vol_spike & (df['RSI'] < 40) & (df['ADX'] > 25)
-    
+    buy_breakout = (close > recent_high * 1.002) & vol_spike & (rsi > 60) & (adx > 25)
+    sell_breakout = (close < recent_low * 0.998) & vol_spike & (rsi < 40) & (adx > 25)
+
     # 🌟 ANTICIPATION LOGIC (Expectation of Breakout)
-    buy_anticipation = (close <= recent_high) & (close > recent_high * 0.992) & (df['Trend'] == "Bullish") & (df['RSI'] > 55)
-    sell_anticipation = (close >= recent_low) & (close < recent_low * 1.008) & (df['Trend'] == "Bearish") & (df['RSI'] < 45)
-
-    df.loc[buy_scalp, 'Signal'] = "CE SCALP (ST+STOCH)"
-    df.loc[sell_scalp, 'Signal'] = "PE SCALP (ST+STOCH)"
-    df.loc[buy_breakout, 'Signal'] = "⚡ CE BREAKOUT"
-    df.loc[sell_breakout, 'Signal'] = "⚡ PE BREAKOUT"
-    df.loc[buy_anticipation, 'Signal'] = "⏳ CE ANTICIPATION"
-    df.loc[sell_anticipation, 'Signal'] = "⏳ PE ANTICIPATION"
-
-    # 11. Momentum Speed Index
-    df['MomentumSpeed'] = df['RSI'] * 0.4 + df['ADX'] * 0.4 + np.where(df['PressureStatus'] == "Buy Pressure", 20, -20)
-    df['MomentumSpeed'] = df['MomentumSpeed'].clip(1, 100)
-    df['SignalValidity'] = np.where((df['Signal'] != "WAIT") & (df['VolRatio'] > 1.2), "Strong Signal", "Neutral")
-
-    # 12. Pattern Detection
-    h_slope = high.rolling(20).apply(lambda x: np.polyfit(np.arange(20), x, 1)[0], raw=True)
-    l_slope = low.rolling(20).apply(lambda x: np.polyfit(np.arange(20), x, 1)[0], raw=True)
-    df['Pattern'] = np.where((h_slope > 0) & (l_slope > h_slope), "Rising Wedge", 
-                    np.where((l_slope < 0) & (h_slope < l_slope), "Falling Wedge", "None"))
-
-    df['Pos_In_Range'] = (close - df['Support']) / (df['Resistance'] - df['Support']).replace(0, 0.001)
-    df['Day_Chg'] = (close - open_px) / open_px * 100
-    
+    buy_anticipation = (close <= recent_high) & (close > recent_high * 0.992) & (trend == "Bullish") & (rsi > 55)
+    sell_anticipation = (close >= recent_low) & (close < recent_low * 1.008) & (trend == "Bearish") & (rsi < 45)
+
+    signal.loc[buy_scalp] = "CE SCALP (ST+STOCH)"
+    signal.loc[sell_scalp] = "PE SCALP (ST+STOCH)"
+    signal.loc[buy_breakout] = "⚡ CE BREAKOUT"
+    signal.loc[sell_breakout] = "⚡ PE BREAKOUT"
+    signal.loc[buy_anticipation] = "⏳ CE ANTICIPATION"
+    signal.loc[sell_anticipation] = "⏳ PE ANTICIPATION"
+    out['Signal'] = signal
+
+@indicator_step("momentum", outputs=["MomentumSpeed", "SignalValidity"], deps=["rsi", "adx", "pressure", "signal", "vol_ratio"])
+def _ind_momentum(ctx, out):
+    speed = out['RSI'] * 0.4 + out['ADX'] * 0.4 + np.where(out['PressureStatus'] == "Buy Pressure", 20, -20)
+    out['MomentumSpeed'] = speed.clip(1, 100)
+    out['SignalValidity'] = np.where((out['Signal'] != "WAIT") & (out['VolRatio'] > 1.2), "Strong Signal", "Neutral")
+
+@indicator_step("pattern", outputs=["Pattern"])
+def _ind_pattern(ctx, out):
+    h_slope = ctx['high'].rolling(20).apply(lambda x: np.polyfit(np.arange(20), x, 1)[0], raw=True)
+    l_slope = ctx['low'].rolling(20).apply(lambda x: np.polyfit(np.arange(20), x, 1)[0], raw=True)
+    out['Pattern'] = np.where((h_slope > 0) & (l_slope > h_slope), "Rising Wedge",
+                     np.where((l_slope < 0) & (h_slope < l_slope), "Falling Wedge", "None"))
+
+@indicator_step("pos_in_range", outputs=["Pos_In_Range"], deps=["levels"])
+def _ind_pos_in_range(ctx, out):
+    out['Pos_In_Range'] = (ctx['close'] - out['Support']) / (out['Resistance'] - out['Support']).replace(0, 0.001)
+
+@indicator_step("day_chg", outputs=["Day_Chg"])
+def _ind_day_chg(ctx, out):
+    out['Day_Chg'] = (ctx['close'] - ctx['open']) / ctx['open'] * 100
+
+# Column order of the full set (matches the legacy calculate_indicators layout)
+ALL_INDICATOR_COLUMNS = [
+    'EMA20', 'EMA50', 'EMA200', 'VWAP', 'RSI', 'ADX', 'ATR', 'Supertrend', 'Support', 'Resistance',
+    'VolRatio', 'Vol_Pressure', 'PressureStatus', 'SMC', 'HA_Status', 'HA_Close', 'StochRSI',
+    'Trend', 'Signal', 'MomentumSpeed', 'SignalValidity', 'Pattern', 'Pos_In_Range', 'Day_Chg'
+]
+OUTPUT_STEPS = {col: name for name, step in INDICATOR_STEPS.items() for col in step['outputs']}
+
+# Label columns are stored as categoricals (int8 codes + one copy of each label);
+# comparisons, `.str` and row lookups still see the plain label strings.
+LABEL_CATEGORIES = {
+    'Vol_Pressure': ["🔴 SELL PRESSURE", "🟢 BUY PRESSURE"],
+    'PressureStatus': ["Sell Pressure", "Buy Pressure"],
+    'SMC': ["Neutral", "BOS Bullish", "BOS Bearish"],
+    'HA_Status': ["Bearish HA", "Bullish HA"],
+    'Trend': ["NEUTRAL", "UP", "DOWN"],
+    'Signal': ["WAIT", "CE SCALP (ST+STOCH)", "PE SCALP (ST+STOCH)", "⚡ CE BREAKOUT", "⚡ PE BREAKOUT",
+               "⏳ CE ANTICIPATION", "⏳ PE ANTICIPATION"],
+    'SignalValidity': ["Neutral", "Strong Signal"],
+    'Pattern': ["None", "Rising Wedge", "Falling Wedge"],
+}
+
+def decode_label_columns(df):
+    """Converts categorical label columns back to plain strings (for export/render)"""
+    df = df.copy()
+    for col in LABEL_CATEGORIES:
+        if col in df.columns and isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype(str)
+    return df
+
+INDICATOR_PRESETS = {
+    "all": tuple(ALL_INDICATOR_COLUMNS),
+    "tf_score": ("RSI", "ADX", "VolRatio"),
+    "trend": ("EMA20", "RSI", "ADX", "Trend"),
+}
+
+def resolve_indicator_steps(outputs):
+    """Returns the ordered step names needed for the requested output columns"""
+    order, seen = [], set()
+    def visit(name):
+        if name in seen: return
+        seen.add(name)
+        for dep in INDICATOR_STEPS[name]['deps']:
+            visit(dep)
+        order.append(name)
+    for col in outputs:
+        if col not in OUTPUT_STEPS:
+            raise KeyError(f"Unknown indicator output: {col}")
+        visit(OUTPUT_STEPS[col])
+    return order
+
+def compute_indicators(df, outputs="all", instrument=None, timeframe=None):
+    """
+    🧩 Selective indicator calculation
+    `outputs` is a preset name from INDICATOR_PRESETS or a list of columns.
+    Only the steps needed for those columns (and their dependencies) run;
+    every column produced along the way is added to the returned frame.
+    Registry columns already on the frame (e.g. from the panel engine) are
+    reused and their steps skipped.
+    Results are memoized in the shared indicator cache, keyed by
+    (instrument, timeframe, last bar, indicator set).
+    """
+    if df.empty or len(df) < 20: return df
+    cols = INDICATOR_PRESETS[outputs] if isinstance(outputs, str) else tuple(outputs)
+
+    # Skip if already calculated (Fix A: Indicators recalculated repeatedly)
+    if all(c in df.columns for c in cols): return df
+
+    return get_indicator_cache().get_or_compute(df, outputs, _compute_indicators, instrument, timeframe)
+
+def _compute_indicators(df, outputs):
+    cols = INDICATOR_PRESETS[outputs] if isinstance(outputs, str) else tuple(outputs)
+    df = df.copy()
+    df.columns = [c if c in OUTPUT_STEPS else c.capitalize() for c in df.columns]
+    ctx = {
+        'close': df['Close'], 'high': df['High'], 'low': df['Low'], 'open': df['Open'], 'vol': df['Volume'],
+        'index': df.index, 'n': len(df)
+    }
+    out = {col: df[col] for col in df.columns if col in OUTPUT_STEPS}
+    given = set(out)
+    for name in resolve_indicator_steps(cols):
+        step = INDICATOR_STEPS[name]
+        if step['outputs'] and all(c in given for c in step['outputs']): continue
+        step['func'](ctx, out)
+
+    for col in ALL_INDICATOR_COLUMNS:
+        if col in out and col not in given:
+            if col in LABEL_CATEGORIES:
+                df[col] = pd.Categorical(out[col], categories=LABEL_CATEGORIES[col])
+            else:
+                df[col] = out[col]
     return df
 
+def calculate_indicators(df, instrument=None, timeframe=None):
+    """🏛 Full indicator set (the "all" preset of the indicator registry)"""
+    if 'EMA200' in df.columns: return df
+    return compute_indicators(df, "all", instrument=instrument, timeframe=timeframe)
 
 def calculate_option_greeks(spot, strike, premium, o_type="CE"):
     """
@@ -445,10 +598,9 @@ def get_mtf_confluence(ticker, mtf_data=None):
     If mtf_data is provided (from Upstox engine), we use that.
     """
     if mtf_data:
-        # Use existing scoring from mtf_data
-        t5 = mtf_data.get("5m", {}).get("trend", "NEUTRAL")
-        t15 = mtf_data.get("15m", {}).get("trend", "NEUTRAL")
-        t1h = mtf_data.get("1h", {}).get("trend", "NEUTRAL")
+        # Use existing scoring from mtf_data; stale timeframes of a partial read count as neutral
+        t5, t15, t1h = ("NEUTRAL" if mtf_data.get(tf, {}).get("stale") else mtf_data.get(tf, {}).get("trend", "NEUTRAL")
+                        for tf in ("5m", "15m", "1h"))
         
         bull_count = [t5, t15, t1h].count("UP")
         bear_count = [t5, t15, t1h].count("DOWN")
@@ -466,24 +618,32 @@ def get_comprehensive_scan(stock_list_tuple):
     stock_list = list(stock_list_tuple)
     if not stock_list: return results
     
-    all_prev_px = {}
-    try:
-        base_all = yf.download(" ".join(stock_list), period="5d", interval="1d", progress=False, threads=True)
-        if not base_all.empty:
-            close_data = base_all['Close']
-            for t in stock_list:
-                try:
-                    vals = close_data[t].dropna() if len(stock_list) > 1 else close_data.dropna()
-                    if len(vals) >= 2: all_prev_px[t] = float(vals.iloc[-2])
-                except: continue
-    except: pass
-
     engine = get_upstox_engine()
-    def process_chunk(chunk, chunk_idx):
-        chunk_results = []
+    
+    # 🔻 Stage 1: one bulk quote screen; indices always pass, equities compete for the shortlist
+    stock_keys = {}
+    for t in stock_list:
+        key = engine.get_instrument_key(t)
+        if key and key.startswith("NSE_EQ"): stock_keys[t] = key
+    report = {"universe": len(stock_list)}
+    if len(stock_keys) > FUNNEL_CONFIG["shortlist_size"]:
+        shortlist, _, report = screen_universe(engine, stock_keys)
+        report["universe"] = len(stock_list)
+        keep = set(shortlist) | {t for t in stock_list if t not in stock_keys}
+        scan_list = [t for t in stock_list if t in keep]
+    else:
+        scan_list = stock_list
+    t0 = time.time()
+    
+    # Previous closes from the pre-market daily feature table (no 5-day download per scan)
+    prev_closes = get_daily_features().get_many(scan_list)["prev_close"]
+    all_prev_px = {t: float(px) for t, px in zip(scan_list, prev_closes.reindex([t.replace(".NS", "") for t in scan_list])) if pd.notna(px)}
+
+    def fetch_chunk(chunk):
+        chunk_frames = {}
         try:
             # 🏢 Strategy: Try individual Upstox fetch if possible, else batch yfinance
-            for i, ticker in enumerate(chunk):
+            for ticker in chunk:
                 try:
                     df_s = pd.DataFrame()
                     key = engine.get_instrument_key(ticker)
@@ -497,53 +657,81 @@ def get_comprehensive_scan(stock_list_tuple):
                     if not df_s.empty:
                         df_s = flatten_columns(df_s)
                     
-                    prev_px = all_prev_px.get(ticker)
-                    if len(df_s) < 10 or prev_px is None: continue
-                    
-                    df_s = calculate_indicators(df_s)
-                    last = df_s.iloc[-1]
-                    price = float(last['Close'])
-                    chg = round(price - prev_px, 2)
-                    chg_pct = round((chg / prev_px) * 100, 2)
-                    sig = str(last['Signal'])
-                    
-                    # 🔍 MTF Verification for Active Signals
-                    mtf_score, mtf_status = 0, "Neutral"
-                    if sig != "WAIT":
-                        mtf_score, mtf_status = get_mtf_confluence(ticker)
-                    
-                    chunk_results.append({
-                        "Stock": ticker.replace(".NS", ""), "Ticker": ticker, "Price": round(price, 2),
-                        "Chg": chg, "Chg%": chg_pct, "Signal": sig, "Scalp": sig, "Intraday": sig,
-                        "Swing": str(last.get('Forecast', 'Wait')), "RSI": round(float(last['RSI']), 1),
-                        "ADX": round(float(last['ADX']), 1), "Trend": str(last['Trend']),
-                        "Momentum": round(float(last.get('MomentumSpeed', 50)), 1),
-                        "HA_Status": str(last.get('HA_Status', 'Neutral')), "HA": str(last.get('HA_Status', 'Neutral')),
-                        "SMC": str(last.get('SMC', 'Neutral')), 
-                        "Vol_Pressure": str(last.get('Vol_Pressure', 'Neutral')),
-                        "Vol Pressure": str(last.get('Vol_Pressure', 'Neutral')),
-                        "PressureStatus": str(last.get('PressureStatus', 'Neutral')),
-                        "SignalValidity": str(last.get('SignalValidity', 'Neutral')), "Forecast": str(last.get('Forecast', 'Wait')),
-                        "Support": float(last.get('Support', 0)), "Resistance": float(last.get('Resistance', 0)),
-                        "Pattern": str(last.get('Pattern', 'None')), "Pos_In_Range": float(last.get('Pos_In_Range', 0.5)),
-                        "Day_Chg": float(last.get('Day_Chg', 0)), "ATR": float(last.get('ATR', 0)),
-                        "Supertrend": float(last.get('Supertrend', 0)), "StochRSI": float(last.get('StochRSI', 0)),
-                        "MTF_Score": mtf_score, "MTF_Status": mtf_status,
-                        "ST_Dir": 1 if last['Trend'] == "Bullish" else -1, "Rank": chunk_idx + i + 1
-                    })
+                    if len(df_s) < 10 or all_prev_px.get(ticker) is None: continue
+                    chunk_frames[ticker] = df_s
                 except: continue
         except: pass
-        return chunk_results
+        return chunk_frames
 
     chunk_size = 40
-    chunks = [stock_list[i : i + chunk_size] for i in range(0, len(stock_list), chunk_size)]
+    chunks = [scan_list[i : i + chunk_size] for i in range(0, len(scan_list), chunk_size)]
+    frames = {}
     
     with ThreadPoolExecutor(max_workers=5) as executor:
-        future_to_chunk = {executor.submit(process_chunk, chunk, i*chunk_size): i for i, chunk in enumerate(chunks)}
-        for future in as_completed(future_to_chunk):
-            chunk_results = future.result()
-            if chunk_results: results.extend(chunk_results)
+        for future in as_completed([executor.submit(fetch_chunk, chunk) for chunk in chunks]):
+            frames.update(future.result())
+
+    # 📊 One vectorised panel pass for EMA/RSI/ADX/ATR/VWAP/VolRatio across the universe
+    panel = None
+    try:
+        panel = compute_panel_indicators(build_panel(frames, min_bars=20))
+    except Exception:
+        pass
+
+    def process_chunk(ranked):
+        chunk_results = []
+        for rank, ticker in ranked:
+            try:
+                df_s = frames[ticker]
+                prev_px = all_prev_px[ticker]
+                if panel is not None and ticker in panel["symbols"] and len(df_s) == panel["lengths"][panel["symbols"].index(ticker)]:
+                    df_s = df_s.copy()
+                    for col, vals in symbol_frame_columns(panel, ticker, len(df_s)).items():
+                        df_s[col] = vals
+            
+                df_s = compute_indicators(df_s, "all", instrument=ticker, timeframe="5minute")
+                last = df_s.iloc[-1]
+                price = float(last['Close'])
+                chg = round(price - prev_px, 2)
+                chg_pct = round((chg / prev_px) * 100, 2)
+                sig = str(last['Signal'])
+            
+                # 🔍 MTF Verification for Active Signals
+                mtf_score, mtf_status = 0, "Neutral"
+                if sig != "WAIT":
+                    mtf_score, mtf_status = get_mtf_confluence(ticker)
+            
+                chunk_results.append({
+                    "Stock": ticker.replace(".NS", ""), "Ticker": ticker, "Price": round(price, 2),
+                    "Chg": chg, "Chg%": chg_pct, "Signal": sig, "Scalp": sig, "Intraday": sig,
+                    "Swing": str(last.get('Forecast', 'Wait')), "RSI": round(float(last['RSI']), 1),
+                    "ADX": round(float(last['ADX']), 1), "Trend": str(last['Trend']),
+                    "Momentum": round(float(last.get('MomentumSpeed', 50)), 1),
+                    "HA_Status": str(last.get('HA_Status', 'Neutral')), "HA": str(last.get('HA_Status', 'Neutral')),
+                    "SMC": str(last.get('SMC', 'Neutral')), 
+                    "Vol_Pressure": str(last.get('Vol_Pressure', 'Neutral')),
+                    "Vol Pressure": str(last.get('Vol_Pressure', 'Neutral')),
+                    "PressureStatus": str(last.get('PressureStatus', 'Neutral')),
+                    "SignalValidity": str(last.get('SignalValidity', 'Neutral')), "Forecast": str(last.get('Forecast', 'Wait')),
+                    "Support": float(last.get('Support', 0)), "Resistance": float(last.get('Resistance', 0)),
+                    "Pattern": str(last.get('Pattern', 'None')), "Pos_In_Range": float(last.get('Pos_In_Range', 0.5)),
+                    "Day_Chg": float(last.get('Day_Chg', 0)), "ATR": float(last.get('ATR', 0)),
+                    "Supertrend": float(last.get('Supertrend', 0)), "StochRSI": float(last.get('StochRSI', 0)),
+                    "MTF_Score": mtf_score, "MTF_Status": mtf_status,
+                    "ST_Dir": 1 if last['Trend'] == "Bullish" else -1, "Rank": rank
+                })
+            except: continue
+        return chunk_results
+
+    # Per-symbol signal assembly + MTF confluence (network bound) fans out again after the panel pass
+    ranked = [(rank, t) for rank, t in enumerate(stock_list, start=1) if t in frames]
+    ranked_chunks = [ranked[i : i + chunk_size // 4] for i in range(0, len(ranked), chunk_size // 4)]
+    with ThreadPoolExecutor(max_workers=5) as executor:
+        for chunk_results in executor.map(process_chunk, ranked_chunks):
+            results.extend(chunk_results)
     
+    report.update(with_candles=len(frames), selected=len(results), candles_s=round(time.time() - t0, 2))
+    log_funnel("comprehensive", report)
     return results
 
 def get_index_price(name, ticker):
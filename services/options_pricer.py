@@ -3,14 +3,13 @@ Options Pricer Service
 Enhanced option pricing with NSE option chain generation
 """
 import pandas as pd
-import math
+import numpy as np
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple
-import yfinance as yf
 
 from models.trade_models import OptionContract, OptionType, Greeks
-from utils.greeks_calculator import BlackScholesCalculator, calculate_option_price, calculate_greeks
-from config.config import BS_PARAMS, OPTION_CHAIN_CONFIG, SYMBOLS
+from utils.greeks_calculator import BlackScholesCalculator, calculate_option_price, calculate_greeks, bs_greeks_vec, implied_volatility_vec
+from config.config import BS_PARAMS, OPTION_CHAIN_CONFIG
 
 class OptionsPricer:
     """
@@ -23,55 +22,59 @@ class OptionsPricer:
     
     def __init__(self):
         self.bs_calculator = BlackScholesCalculator()
-        self.iv_cache = {}  # Cache IV estimates
     
-    def estimate_iv_from_history(self, symbol: str, period: str = "30d") -> float:
+    def estimate_iv_from_history(self, symbol: str, estimator: str = "cc") -> float:
         """
         Estimate Implied Volatility from historical price volatility
         
         Args:
             symbol: Trading symbol (NIFTY, BANKNIFTY, etc.)
-            period: Historical period for calculation
+            estimator: Realised vol estimator ("cc", "parkinson" or "ewma")
         
         Returns:
             Estimated IV as percentage
         """
-        # Check cache
-        cache_key = f"{symbol}_{period}"
-        if cache_key in self.iv_cache:
-            cache_time, iv = self.iv_cache[cache_key]
-            if (datetime.now() - cache_time).seconds < 3600:  # 1 hour cache
-                return iv
-        
-        try:
-            # Get historical data
-            ticker_symbol = SYMBOLS.get(symbol, symbol)
-            if not ticker_symbol.startswith("^"):
-                ticker_symbol = f"{ticker_symbol}.NS"
-            
-            ticker = yf.Ticker(ticker_symbol)
-            hist = ticker.history(period=period)
-            
-            if hist.empty:
-                return 20.0  # Default fallback
-            
-            # Calculate historical volatility (annualized)
-            returns = hist['Close'].pct_change().dropna()
-            hist_vol = returns.std() * math.sqrt(252) * 100  # Annualized %
-            
-            # IV is typically higher than historical volatility
-            # Add a markup (10-30%) based on market conditions
-            iv_estimate = hist_vol * 1.15  # 15% markup
-            iv_estimate = max(10.0, min(60.0, iv_estimate))  # Clamp between 10-60%
-            
-            # Cache the result
-            self.iv_cache[cache_key] = (datetime.now(), iv_estimate)
-            
-            return round(iv_estimate, 2)
-        
-        except Exception as e:
-            print(f"IV estimation error for {symbol}: {e}")
-            return 20.0  # Fallback default
+        from services.volatility_service import get_volatility_service
+        hist_vol = get_volatility_service().get_vol(symbol, estimator)
+        if not np.isfinite(hist_vol):
+            return 20.0  # Default fallback
+        
+        # IV is typically higher than historical volatility
+        # Add a markup (10-30%) based on market conditions
+        iv_estimate = hist_vol * 1.15  # 15% markup
+        iv_estimate = max(10.0, min(60.0, iv_estimate))  # Clamp between 10-60%
+        
+        return round(iv_estimate, 2)
+    
+    def get_iv(self,
+               symbol: str,
+               strike=None,
+               days_to_expiry: Optional[float] = None,
+               spot: Optional[float] = None):
+        """
+        IV from the live IV surface, falling back to historical volatility
+        
+        Args:
+            symbol: Trading symbol
+            strike: Strike or array of strikes (None = ATM)
+            days_to_expiry: Days until expiry (None = nearest expiry on the surface)
+            spot: Current spot price (moneyness reference)
+        
+        Returns:
+            IV as percentage (array when strike is an array)
+        """
+        from services.iv_surface import get_iv_surface_service
+        service = get_iv_surface_service()
+        if strike is None:
+            iv = service.get_atm_iv(symbol, days_to_expiry=days_to_expiry)
+        else:
+            iv = service.get_iv(symbol, strike, days_to_expiry=days_to_expiry, spot=spot)
+        
+        missing = ~np.isfinite(iv)
+        if np.any(missing):
+            hist_iv = self.estimate_iv_from_history(symbol)
+            iv = np.where(missing, hist_iv, iv) if np.ndim(iv) else hist_iv
+        return iv
     
     def get_strike_ladder(self, spot: float, symbol: str = "NIFTY") -> List[float]:
         """
@@ -113,58 +116,47 @@ class OptionsPricer:
             symbol: Trading symbol
             spot: Current spot price
             expiry_date: Expiry date
-            iv: Implied Volatility (if None, will estimate)
+            iv: Implied Volatility (if None, per-strike IV from the surface)
         
         Returns:
             DataFrame with option chain data
         """
-        if iv is None:
-            iv = self.estimate_iv_from_history(symbol)
-        
         # Calculate days to expiry
         days_to_expiry = max(1, (expiry_date - datetime.now()).days)
         
         # Get strike ladder
         strikes = self.get_strike_ladder(spot, symbol)
         
-        # Generate option chain
-        chain_data = []
-        
-        for strike in strikes:
-            # Calculate for Call
-            call_price = calculate_option_price(spot, strike, days_to_expiry, iv, "CE")
-            call_greeks = calculate_greeks(spot, strike, days_to_expiry, iv, "CE")
-            
-            # Calculate for Put
-            put_price = calculate_option_price(spot, strike, days_to_expiry, iv, "PE")
-            put_greeks = calculate_greeks(spot, strike, days_to_expiry, iv, "PE")
-            
-            # Determine moneyness
-            if abs(strike - spot) < (OPTION_CHAIN_CONFIG['strike_gap'].get(symbol, 50) / 2):
-                moneyness = "ATM"
-            elif strike > spot:
-                moneyness = "OTM"  # For calls
-            else:
-                moneyness = "ITM"  # For calls
-            
-            chain_data.append({
-                'Strike': strike,
-                'Moneyness': moneyness,
-                'Call_Premium': round(call_price, 2),
-                'Call_Delta': call_greeks.delta,
-                'Call_Gamma': call_greeks.gamma,
-                'Call_Theta': call_greeks.theta,
-                'Call_Vega': call_greeks.vega,
-                'Put_Premium': round(put_price, 2),
-                'Put_Delta': put_greeks.delta,
-                'Put_Gamma': put_greeks.gamma,
-                'Put_Theta': put_greeks.theta,
-                'Put_Vega': put_greeks.vega,
-                'IV': iv,
-                'Days_to_Expiry': days_to_expiry
-            })
-        
-        df = pd.DataFrame(chain_data)
+        if iv is None:
+            iv = np.round(self.get_iv(symbol, np.asarray(strikes, dtype=float), days_to_expiry, spot), 2)
+        
+        # Price the whole ladder in one vectorized pass (calls and puts)
+        K = np.asarray(strikes, dtype=float)
+        T = days_to_expiry / 365.0
+        sigma = iv / 100.0
+        ce = bs_greeks_vec(spot, K, T, 0.06, sigma, "CE")
+        pe = bs_greeks_vec(spot, K, T, 0.06, sigma, "PE")
+        
+        # Determine moneyness (relative to calls)
+        half_gap = OPTION_CHAIN_CONFIG['strike_gap'].get(symbol, 50) / 2
+        moneyness = np.where(np.abs(K - spot) < half_gap, "ATM", np.where(K > spot, "OTM", "ITM"))
+        
+        df = pd.DataFrame({
+            'Strike': strikes,
+            'Moneyness': moneyness,
+            'Call_Premium': np.round(ce['price'], 2),
+            'Call_Delta': np.round(ce['delta'], 4),
+            'Call_Gamma': np.round(ce['gamma'], 4),
+            'Call_Theta': np.round(ce['theta'], 4),
+            'Call_Vega': np.round(ce['vega'], 4),
+            'Put_Premium': np.round(pe['price'], 2),
+            'Put_Delta': np.round(pe['delta'], 4),
+            'Put_Gamma': np.round(pe['gamma'], 4),
+            'Put_Theta': np.round(pe['theta'], 4),
+            'Put_Vega': np.round(pe['vega'], 4),
+            'IV': iv,
+            'Days_to_Expiry': days_to_expiry
+        })
         return df
     
     def get_option_by_moneyness(self, 
@@ -222,7 +214,7 @@ class OptionsPricer:
             OptionContract object
         """
         if iv is None:
-            iv = self.estimate_iv_from_history(symbol)
+            iv = float(self.get_iv(symbol, strike, days_to_expiry, spot))
         
         opt_type_str = "CE" if option_type == OptionType.CE else "PE"
         
@@ -246,6 +238,37 @@ class OptionsPricer:
         
         return contract
     
+    def implied_vol_chain(self,
+                          spot: float,
+                          strikes,
+                          call_ltp,
+                          put_ltp,
+                          expiry_date: datetime,
+                          risk_free_rate: float = BS_PARAMS.get('risk_free_rate', 0.06)) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Implied volatility for every strike of a live chain (market LTPs)
+        
+        Args:
+            spot: Underlying spot price
+            strikes: Array of strikes
+            call_ltp / put_ltp: Arrays of call / put last traded prices
+            expiry_date: Expiry (date or datetime; contracts settle at 15:30)
+            risk_free_rate: Annual risk-free rate
+        
+        Returns:
+            (call_iv, put_iv) arrays as percentages, NaN where no IV exists
+        """
+        if not isinstance(expiry_date, datetime):
+            expiry_date = datetime.combine(expiry_date, datetime.min.time())
+        if expiry_date.hour == 0 and expiry_date.minute == 0:
+            expiry_date = expiry_date.replace(hour=15, minute=30)
+        T = max((expiry_date - datetime.now()).total_seconds(), 0) / (365 * 24 * 3600)
+        
+        K = np.asarray(strikes, dtype=float)
+        call_iv = implied_volatility_vec(np.asarray(call_ltp, dtype=float), spot, K, T, risk_free_rate, "CE")
+        put_iv = implied_volatility_vec(np.asarray(put_ltp, dtype=float), spot, K, T, risk_free_rate, "PE")
+        return call_iv * 100, put_iv * 100
+    
     def calculate_breakeven(self,
                            strike: float,
                            premium: float,
@@ -5,13 +5,18 @@ Scans for options at ₹3-10 that could 5-10x
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-from typing import List, Dict
+from typing import List, Dict, Iterator, Optional, Sequence
 import yfinance as yf
 
 from services.options_pricer import get_options_pricer
-from services.market_engine import calculate_indicators, get_days_to_expiry
+from utils.greeks_calculator import bs_price_vec
+from services.market_engine import get_days_to_expiry
 from models.trade_models import OptionType
-from config.config import SYMBOLS, ALL_FO_STOCKS
+from engine.panel_indicators import scan_panel
+from config.config import SYMBOLS, ALL_FO_STOCKS, OPTION_CHAIN_CONFIG
+
+SCREEN_COLUMNS = ['symbol', 'type', 'strike', 'spot', 'premium', 'distance_pct',
+                  'potential_multiplier', 'potential_value', 'iv', 'days', 'score']
 
 class LowPremiumScanner:
     """
@@ -26,81 +31,103 @@ class LowPremiumScanner:
         self.min_premium = 3.0
         self.max_premium = 15.0
         self.target_multiplier = 5.0  # Looking for 5x minimum
+        self.min_multiplier = 3.0     # Screen cut-off (3x+ potential)
+        self.min_distance = 100       # Points OTM beyond spot
+        self.max_distance_pct = 15.0  # Skip lottery strikes further than this
     
-    def get_otm_options(self, symbol: str, spot: float, days_to_expiry: int) -> List[Dict]:
-        """Get OTM options with low premiums"""
-        iv = self.pricer.estimate_iv_from_history(symbol)
+    def screen_universe(self, spots: Dict[str, float], expiry_days: Sequence[int],
+                        momentum: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+        """
+        Screens every symbol x expiry x strike x side in one vectorized pass.
+        Premium band, OTM distance and payoff multiple are applied as array masks;
+        survivors come back scored and ranked (best first).
         
-        # Generate strike ladder
-        strikes = self.pricer.get_strike_ladder(spot, symbol)
+        Args:
+            spots: {symbol: spot}
+            expiry_days: Days to expiry of each expiry to screen
+            momentum: Optional per-symbol table with Close / EMA20 / RSI (scan_panel output)
+        """
+        symbols = [s for s, px in spots.items() if px and px > 0]
+        if not symbols:
+            return pd.DataFrame(columns=SCREEN_COLUMNS)
         
-        low_premium_options = []
+        config = OPTION_CHAIN_CONFIG
+        spot = np.array([spots[s] for s in symbols], dtype=float)
+        gap = np.array([config['strike_gap'].get(s, 50) for s in symbols], dtype=float)
+        iv = np.array([self.pricer.estimate_iv_from_history(s) for s in symbols], dtype=float)
+        days = np.asarray(expiry_days, dtype=float)
+        offsets = np.arange(-config['strikes_below'], config['strikes_above'] + 1)
         
-        for strike in strikes:
-            # Skip ITM and ATM for calls (we want cheap OTM)
-            if strike <= spot + 100:  # Only OTM+ for calls
-                continue
-            
-            if strike >= spot - 100:  # Only OTM+ for puts
-                continue
-            
-            # Calculate Call premium
-            call_premium = self.pricer.bs_calculator.call_price(
-                spot, strike, days_to_expiry/365, 0.06, iv/100
-            )
-            
-            # Calculate Put premium  
-            put_premium = self.pricer.bs_calculator.put_price(
-                spot, strike, days_to_expiry/365, 0.06, iv/100
-            )
-            
-            # Check if CALL is in range
-            if self.min_premium <= call_premium <= self.max_premium:
-                # Calculate potential
-                distance_pct = abs(strike - spot) / spot * 100
-                
-                # Potential multiplier if spot moves to strike
-                intrinsic_at_strike = max(0, strike - spot) if strike > spot else 0
-                potential_value = intrinsic_at_strike + (call_premium * 0.3)  # Conservative
-                potential_multiplier = potential_value / call_premium if call_premium > 0 else 0
-                
-                if potential_multiplier >= 3.0:  # 3x+ potential
-                    low_premium_options.append({
-                        'symbol': symbol,
-                        'type': 'CE',
-                        'strike': strike,
-                        'spot': spot,
-                        'premium': round(call_premium, 2),
-                        'distance_pct': round(distance_pct, 2),
-                        'potential_multiplier': round(potential_multiplier, 1),
-                        'potential_value': round(potential_value, 2),
-                        'iv': round(iv, 2),
-                        'days': days_to_expiry
-                    })
-            
-            # Check if PUT is in range
-            if self.min_premium <= put_premium <= self.max_premium:
-                distance_pct = abs(spot - strike) / spot * 100
-                
-                intrinsic_at_strike = max(0, spot - strike) if strike < spot else 0
-                potential_value = intrinsic_at_strike + (put_premium * 0.3)
-                potential_multiplier = potential_value / put_premium if put_premium > 0 else 0
-                
-                if potential_multiplier >= 3.0:
-                    low_premium_options.append({
-                        'symbol': symbol,
-                        'type': 'PE',
-                        'strike': strike,
-                        'spot': spot,
-                        'premium': round(put_premium, 2),
-                        'distance_pct': round(distance_pct, 2),
-                        'potential_multiplier': round(potential_multiplier, 1),
-                        'potential_value': round(potential_value, 2),
-                        'iv': round(iv, 2),
-                        'days': days_to_expiry
-                    })
-        
-        return low_premium_options
+        # Axes: symbol x expiry x strike x side (CE, PE)
+        K = (np.round(spot / gap) * gap)[:, None] + gap[:, None] * offsets[None, :]
+        grid = (len(symbols), len(days), len(offsets), 2)
+        S4, K4 = np.broadcast_to(spot[:, None, None, None], grid), K[:, None, :, None]
+        T4 = (days / 365)[None, :, None, None]
+        call = np.array([True, False])[None, None, None, :]
+        premium = bs_price_vec(S4, K4, T4, 0.06, iv[:, None, None, None] / 100, call)
+        
+        distance = np.abs(K4 - S4)
+        otm = np.where(call, K4 > S4 + self.min_distance, K4 < S4 - self.min_distance) & (K4 > 0)
+        potential_value = np.where(otm, distance, 0.0) + premium * 0.3  # Conservative: spot moves to strike
+        with np.errstate(divide="ignore", invalid="ignore"):
+            multiplier = np.where(premium > 0, potential_value / premium, 0.0)
+        distance_pct = distance / S4 * 100
+        
+        mask = (otm & (premium >= self.min_premium) & (premium <= self.max_premium)
+                & (multiplier >= self.min_multiplier) & (distance_pct <= self.max_distance_pct))
+        i, e, k, side = np.nonzero(mask)
+        if not len(i):
+            return pd.DataFrame(columns=SCREEN_COLUMNS)
+        
+        prem = premium[mask]
+        mult = multiplier[mask]
+        dist = distance_pct[mask]
+        d = days[e]
+        is_ce = side == 0
+        
+        # Same factors as score_opportunity, as arrays
+        score = (np.select([prem < 5, prem < 10], [30, 20], 10)
+                 + np.select([mult >= 8, mult >= 5], [30, 20], 10)
+                 + np.select([dist < 3, dist < 5], [20, 15], 5)
+                 + np.select([d >= 7, d >= 5], [10, 5], 0))
+        if momentum is not None and not momentum.empty:
+            m = momentum.reindex(symbols)
+            close, ema20, rsi = (m[c].to_numpy(dtype=float) for c in ("Close", "EMA20", "RSI"))
+            bullish = (np.nan_to_num(rsi, nan=50) > 55) & (close > np.where(np.isnan(ema20), close, ema20))
+            bearish = (np.nan_to_num(rsi, nan=50) < 45) & (close < np.where(np.isnan(ema20), close, ema20))
+            score = score + 10 * np.where(is_ce, bullish[i], bearish[i])
+        
+        table = pd.DataFrame({
+            'symbol': np.asarray(symbols, dtype=object)[i],
+            'type': np.where(is_ce, "CE", "PE"),
+            'strike': K[i, k],
+            'spot': spot[i],
+            'premium': prem.round(2),
+            'distance_pct': dist.round(2),
+            'potential_multiplier': mult.round(1),
+            'potential_value': potential_value[mask].round(2),
+            'iv': iv[i].round(2),
+            'days': d.astype(int),
+            'score': np.minimum(score, 100),
+        })
+        return table.sort_values(['score', 'potential_multiplier'], ascending=False, ignore_index=True)
+    
+    def stream_opportunities(self, table: pd.DataFrame, min_score: float = 0) -> Iterator[Dict]:
+        """Yields screened options as dicts in rank order"""
+        for row in table.itertuples(index=False):
+            if row.score < min_score:
+                break
+            opt = row._asdict()
+            opt['strike'] = int(opt['strike']) if float(opt['strike']).is_integer() else float(opt['strike'])
+            yield opt
+    
+    def get_otm_options(self, symbol: str, spot: float, days_to_expiry: int) -> List[Dict]:
+        """Get OTM options with low premiums"""
+        table = self.screen_universe({symbol: spot}, [days_to_expiry])
+        options = list(self.stream_opportunities(table))
+        for opt in options:
+            opt.pop('score', None)
+        return options
     
     def score_opportunity(self, option: Dict, market_data: pd.DataFrame) -> float:
         """
@@ -154,50 +181,51 @@ class LowPremiumScanner:
         
         return min(100, score)
     
-    def scan_for_opportunities(self, symbols: List[str] = None) -> List[Dict]:
+    def get_market_data(self, symbols: List[str]) -> Dict[str, pd.DataFrame]:
+        """Daily bars for all symbols in one batched download"""
+        tickers = {SYMBOLS.get(s, f"{s}.NS"): s for s in symbols}
+        frames = {}
+        try:
+            data = yf.download(" ".join(tickers), period="1mo", interval="1d",
+                               group_by="ticker", progress=False, threads=True)
+        except Exception as e:
+            print(f"❌ Market data download failed: {e}")
+            return frames
+        if data is None or data.empty:
+            return frames
+        for ticker, sym in tickers.items():
+            try:
+                df = data[ticker] if isinstance(data.columns, pd.MultiIndex) else data
+                df = df.dropna(subset=['Close'])
+                if not df.empty:
+                    frames[sym] = df
+            except KeyError:
+                continue
+        return frames
+    
+    def scan_for_opportunities(self, symbols: List[str] = None, expiry_days: Sequence[int] = None) -> List[Dict]:
         """Scan all symbols for low premium opportunities"""
         
         if symbols is None:
-            symbols = ["NIFTY", "BANKNIFTY", "FINNIFTY"] + [s.replace(".NS", "") for s in ALL_FO_STOCKS[:10]]
-        
-        all_opportunities = []
+            symbols = ["NIFTY", "BANKNIFTY", "FINNIFTY"] + [s.replace(".NS", "") for s in ALL_FO_STOCKS]
+        if expiry_days is None:
+            expiry_days = [get_days_to_expiry()]
         
         print("🔍 Scanning for Low Premium Opportunities...")
         
-        for symbol_name in symbols:
-            try:
-                # Get market data
-                ticker_symbol = SYMBOLS.get(symbol_name, f"{symbol_name}.NS")
-                
-                ticker = yf.Ticker(ticker_symbol)
-                df = ticker.history(period="10d")
-                
-                if df.empty:
-                    continue
-                
-                # Use unified indicators
-                df = calculate_indicators(df)
-                
-                spot = df['Close'].iloc[-1]
-                days_to_expiry = get_days_to_expiry()
-                
-                # Get low premium options
-                options = self.get_otm_options(symbol_name, spot, days_to_expiry)
-                
-                # Score each
-                for opt in options:
-                    opt['score'] = self.score_opportunity(opt, df)
-                    
-                    # Only include good scores (60+)
-                    if opt['score'] >= 60:
-                        all_opportunities.append(opt)
-                        print(f"✅ {symbol_name} {opt['type']} {opt['strike']}: ₹{opt['premium']} → ₹{opt['potential_value']} ({opt['potential_multiplier']}x) [Score: {opt['score']}]")
-            
-            except Exception as e:
-                print(f"❌ Error scanning {symbol_name}: {e}")
+        frames = self.get_market_data(symbols)
+        if not frames:
+            return []
+        spots = {sym: float(df['Close'].iloc[-1]) for sym, df in frames.items()}
+        momentum = scan_panel(frames, min_bars=5)
+        
+        table = self.screen_universe(spots, expiry_days, momentum=momentum)
         
-        # Sort by score
-        all_opportunities.sort(key=lambda x: x['score'], reverse=True)
+        # Only include good scores (60+)
+        all_opportunities = []
+        for opt in self.stream_opportunities(table, min_score=60):
+            all_opportunities.append(opt)
+            print(f"✅ {opt['symbol']} {opt['type']} {opt['strike']}: ₹{opt['premium']} → ₹{opt['potential_value']} ({opt['potential_multiplier']}x) [Score: {opt['score']}]")
         
         return all_opportunities
     
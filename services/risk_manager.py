@@ -6,7 +6,7 @@ from typing import Dict, Optional, Tuple
 
 from models.trade_models import Greeks
 from database import get_db_manager
-from config.config import TRADING_CONFIG, RISK_LIMITS
+from config.config import TRADING_CONFIG, RISK_LIMITS, BS_PARAMS
 from services.pnl_calculator import get_pnl_calculator
 from services.trading_engine import TradingEngine
 
@@ -129,6 +129,9 @@ class RiskManager:
         # Calculate portfolio Greeks
         portfolio_greeks = self.get_portfolio_greeks()
         
+        # Worst cell of the scenario grid
+        stress = self.run_stress_test()
+        
         return {
             'total_exposure': round(total_exposure, 2),
             'current_value': round(total_current_value, 2),
@@ -138,9 +141,22 @@ class RiskManager:
             'portfolio_gamma': portfolio_greeks.gamma,
             'portfolio_theta': portfolio_greeks.theta,
             'portfolio_vega': portfolio_greeks.vega,
+            'stress_worst_pnl': stress['worst_pnl'] if stress else 0.0,
             'risk_percentage': round((abs(total_max_loss) / TRADING_CONFIG['initial_capital']) * 100, 2) if total_max_loss else 0
         }
     
+    def run_stress_test(self) -> Optional[Dict]:
+        """
+        Reprices the open book over the spot x IV x days scenario grid
+        
+        Returns:
+            Scenario result (P&L surface, worst cells) or None if nothing is repriced yet
+        """
+        from services.trading_engine import get_trading_engine
+        from services.scenario_engine import stress_position_book
+        book = get_trading_engine().book
+        return stress_position_book(book, r=BS_PARAMS['risk_free_rate']) if len(book) else None
+    
     def get_portfolio_greeks(self) -> Greeks:
         """
         Get aggregated portfolio Greeks
@@ -197,6 +213,16 @@ class RiskManager:
                 'message': f"ℹ️ High time decay: ₹{abs(greeks.theta):.2f}/day"
             })
         
+        # Scenario grid: worst case against the daily loss budget
+        stress = self.run_stress_test()
+        if stress and stress['worst_pnl'] < -max_daily_loss:
+            w = stress['worst'][0]
+            alerts.append({
+                'severity': 'HIGH',
+                'message': (f"⚠️ Stress loss ₹{abs(w['pnl']):.2f} exceeds daily limit "
+                            f"(spot {w['spot_shock_pct']:+.2f}%, IV {w['vol_shock']:+.0f}, {w['days']}d)")
+            })
+        
         return alerts
     
     def suggest_hedge(self) -> Optional[str]:
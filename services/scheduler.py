@@ -13,7 +13,8 @@ class InstitutionalScheduler:
         self.reports_sent = {
             "blueprint": False,
             "global": False,
-            "tactical": False
+            "tactical": False,
+            "features": False
         }
 
     def run_blueprint(self):
@@ -30,7 +31,7 @@ class InstitutionalScheduler:
             f"📅 DATE: `{datetime.now().strftime('%d-%b-%Y')}`\n\n"
             f"📊 **NIFTY 50 OUTLOOK**\n"
             f"∟ PCR: `{nifty_intel['pcr']}`\n"
-            f"∟ MAX PAIN: `{nifty_intel['max_pain']}`\n"
+            f"∟ MAX PAIN: `{nifty_intel['max_pain']}` (Next Expiry: `{nifty_intel.get('max_pain_next') or 'N/A'}`)\n"
             f"∟ BIAS: `{'🟢' if nifty_intel['bias'] == 'BULLISH' else '🔴'} {nifty_intel['bias']}`\n"
             f"∟ PROBABILITY: `{nifty_intel['prob']}%`\n\n"
             f"🚀 **CE ABOVE**: `{nifty_intel['ce_level']}`\n"
@@ -103,6 +104,12 @@ class InstitutionalScheduler:
             self.run_blueprint()
             self.reports_sent["blueprint"] = True
 
+        # 0. Pre-Market Daily Feature Table (8:15 AM)
+        if time_str == "08:15" and not self.reports_sent["features"]:
+            from services.daily_features import get_daily_features
+            get_daily_features().refresh()
+            self.reports_sent["features"] = True
+
         # 2. Morning Brief (8:30 AM)
         if time_str == "08:30" and not self.reports_sent["global"]:
             self.run_global_brief()
@@ -1,12 +1,45 @@
 import time
 import logging
+import numpy as np
 from datetime import datetime
 from services.upstox_engine import get_upstox_engine
+from services.chain_service import get_chain_service
 from utils.telegram_alert import send_telegram
 from pro_config import SIGNATURE
 
 logger = logging.getLogger("SentimentEngine")
 
+PAIN_EXPIRIES = 2  # Nearest + next expiry for the max pain curves
+
+def max_pain_curve(strikes, ce_oi, pe_oi):
+    """
+    Total option-buyer payout at expiry for every strike as the settlement price.
+    Strikes are sorted once; the call leg uses prefix sums of OI and OI*strike
+    below each strike and the put leg suffix sums above it, so the whole curve
+    is O(n log n) instead of the O(n^2) strike-by-strike loop.
+    Returns (sorted unique strikes, pain per strike).
+    """
+    strikes = np.asarray(strikes, dtype=float)
+    if strikes.size == 0:
+        return strikes, strikes
+    # Merge duplicate strikes (e.g. the same strike across several expiries)
+    uniq, inv = np.unique(strikes, return_inverse=True)
+    ce = np.bincount(inv, weights=np.nan_to_num(np.asarray(ce_oi, dtype=float)), minlength=len(uniq))
+    pe = np.bincount(inv, weights=np.nan_to_num(np.asarray(pe_oi, dtype=float)), minlength=len(uniq))
+
+    # Calls strictly below X: sum((X - K) * oi) = X * sum(oi) - sum(K * oi)
+    ce_cum = np.concatenate(([0.0], np.cumsum(ce)[:-1]))
+    ce_k_cum = np.concatenate(([0.0], np.cumsum(ce * uniq)[:-1]))
+    call_pain = uniq * ce_cum - ce_k_cum
+
+    # Puts strictly above X: sum((K - X) * oi) = sum(K * oi) - X * sum(oi)
+    pe_above = pe.sum() - np.cumsum(pe)
+    pe_k_above = (pe * uniq).sum() - np.cumsum(pe * uniq)
+    put_pain = pe_k_above - uniq * pe_above
+
+    return uniq, call_pain + put_pain
+
+
 class OptionSentimentEngine:
     def __init__(self, symbol):
         self.symbol = symbol
@@ -21,92 +54,106 @@ class OptionSentimentEngine:
         # Mapping for VIX lookup
         self.vix_key = "NSE_INDEX|India VIX"
 
-    def fetch_option_chain_data(self):
-        """Fetches and normalizes option chain data from Upstox"""
+    def fetch_option_chain_data(self, target_expiry=None):
+        """Fetches the option chain from Upstox as a ChainSnapshot ([] on failure)"""
         try:
             # 1. Get underlying instrument key
             idx_key = self.engine.get_instrument_key(self.symbol)
             if not idx_key: return []
             
             # 2. Get nearest expiry
-            expiries = self.engine.get_expiry_dates_via_sdk(idx_key)
-            if not expiries: return []
-            target_expiry = expiries[0] # Always analyze the nearest (most active)
-            
-            # 3. Fetch full chain via SDK
-            chain = self.engine.get_option_chain_via_sdk(idx_key, target_expiry)
-            if not chain: return []
+            if not target_expiry:
+                expiries = self.engine.get_expiry_dates(idx_key)
+                if not expiries: return []
+                target_expiry = expiries[0] # Always analyze the nearest (most active)
             
-            def safe_get(obj, attr):
-                try:
-                    return getattr(obj, attr, 0)
-                except:
-                    return 0
-
-            normalized_chain = []
-            for item in chain:
-                strike = item.strike_price
-                ce_data = item.call_options.market_data if item.call_options else None
-                pe_data = item.put_options.market_data if item.put_options else None
-                
-                normalized_chain.append({
-                    "strike": strike,
-                    "CE": {
-                        "oi": float(safe_get(ce_data, 'oi')),
-                        "oi_change": float(safe_get(ce_data, 'oi_day_change') or safe_get(ce_data, 'oi_change') or 0),
-                        "ltp": float(safe_get(ce_data, 'ltp'))
-                    },
-                    "PE": {
-                        "oi": float(safe_get(pe_data, 'oi')),
-                        "oi_change": float(safe_get(pe_data, 'oi_day_change') or safe_get(pe_data, 'oi_change') or 0),
-                        "ltp": float(safe_get(pe_data, 'ltp'))
-                    }
-                })
-            return normalized_chain
+            # 3. Full chain from the shared chain service
+            return get_chain_service().get_chain(self.engine, idx_key, target_expiry, underlying=self.symbol)
         except Exception as e:
             logger.error(f"Error fetching sentiment data for {self.symbol}: {e}")
             return []
 
+    def fetch_option_chains(self, num_expiries=2):
+        """Chain snapshots for the nearest `num_expiries` expiries -> {expiry: ChainSnapshot}"""
+        try:
+            idx_key = self.engine.get_instrument_key(self.symbol)
+            if not idx_key: return {}
+            expiries = self.engine.get_expiry_dates(idx_key) or []
+        except Exception as e:
+            logger.error(f"Error fetching expiries for {self.symbol}: {e}")
+            return {}
+        return {exp: self.fetch_option_chain_data(exp) for exp in expiries[:num_expiries]}
+
     def calculate_pcr(self, chain):
-        total_ce_oi = sum(s["CE"]["oi"] for s in chain)
-        total_pe_oi = sum(s["PE"]["oi"] for s in chain)
+        total_ce_oi = chain.ce_oi.sum()
+        total_pe_oi = chain.pe_oi.sum()
         if total_ce_oi == 0: return 1.0
-        return round(total_pe_oi / total_ce_oi, 2)
+        return round(float(total_pe_oi / total_ce_oi), 2)
 
     def calculate_oi_buildup(self, chain):
         from engine.option_oi_engine import get_oi_engine
         oi_engine = get_oi_engine()
         
-        total_ce_change = sum(s["CE"]["oi_change"] for s in chain)
-        total_pe_change = sum(s["PE"]["oi_change"] for s in chain)
+        total_ce_change = float(chain.ce_oi_chg.sum())
+        total_pe_change = float(chain.pe_oi_chg.sum())
         
-        # Analyze top strikes buildup
-        buildups = oi_engine.process_chain(chain[:10]) # Look at top 10 strikes
+        # Strike-level buildup vs the previous snapshot, reported for the 10 strikes around ATM
+        buildups = oi_engine.process_chain(chain)
+        atm = chain.atm_index() or 0
+        lo = max(0, atm - 5)
+        buildups = buildups[lo:lo + 10]
         
         return total_ce_change, total_pe_change, buildups
 
+    def calculate_pain_curve(self, chain):
+        """Max pain plus the full pain curve for one chain snapshot"""
+        curve_strikes, pain = max_pain_curve(chain.strike, chain.ce_oi, chain.pe_oi)
+        if len(curve_strikes) == 0:
+            return {"max_pain": 0, "strikes": [], "pain": []}
+        idx = int(np.argmin(pain))
+        return {
+            "max_pain": float(curve_strikes[idx]),
+            "strikes": curve_strikes.tolist(),
+            "pain": pain.tolist()
+        }
+
     def calculate_max_pain(self, chain):
         """Max Pain: Strike where option buyers lose the most (and sellers gain the most)"""
         try:
-            strikes = [s["strike"] for s in chain]
-            total_pain_list = []
-            
-            for test_strike in strikes:
-                pain = 0
-                for s in chain:
-                    # Call Pain: If test_strike > strike, CE is ITM
-                    if test_strike > s["strike"]:
-                        pain += (test_strike - s["strike"]) * s["CE"]["oi"]
-                    # Put Pain: If test_strike < strike, PE is ITM
-                    if test_strike < s["strike"]:
-                        pain += (s["strike"] - test_strike) * s["PE"]["oi"]
-                total_pain_list.append(pain)
-                
-            min_pain_idx = total_pain_list.index(min(total_pain_list))
-            return strikes[min_pain_idx]
+            return self.calculate_pain_curve(chain)["max_pain"]
         except:
             return 0
 
+    def calculate_max_pain_multi(self, chains):
+        """
+        Max pain across several expiries in one call.
+        chains: {expiry: ChainSnapshot}. Returns per-expiry curves plus a
+        "combined" curve over the OI of all expiries together.
+        """
+        result = {}
+        all_strikes, all_ce, all_pe = [], [], []
+        for expiry, chain in chains.items():
+            if not chain: continue
+            try:
+                result[expiry] = self.calculate_pain_curve(chain)
+            except Exception as e:
+                logger.error(f"Max pain error for {self.symbol} {expiry}: {e}")
+                continue
+            all_strikes.append(chain.strike)
+            all_ce.append(chain.ce_oi)
+            all_pe.append(chain.pe_oi)
+
+        if not all_strikes:
+            return result
+        curve_strikes, pain = max_pain_curve(np.concatenate(all_strikes), np.concatenate(all_ce), np.concatenate(all_pe))
+        if len(curve_strikes):
+            result["combined"] = {
+                "max_pain": float(curve_strikes[int(np.argmin(pain))]),
+                "strikes": curve_strikes.tolist(),
+                "pain": pain.tolist()
+            }
+        return result
+
     def get_vix(self):
         try:
             quotes = self.engine.get_market_quote([self.vix_key], mode="ltp")
@@ -121,12 +168,18 @@ class OptionSentimentEngine:
         if self.cache and (now - self.last_fetch_time < 60):
             return self.cache
 
-        chain = self.fetch_option_chain_data()
-        if not chain: return self.cache # Return old cache instead of None if API fails
+        # Nearest expiry drives PCR / buildup; max pain is tracked for the next one and combined too
+        chains = self.fetch_option_chains(PAIN_EXPIRIES)
+        expiries = [exp for exp, snap in chains.items() if snap]
+        if not expiries: return self.cache # Return old cache instead of None if API fails
+        chain = chains[expiries[0]]
         
         pcr = self.calculate_pcr(chain)
         ce_change, pe_change, buildups = self.calculate_oi_buildup(chain)
-        max_pain = self.calculate_max_pain(chain)
+        pain_curves = self.calculate_max_pain_multi(chains)
+        empty_curve = {"max_pain": 0, "strikes": [], "pain": []}
+        pain_curve = pain_curves.get(expiries[0], empty_curve)
+        max_pain = pain_curve["max_pain"]
         vix = self.get_vix()
         
         # 🧪 Sentiment Logic
@@ -149,6 +202,10 @@ class OptionSentimentEngine:
             "pcr": pcr,
             "sentiment": sentiment,
             "max_pain": max_pain,
+            "pain_curve": pain_curve,
+            "max_pain_next": pain_curves[expiries[1]]["max_pain"] if len(expiries) > 1 and expiries[1] in pain_curves else None,
+            "max_pain_combined": pain_curves.get("combined", empty_curve)["max_pain"],
+            "pain_curves": pain_curves,
             "ce_change": ce_change,
             "pe_change": pe_change,
             "buildups": buildups,
@@ -195,6 +252,7 @@ class OptionSentimentEngine:
             f"∟ Call: `{data['ce_change']:,.0f}`\n"
             f"∟ Put:  `{data['pe_change']:,.0f}`\n"
             f"🎯 **MAX PAIN**: `{data['max_pain']}`\n"
+            f"∟ Next Expiry: `{data.get('max_pain_next') or 'N/A'}` | All: `{data.get('max_pain_combined') or 'N/A'}`\n"
             f"━━━━━━━━━━━━━━━━━━━━\n"
             f"⏰ **TIME**: `{data['timestamp']}`\n"
             f"{SIGNATURE}"
@@ -5,7 +5,7 @@ Implements 7 profitable strategies with technical analysis
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 
 from models.trade_models import (
     StrategyType, StrategySignal, MarketCondition, TrendType,
@@ -13,6 +13,16 @@ from models.trade_models import (
 )
 from config.config import STRATEGY_PARAMS, IV_THRESHOLDS, EXPIRY_CONFIG, RISK_LIMITS
 from services.options_pricer import get_options_pricer
+from utils.greeks_calculator import bs_greeks_vec
+
+# (strike, "CE"/"PE") -> (premium, delta) for one underlying and expiry
+LegBook = Dict[Tuple[float, str], Tuple[float, float]]
+LEG_MONEYNESS = ("ATM", "OTM1", "OTM2")
+# market_engine Trend column ('UP'/'DOWN'/'NEUTRAL'; older rows used 'Bullish'/'Bearish')
+SCAN_TREND = {"UP": TrendType.BULLISH, "DOWN": TrendType.BEARISH,
+              "Bullish": TrendType.BULLISH, "Bearish": TrendType.BEARISH}
+RANK_COLUMNS = ['Symbol', 'Strategy', 'Action', 'Confidence', 'R:R', 'Entry', 'Stop Loss', 'Target',
+                'Max Loss', 'Max Profit', 'Legs', 'Trend', 'IV', 'IV Regime']
 
 class StrategyEngine:
     """
@@ -58,15 +68,22 @@ class StrategyEngine:
         resistance = latest.get('Resistance', spot * 1.02)
         supertrend = latest.get('Supertrend', spot)
         
-        # Determine trend
-        if spot > ema20 > ema50 and rsi > 50:
-            trend = TrendType.BULLISH
-        elif spot < ema20 < ema50 and rsi < 50:
-            trend = TrendType.BEARISH
-        elif abs(spot - ema20) < (spot * 0.01):  # Within 1% of EMA20
-            trend = TrendType.RANGE_BOUND
-        else:
-            trend = TrendType.NEUTRAL
+        return self._build_condition(symbol, spot, rsi, adx, ema20, ema50, support, resistance, supertrend)
+    
+    def _build_condition(self, symbol: str, spot: float, rsi: float, adx: float, ema20: float, ema50: float,
+                         support: float, resistance: float, supertrend: float,
+                         trend: Optional[TrendType] = None) -> MarketCondition:
+        """Trend / IV regime / signal classification shared by the single and batch paths"""
+        # Determine trend (unless the caller already classified it)
+        if trend is None:
+            if spot > ema20 > ema50 and rsi > 50:
+                trend = TrendType.BULLISH
+            elif spot < ema20 < ema50 and rsi < 50:
+                trend = TrendType.BEARISH
+            elif abs(spot - ema20) < (spot * 0.01):  # Within 1% of EMA20
+                trend = TrendType.RANGE_BOUND
+            else:
+                trend = TrendType.NEUTRAL
         
         # Estimate IV
         iv = self.options_pricer.estimate_iv_from_history(symbol)
@@ -109,7 +126,29 @@ class StrategyEngine:
             confidence=round(confidence, 2)
         )
     
-    def evaluate_long_call(self, market: MarketCondition, days_to_expiry: int) -> Optional[StrategySignal]:
+    def condition_from_scan_row(self, row: Dict[str, Any]) -> MarketCondition:
+        """MarketCondition from a get_comprehensive_scan() row (no candle refetch)"""
+        spot = float(row['Price'])
+        trend = SCAN_TREND.get(str(row.get('Trend')), TrendType.NEUTRAL)
+        return self._build_condition(
+            row['Stock'], spot, float(row.get('RSI', 50.0)), float(row.get('ADX', 20.0)),
+            spot, spot, float(row.get('Support') or spot * 0.98), float(row.get('Resistance') or spot * 1.02),
+            float(row.get('Supertrend') or spot), trend=trend
+        )
+    
+    def _leg(self, market: MarketCondition, strike: float, opt_type: str, days_to_expiry: int,
+             legs: Optional[LegBook] = None) -> Tuple[float, float]:
+        """(premium, delta) of one leg; served from / added to the shared leg book when given"""
+        key = (strike, opt_type)
+        if legs is not None and key in legs:
+            return legs[key]
+        g = bs_greeks_vec(market.spot_price, strike, days_to_expiry/365, 0.06, market.iv/100, opt_type)
+        quote = (float(g['price']), round(float(g['delta']), 4))
+        if legs is not None:
+            legs[key] = quote
+        return quote
+    
+    def evaluate_long_call(self, market: MarketCondition, days_to_expiry: int, legs: Optional[LegBook] = None) -> Optional[StrategySignal]:
         """
         Evaluate LONG CALL strategy
         Best for: Strong bullish trends with low to moderate IV
@@ -130,12 +169,7 @@ class StrategyEngine:
         )
         
         # Calculate premium and Greeks
-        premium = self.options_pricer.bs_calculator.call_price(
-            market.spot_price, strike, days_to_expiry/365, 0.06, market.iv/100
-        )
-        greeks = self.options_pricer.bs_calculator.calculate_greeks(
-            market.spot_price, strike, days_to_expiry/365, 0.06, market.iv/100, "CE"
-        )
+        premium, delta = self._leg(market, strike, "CE", days_to_expiry, legs)
         
         # Risk management
         entry_price = round(premium, 2)
@@ -166,12 +200,12 @@ class StrategyEngine:
                 'strike': strike,
                 'action': 'BUY',
                 'premium': entry_price,
-                'delta': greeks.delta
+                'delta': delta
             }],
             notes=f"Bullish trend detected. RSI: {market.rsi}, ADX: {market.adx}, IV: {market.iv}%"
         )
     
-    def evaluate_long_put(self, market: MarketCondition, days_to_expiry: int) -> Optional[StrategySignal]:
+    def evaluate_long_put(self, market: MarketCondition, days_to_expiry: int, legs: Optional[LegBook] = None) -> Optional[StrategySignal]:
         """
         Evaluate LONG PUT strategy
         Best for: Strong bearish trends with low to moderate IV
@@ -192,12 +226,7 @@ class StrategyEngine:
         )
         
         # Calculate premium and Greeks
-        premium = self.options_pricer.bs_calculator.put_price(
-            market.spot_price, strike, days_to_expiry/365, 0.06, market.iv/100
-        )
-        greeks = self.options_pricer.bs_calculator.calculate_greeks(
-            market.spot_price, strike, days_to_expiry/365, 0.06, market.iv/100, "PE"
-        )
+        premium, delta = self._leg(market, strike, "PE", days_to_expiry, legs)
         
         entry_price = round(premium, 2)
         stop_loss = round(entry_price * (1 - RISK_LIMITS['stop_loss_percent']), 2)
@@ -226,12 +255,12 @@ class StrategyEngine:
                 'strike': strike,
                 'action': 'BUY',
                 'premium': entry_price,
-                'delta': greeks.delta
+                'delta': delta
             }],
             notes=f"Bearish trend detected. RSI: {market.rsi}, ADX: {market.adx}, IV: {market.iv}%"
         )
     
-    def evaluate_bull_call_spread(self, market: MarketCondition, days_to_expiry: int) -> Optional[StrategySignal]:
+    def evaluate_bull_call_spread(self, market: MarketCondition, days_to_expiry: int, legs: Optional[LegBook] = None) -> Optional[StrategySignal]:
         """
         Evaluate BULL CALL SPREAD strategy
         Best for: Moderately bullish with high IV (to reduce cost)
@@ -247,17 +276,13 @@ class StrategyEngine:
         buy_strike = self.options_pricer.get_option_by_moneyness(
             market.spot_price, market.symbol, "ATM", "CE"
         )
-        buy_premium = self.options_pricer.bs_calculator.call_price(
-            market.spot_price, buy_strike, days_to_expiry/365, 0.06, market.iv/100
-        )
+        buy_premium, _ = self._leg(market, buy_strike, "CE", days_to_expiry, legs)
         
         # Sell OTM2 call
         sell_strike = self.options_pricer.get_option_by_moneyness(
             market.spot_price, market.symbol, "OTM2", "CE"
         )
-        sell_premium = self.options_pricer.bs_calculator.call_price(
-            market.spot_price, sell_strike, days_to_expiry/365, 0.06, market.iv/100
-        )
+        sell_premium, _ = self._leg(market, sell_strike, "CE", days_to_expiry, legs)
         
         # Net debit
         net_debit = buy_premium - sell_premium
@@ -293,7 +318,7 @@ class StrategyEngine:
             notes=f"Bull Call Spread. Net Debit: ₹{entry_price}. Max Profit: ₹{max_profit:.2f}"
         )
     
-    def evaluate_bear_put_spread(self, market: MarketCondition, days_to_expiry: int) -> Optional[StrategySignal]:
+    def evaluate_bear_put_spread(self, market: MarketCondition, days_to_expiry: int, legs: Optional[LegBook] = None) -> Optional[StrategySignal]:
         """
         Evaluate BEAR PUT SPREAD strategy
         Best for: Moderately bearish with high IV
@@ -309,17 +334,13 @@ class StrategyEngine:
         buy_strike = self.options_pricer.get_option_by_moneyness(
             market.spot_price, market.symbol, "ATM", "PE"
         )
-        buy_premium = self.options_pricer.bs_calculator.put_price(
-            market.spot_price, buy_strike, days_to_expiry/365, 0.06, market.iv/100
-        )
+        buy_premium, _ = self._leg(market, buy_strike, "PE", days_to_expiry, legs)
         
         # Sell OTM2 put
         sell_strike = self.options_pricer.get_option_by_moneyness(
             market.spot_price, market.symbol, "OTM2", "PE"
         )
-        sell_premium = self.options_pricer.bs_calculator.put_price(
-            market.spot_price, sell_strike, days_to_expiry/365, 0.06, market.iv/100
-        )
+        sell_premium, _ = self._leg(market, sell_strike, "PE", days_to_expiry, legs)
         
         net_debit = buy_premium - sell_premium
         entry_price = round(net_debit, 2)
@@ -353,7 +374,7 @@ class StrategyEngine:
             notes=f"Bear Put Spread. Net Debit: ₹{entry_price}. Max Profit: ₹{max_profit:.2f}"
         )
     
-    def evaluate_long_straddle(self, market: MarketCondition, days_to_expiry: int) -> Optional[StrategySignal]:
+    def evaluate_long_straddle(self, market: MarketCondition, days_to_expiry: int, legs: Optional[LegBook] = None) -> Optional[StrategySignal]:
         """
         Evaluate LONG STRADDLE strategy
         Best for: Expecting big move (high volatility) with currently low IV
@@ -371,12 +392,8 @@ class StrategyEngine:
             market.spot_price, market.symbol, "ATM", "CE"
         )
         
-        call_premium = self.options_pricer.bs_calculator.call_price(
-            market.spot_price, atm_strike, days_to_expiry/365, 0.06, market.iv/100
-        )
-        put_premium = self.options_pricer.bs_calculator.put_price(
-            market.spot_price, atm_strike, days_to_expiry/365, 0.06, market.iv/100
-        )
+        call_premium, _ = self._leg(market, atm_strike, "CE", days_to_expiry, legs)
+        put_premium, _ = self._leg(market, atm_strike, "PE", days_to_expiry, legs)
         
         total_premium = call_premium + put_premium
         entry_price = round(total_premium, 2)
@@ -414,7 +431,7 @@ class StrategyEngine:
             notes=f"Long Straddle. Breakeven: {lower_breakeven:.0f} - {upper_breakeven:.0f}"
         )
     
-    def evaluate_long_strangle(self, market: MarketCondition, days_to_expiry: int) -> Optional[StrategySignal]:
+    def evaluate_long_strangle(self, market: MarketCondition, days_to_expiry: int, legs: Optional[LegBook] = None) -> Optional[StrategySignal]:
         """
         Evaluate LONG STRANGLE strategy
         Best for: Expecting VERY BIG move with low IV (cheaper than straddle)
@@ -433,12 +450,8 @@ class StrategyEngine:
             market.spot_price, market.symbol, "OTM1", "PE"
         )
         
-        call_premium = self.options_pricer.bs_calculator.call_price(
-            market.spot_price, call_strike, days_to_expiry/365, 0.06, market.iv/100
-        )
-        put_premium = self.options_pricer.bs_calculator.put_price(
-            market.spot_price, put_strike, days_to_expiry/365, 0.06, market.iv/100
-        )
+        call_premium, _ = self._leg(market, call_strike, "CE", days_to_expiry, legs)
+        put_premium, _ = self._leg(market, put_strike, "PE", days_to_expiry, legs)
         
         total_premium = call_premium + put_premium
         entry_price = round(total_premium, 2)
@@ -472,7 +485,7 @@ class StrategyEngine:
             notes=f"Long Strangle. Cheaper than straddle, needs bigger move to profit."
         )
     
-    def evaluate_iron_condor(self, market: MarketCondition, days_to_expiry: int) -> Optional[StrategySignal]:
+    def evaluate_iron_condor(self, market: MarketCondition, days_to_expiry: int, legs: Optional[LegBook] = None) -> Optional[StrategySignal]:
         """
         Evaluate IRON CONDOR strategy
         Best for: Range-bound market with high IV (premium collection)
@@ -518,36 +531,86 @@ class StrategyEngine:
             return []
         
         # Evaluate all strategies
-        strategies = []
-        
-        signal = self.evaluate_long_call(market, days_to_expiry)
-        if signal:
-            strategies.append(signal)
-        
-        signal = self.evaluate_long_put(market, days_to_expiry)
-        if signal:
-            strategies.append(signal)
-        
-        signal = self.evaluate_bull_call_spread(market, days_to_expiry)
-        if signal:
-            strategies.append(signal)
-        
-        signal = self.evaluate_bear_put_spread(market, days_to_expiry)
-        if signal:
-            strategies.append(signal)
-        
-        signal = self.evaluate_long_straddle(market, days_to_expiry)
-        if signal:
-            strategies.append(signal)
-        
-        signal = self.evaluate_long_strangle(market, days_to_expiry)
-        if signal:
-            strategies.append(signal)
+        strategies = self._evaluate_market(market, days_to_expiry)
         
         # Sort by confidence (highest first)
         strategies.sort(key=lambda x: x.confidence, reverse=True)
         
         return strategies
+    
+    def _evaluate_market(self, market: MarketCondition, days_to_expiry: int,
+                         legs: Optional[LegBook] = None) -> List[StrategySignal]:
+        """Runs every evaluator for one market; legs priced once are shared between strategies"""
+        legs = {} if legs is None else legs
+        evaluators = (self.evaluate_long_call, self.evaluate_long_put, self.evaluate_bull_call_spread,
+                      self.evaluate_bear_put_spread, self.evaluate_long_straddle, self.evaluate_long_strangle)
+        return [signal for signal in (ev(market, days_to_expiry, legs) for ev in evaluators) if signal]
+    
+    def price_legs(self, markets: List[MarketCondition], days_to_expiry: int) -> Dict[Tuple, LegBook]:
+        """
+        Prices every candidate leg (ATM/OTM1/OTM2 x CE/PE) of every market in one vectorized pass.
+        Returns one leg book per (symbol, spot, iv), shared by all strategies on that underlying.
+        """
+        books: Dict[Tuple, LegBook] = {}
+        rows = []
+        for m in markets:
+            book_key = (m.symbol, m.spot_price, m.iv)
+            if book_key in books: continue
+            books[book_key] = {}
+            for opt_type in ("CE", "PE"):
+                for moneyness in LEG_MONEYNESS:
+                    strike = self.options_pricer.get_option_by_moneyness(m.spot_price, m.symbol, moneyness, opt_type)
+                    rows.append((book_key, strike, opt_type, m.spot_price, m.iv))
+        if not rows:
+            return books
+        
+        _, K, types, S, iv = zip(*rows)
+        g = bs_greeks_vec(np.array(S), np.array(K, dtype=float), days_to_expiry/365, 0.06,
+                          np.array(iv) / 100, np.array(types))
+        for (book_key, strike, opt_type, _, _), price, delta in zip(rows, g['price'], g['delta']):
+            books[book_key][(strike, opt_type)] = (float(price), round(float(delta), 4))
+        return books
+    
+    def evaluate_batch(self, markets: List[MarketCondition], days_to_expiry: int) -> List[StrategySignal]:
+        """
+        Evaluates all strategies across many markets.
+        Legs are priced for the whole batch at once and shared between strategies
+        on the same underlying and expiry.
+        """
+        if (days_to_expiry < EXPIRY_CONFIG['min_days_to_expiry'] or
+            days_to_expiry > EXPIRY_CONFIG['max_days_to_expiry']):
+            return []
+        
+        books = self.price_legs(markets, days_to_expiry)
+        signals = []
+        for m in markets:
+            signals.extend(self._evaluate_market(m, days_to_expiry, books[(m.symbol, m.spot_price, m.iv)]))
+        return signals
+    
+    def rank_strategies(self, signals: List[StrategySignal]) -> pd.DataFrame:
+        """Ranked table (confidence, then risk/reward) of batch signals"""
+        rows = [{
+            'Symbol': s.symbol,
+            'Strategy': s.strategy_type.value,
+            'Action': s.action,
+            'Confidence': s.confidence,
+            'R:R': s.risk_reward,
+            'Entry': s.entry_price,
+            'Stop Loss': s.stop_loss,
+            'Target': s.target,
+            'Max Loss': s.max_loss,
+            'Max Profit': s.max_profit,
+            'Legs': " / ".join(f"{l['action']} {l['type']} {l['strike']}" for l in s.option_legs),
+            'Trend': s.market_condition.trend.value,
+            'IV': s.market_condition.iv,
+            'IV Regime': s.market_condition.iv_regime,
+        } for s in signals]
+        table = pd.DataFrame(rows, columns=RANK_COLUMNS)
+        return table.sort_values(['Confidence', 'R:R'], ascending=False, ignore_index=True)
+    
+    def get_batch_recommendations(self, markets: List[MarketCondition], days_to_expiry: int) -> pd.DataFrame:
+        """Universe-wide strategy table for the strategy hub"""
+        return self.rank_strategies(self.evaluate_batch(markets, days_to_expiry))
 
 # Singleton instance
 _strategy_engine = None
@@ -127,7 +127,8 @@ class ThetaMonitor:
                 recommended_strike = position.strike_price + strike_gap
         
         # Calculate new premium
-        iv = self.pricer.estimate_iv_from_history(position.symbol)
+        # IV at the new strike / expiry from the surface (historical vol if no live chain)
+        iv = float(self.pricer.get_iv(position.symbol, recommended_strike, next_expiry_days, spot))
         
         if position.option_type.value == "CE":
             new_premium = self.pricer.bs_calculator.call_price(
@@ -2,16 +2,156 @@
 Trading Engine - Paper Trading Execution System
 Handles trade placement, position management, and lifecycle
 """
+import time
+import atexit
+import threading
 from datetime import datetime
-from typing import List, Optional
+from typing import Dict, List, Optional
 import urllib.request
 import urllib.parse
 import json
+import numpy as np
 
 from models.trade_models import Trade, Position, StrategySignal, OptionType, TradeStatus, Greeks
 from database import get_db_manager
 from config.config import TRADING_CONFIG, TELEGRAM_CONFIG
 from services.options_pricer import get_options_pricer
+from utils.greeks_calculator import bs_greeks_vec
+
+GREEK_FIELDS = ("delta", "gamma", "theta", "vega", "rho")
+
+class PositionBook:
+    """
+    In-memory open-position book held as parallel NumPy arrays.
+    Repricing a symbol is one vectorized Black-Scholes call; changed rows are
+    marked dirty and written back to SQLite in throttled batches. All access goes
+    through `lock` (the book is shared by every session of the process).
+    """
+    
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.meta: List[Position] = []  # Static fields per row (id, trade_id, symbol, type, ...)
+        self.symbol = np.array([], dtype=object)
+        self.strike = np.array([], dtype=float)
+        self.is_call = np.array([], dtype=bool)
+        self.qty = np.array([], dtype=float)
+        self.avg_price = np.array([], dtype=float)
+        self.price = np.array([], dtype=float)
+        self.pnl = np.array([], dtype=float)
+        self.stop_loss = np.array([], dtype=float)
+        self.target = np.array([], dtype=float)
+        self.greeks = np.zeros((0, len(GREEK_FIELDS)))
+        self.spot = np.array([], dtype=float)  # Market state of the last reprice (NaN until repriced)
+        self.iv = np.array([], dtype=float)
+        self.dte = np.array([], dtype=float)
+        self.updated_at = np.array([], dtype=float)
+        self.dirty = np.array([], dtype=bool)
+    
+    def __len__(self):
+        return len(self.meta)
+    
+    def add(self, position: Position, trade: Optional[Trade] = None):
+        with self.lock:
+            self._append(position, trade)
+    
+    def _append(self, position: Position, trade: Optional[Trade]):
+        g = position.greeks
+        self.meta.append(position)
+        self.symbol = np.append(self.symbol, position.symbol)
+        self.strike = np.append(self.strike, float(position.strike_price))
+        self.is_call = np.append(self.is_call, position.option_type == OptionType.CE)
+        self.qty = np.append(self.qty, float(position.quantity))
+        self.avg_price = np.append(self.avg_price, float(position.avg_price))
+        self.price = np.append(self.price, float(position.current_price if position.current_price is not None else position.avg_price))
+        self.pnl = np.append(self.pnl, float(position.pnl or 0.0))
+        self.stop_loss = np.append(self.stop_loss, float((trade.stop_loss if trade else None) or 0.0))
+        self.target = np.append(self.target, float((trade.target if trade else None) or 0.0))
+        self.greeks = np.vstack([self.greeks, [getattr(g, f) if g else 0.0 for f in GREEK_FIELDS]])
+        self.spot = np.append(self.spot, np.nan)
+        self.iv = np.append(self.iv, np.nan)
+        self.dte = np.append(self.dte, np.nan)
+        self.updated_at = np.append(self.updated_at, position.updated_at.timestamp() if position.updated_at else time.time())
+        self.dirty = np.append(self.dirty, False)
+    
+    def remove(self, position_id: int):
+        with self.lock:
+            idx = self.index_of(position_id)
+            if idx is None: return
+            keep = np.arange(len(self)) != idx
+            self.meta.pop(idx)
+            for name in ("symbol", "strike", "is_call", "qty", "avg_price", "price", "pnl",
+                         "stop_loss", "target", "greeks", "spot", "iv", "dte", "updated_at", "dirty"):
+                setattr(self, name, getattr(self, name)[keep])
+    
+    def index_of(self, position_id: int) -> Optional[int]:
+        with self.lock:
+            for i, p in enumerate(self.meta):
+                if p.id == position_id:
+                    return i
+            return None
+    
+    def reprice(self, symbol: str, spot: float, T: float, r: float, sigma: float):
+        """
+        Reprices every row of `symbol` in one call.
+        Returns [(position id, exit price, reason)] for rows that hit stop loss or target.
+        """
+        with self.lock:
+            rows = np.flatnonzero(self.symbol == symbol)
+            if not len(rows):
+                return []
+            g = bs_greeks_vec(spot, self.strike[rows], T, r, sigma, self.is_call[rows])
+            price = np.round(g['price'], 2)
+            self.price[rows] = price
+            self.greeks[rows] = np.round(np.column_stack([g[f] for f in GREEK_FIELDS]), 4)
+            self.pnl[rows] = np.round((price - self.avg_price[rows]) * self.qty[rows], 2)
+            self.spot[rows], self.iv[rows], self.dte[rows] = spot, sigma, T * 365
+            self.updated_at[rows] = time.time()
+            self.dirty[rows] = True
+            
+            stop_hit = (self.stop_loss[rows] > 0) & (price <= self.stop_loss[rows])
+            target_hit = ~stop_hit & (self.target[rows] > 0) & (price >= self.target[rows])
+            hit = stop_hit | target_hit
+            reasons = np.where(stop_hit[hit], "Stop Loss Hit", "Target Reached")
+            return [(self.meta[i].id, float(self.price[i]), reason) for i, reason in zip(rows[hit], reasons)]
+    
+    def has_symbol(self, symbol: str) -> bool:
+        with self.lock:
+            return bool((self.symbol == symbol).any())
+    
+    def meta_of(self, position_id: int) -> Optional[Position]:
+        with self.lock:
+            idx = self.index_of(position_id)
+            return None if idx is None else self.meta[idx]
+    
+    def position(self, i: int) -> Position:
+        """Materializes row i as a Position"""
+        base = self.meta[i]
+        g = self.greeks[i]
+        return Position(
+            id=base.id, trade_id=base.trade_id, symbol=base.symbol, option_type=base.option_type,
+            strike_price=base.strike_price, quantity=base.quantity, avg_price=base.avg_price,
+            current_price=float(self.price[i]), pnl=float(self.pnl[i]),
+            greeks=Greeks(**{f: float(g[k]) for k, f in enumerate(GREEK_FIELDS)}),
+            max_loss=base.max_loss, max_profit=base.max_profit, breakeven=base.breakeven,
+            updated_at=datetime.fromtimestamp(self.updated_at[i])
+        )
+    
+    def positions(self) -> List[Position]:
+        with self.lock:
+            order = np.argsort(-self.updated_at, kind="stable")
+            return [self.position(i) for i in order]
+    
+    def portfolio_greeks(self) -> Greeks:
+        """Quantity-weighted sum of Greeks over the whole book"""
+        with self.lock:
+            totals = (self.greeks * self.qty[:, None]).sum(axis=0) if len(self) else np.zeros(len(GREEK_FIELDS))
+        return Greeks(**{f: round(float(totals[k]), 4) for k, f in enumerate(GREEK_FIELDS)})
+    
+    def take_dirty(self) -> List[Position]:
+        with self.lock:
+            rows = np.flatnonzero(self.dirty)
+            self.dirty[rows] = False
+            return [self.position(i) for i in rows]
 
 class TradingEngine:
     """
@@ -24,6 +164,36 @@ class TradingEngine:
     def __init__(self):
         self.db = get_db_manager()
         self.options_pricer = get_options_pricer()
+        self.persist_interval = TRADING_CONFIG.get('position_persist_interval', 30)
+        self._book: Optional[PositionBook] = None
+        self._book_lock = threading.Lock()
+        self._last_persist = 0.0
+        # Repricing since the last throttled flush would otherwise be lost on shutdown
+        atexit.register(self.flush_positions, force=True)
+    
+    @property
+    def book(self) -> PositionBook:
+        """Open positions, loaded from the database once (trades fetched in one query)"""
+        if self._book is None:
+            with self._book_lock:
+                if self._book is None:
+                    book = PositionBook()
+                    positions = self.db.get_positions(active_only=True)
+                    trades = self.db.get_trades_by_ids({p.trade_id for p in positions})
+                    for p in positions:
+                        book.add(p, trades.get(p.trade_id))
+                    self._book = book
+        return self._book
+    
+    def flush_positions(self, force: bool = False):
+        """Writes repriced positions to the database in one batch (at most every persist_interval)"""
+        if self._book is None: return
+        now = time.time()
+        if not force and now - self._last_persist < self.persist_interval: return
+        dirty = self._book.take_dirty()
+        if dirty:
+            self.db.update_positions_batch(dirty)
+        self._last_persist = now
     
     def calculate_fees(self, premium: float, quantity: int) -> float:
         """
@@ -126,6 +296,9 @@ class TradingEngine:
             )
             
             position_id = self.db.save_position(position)
+            position.id = position_id
+            if self._book is not None:
+                self._book.add(position, trade)
             
             # Send alert
             self._send_trade_alert(trade, "ENTRY")
@@ -151,16 +324,14 @@ class TradingEngine:
             True if successful
         """
         # Get position
-        positions = self.db.get_positions(active_only=True)
-        position = next((p for p in positions if p.id == position_id), None)
+        position = self.book.meta_of(position_id)
         
-        if not position:
+        if position is None:
             print(f"Position {position_id} not found or already closed")
             return False
         
         # Get associated trade
-        trades = self.db.get_trades()
-        trade = next((t for t in trades if t.id == position.trade_id), None)
+        trade = self.db.get_trade_by_id(position.trade_id)
         
         if not trade:
             print(f"Trade {position.trade_id} not found")
@@ -186,6 +357,7 @@ class TradingEngine:
         
         # Delete position
         self.db.delete_position(position_id)
+        self.book.remove(position_id)
         
         # Send alert
         self._send_trade_alert(trade, "EXIT")
@@ -202,51 +374,24 @@ class TradingEngine:
             days_to_expiry: Days to expiry
             iv: Implied volatility (will estimate if None)
         """
+        if not self.book.has_symbol(symbol):
+            return
+        
         if iv is None:
             iv = self.options_pricer.estimate_iv_from_history(symbol)
         
-        positions = self.db.get_positions(active_only=True)
-        symbol_positions = [p for p in positions if p.symbol == symbol]
+        # Reprice every open position of this symbol in one vectorized pass
+        exits = self.book.reprice(symbol, current_price, days_to_expiry/365, 0.06, iv/100)
         
-        for position in symbol_positions:
-            # Recalculate option price
-            opt_type = "CE" if position.option_type == OptionType.CE else "PE"
-            
-            new_price = self.options_pricer.bs_calculator.call_price(
-                current_price, position.strike_price, days_to_expiry/365, 0.06, iv/100
-            ) if opt_type == "CE" else self.options_pricer.bs_calculator.put_price(
-                current_price, position.strike_price, days_to_expiry/365, 0.06, iv/100
-            )
-            
-            # Calculate Greeks
-            greeks = self.options_pricer.bs_calculator.calculate_greeks(
-                current_price, position.strike_price, days_to_expiry/365, 0.06, iv/100, opt_type
-            )
-            
-            # Update position
-            position.current_price = round(new_price, 2)
-            position.greeks = greeks
-            position.update_pnl()
-            
-            # Save to database
-            self.db.update_position(position)
-            
-            # Check for stop loss or target hit
-            if position.pnl is not None:
-                trade = next((t for t in self.db.get_trades() if t.id == position.trade_id), None)
-                
-                if trade:
-                    # Check stop loss
-                    if trade.stop_loss and position.current_price <= trade.stop_loss:
-                        self.close_position(position.id, position.current_price, "Stop Loss Hit")
-                    
-                    # Check target
-                    elif trade.target and position.current_price >= trade.target:
-                        self.close_position(position.id, position.current_price, "Target Reached")
+        # Stop loss / target exits (trade looked up by id inside close_position)
+        for position_id, exit_price, reason in exits:
+            self.close_position(position_id, exit_price, reason)
+        
+        self.flush_positions()
     
     def get_active_positions(self) -> List[Position]:
-        """Get all active positions"""
-        return self.db.get_positions(active_only=True)
+        """Get all active positions (in-memory book, latest prices)"""
+        return self.book.positions()
     
     def get_portfolio_greeks(self) -> Greeks:
         """
@@ -255,29 +400,7 @@ class TradingEngine:
         Returns:
             Greeks object with portfolio totals
         """
-        positions = self.get_active_positions()
-        
-        total_delta = 0.0
-        total_gamma = 0.0
-        total_theta = 0.0
-        total_vega = 0.0
-        total_rho = 0.0
-        
-        for pos in positions:
-            if pos.greeks:
-                total_delta += pos.greeks.delta * pos.quantity
-                total_gamma += pos.greeks.gamma * pos.quantity
-                total_theta += pos.greeks.theta * pos.quantity
-                total_vega += pos.greeks.vega * pos.quantity
-                total_rho += pos.greeks.rho * pos.quantity
-        
-        return Greeks(
-            delta=round(total_delta, 4),
-            gamma=round(total_gamma, 4),
-            theta=round(total_theta, 4),
-            vega=round(total_vega, 4),
-            rho=round(total_rho, 4)
-        )
+        return self.book.portfolio_greeks()
     
     def _send_trade_alert(self, trade: Trade, alert_type: str):
         """Send Telegram alert for trade"""
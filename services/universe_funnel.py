@@ -0,0 +1,114 @@
+"""
+Universe Funnel - Two-stage screen ahead of intraday candle fetches
+Stage 1 ranks the whole universe from bulk quote requests (change %, position
+in the day's range, volume vs the 20-day average from the daily feature
+table); only the top of that ranking reaches stage 2, where callers fetch
+candles and run the full indicator evaluation. Each cycle logs a funnel report.
+"""
+import time
+import logging
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from config.config import FUNNEL_CONFIG
+from services.daily_features import get_daily_features
+
+logger = logging.getLogger("UniverseFunnel")
+
+SESSION_MINUTES = 375  # 09:15 - 15:30
+# Stage-1 score weights: |change %|, range extremity (0..1), volume ratio (capped)
+W_CHANGE, W_RANGE, W_VOLUME = 1.0, 1.5, 0.5
+MAX_VOLUME_RATIO = 5.0
+
+
+def session_fraction(now: Optional[datetime] = None) -> float:
+    """Fraction of the trading session elapsed (1.0 outside market hours)"""
+    now = now or datetime.now()
+    elapsed = (now.hour * 60 + now.minute) - (9 * 60 + 15)
+    if elapsed <= 0 or elapsed >= SESSION_MINUTES:
+        return 1.0
+    return max(elapsed, 1) / SESSION_MINUTES
+
+
+def quote_frame(quotes: Dict[str, dict], symbol_keys: Dict[str, str]) -> pd.DataFrame:
+    """Full-mode quote payloads -> symbol-indexed ltp / open / high / low / prev_close / volume"""
+    rows = {}
+    for sym, key in symbol_keys.items():
+        q = quotes.get(key.replace(":", "|"))
+        if not q or not q.get("last_price"):
+            continue
+        ohlc = q.get("ohlc") or {}
+        ltp = float(q["last_price"])
+        rows[sym] = {
+            "ltp": ltp,
+            "open": float(ohlc.get("open") or np.nan),
+            "high": float(ohlc.get("high") or np.nan),
+            "low": float(ohlc.get("low") or np.nan),
+            "prev_close": ltp - float(q["net_change"]) if q.get("net_change") is not None else np.nan,
+            "volume": float(q.get("volume") or 0),
+        }
+    return pd.DataFrame.from_dict(rows, orient="index", columns=["ltp", "open", "high", "low", "prev_close", "volume"])
+
+
+def screen_quotes(frame: pd.DataFrame, features: pd.DataFrame, elapsed: float = 1.0) -> pd.DataFrame:
+    """
+    Vectorised stage-1 score for every quoted symbol (highest first).
+    prev_close / avg volume fall back to the daily feature table where the quote lacks them.
+    """
+    if frame.empty:
+        return frame.assign(chg_pct=[], range_pos=[], vol_ratio=[], score=[])
+    feat = features.reindex(frame.index)
+    prev = frame["prev_close"].where(frame["prev_close"] > 0, feat["prev_close"])
+    chg_pct = (frame["ltp"] - prev) / prev * 100
+    span = frame["high"] - frame["low"]
+    range_pos = ((frame["ltp"] - frame["low"]) / span.where(span > 0)).clip(0, 1)
+    vol_ratio = frame["volume"] / (feat["avg_volume_20"] * elapsed)
+
+    score = (W_CHANGE * chg_pct.abs().fillna(0)
+             + W_RANGE * ((range_pos - 0.5).abs() * 2).fillna(0)
+             + W_VOLUME * vol_ratio.clip(upper=MAX_VOLUME_RATIO).fillna(0))
+    out = frame.assign(chg_pct=chg_pct.round(2), range_pos=range_pos.round(3), vol_ratio=vol_ratio.round(2), score=score.round(3))
+    return out.sort_values("score", ascending=False)
+
+
+def screen_universe(engine, symbol_keys: Dict[str, str], size: Optional[int] = None) -> Tuple[List[str], pd.DataFrame, Dict]:
+    """
+    Stage 1: bulk quotes for every symbol -> top `size` by score.
+
+    Returns:
+        (shortlist, screened frame, report). If no quotes come back (token / off-market),
+        the whole universe is passed through so callers degrade to the old full scan.
+    """
+    size = size or FUNNEL_CONFIG["shortlist_size"]
+    batch = FUNNEL_CONFIG["quote_batch"]
+    t0 = time.time()
+    keys = list(symbol_keys.values())
+    quotes = {}
+    for i in range(0, len(keys), batch):
+        try:
+            quotes.update(engine.get_market_quote(keys[i:i + batch], mode="full") or {})
+        except Exception as e:
+            logger.error(f"Bulk quote failed: {e}")
+
+    frame = quote_frame(quotes, symbol_keys)
+    features = pd.DataFrame()
+    if len(frame):
+        # Feature table is keyed by plain symbol (no .NS)
+        features = get_daily_features().get_many(list(frame.index))
+        features = features.reindex([s.replace(".NS", "") for s in frame.index]).set_axis(frame.index)
+    screened = screen_quotes(frame, features, session_fraction())
+    shortlist = list(screened.index[:size]) if len(screened) else list(symbol_keys)
+
+    report = {"universe": len(symbol_keys), "quoted": len(frame), "shortlisted": len(shortlist),
+              "quote_s": round(time.time() - t0, 2)}
+    return shortlist, screened, report
+
+
+def log_funnel(name: str, report: Dict):
+    """One line per cycle: stage sizes and timings"""
+    stages = [(k, report[k]) for k in ("universe", "quoted", "shortlisted", "with_candles", "selected") if k in report]
+    timings = [f"{k[:-2]} {report[k]}s" for k in report if k.endswith("_s")]
+    logger.info(f"🔻 Funnel [{name}] " + " → ".join(f"{v} {k}" for k, v in stages) + (f" | {', '.join(timings)}" if timings else ""))
@@ -5,6 +5,7 @@ import gzip
 import io
 import json
 import time
+from collections import Counter
 from datetime import datetime
 from dotenv import load_dotenv
 
@@ -33,6 +34,9 @@ class UpstoxEngine:
             "Accept": "application/json"
         }
         self.instrument_map = {} # Cache: symbol -> instrument_key
+        self.expiry_master = {} # Cache: underlying_key -> set of option expiries (YYYY-MM-DD)
+        self.expiry_master_date = None
+        self.contract_specs = {} # Cache: underlying_key -> {"lot_size": int, "strikes": set()}
         self.is_initialized = False
 
     def initialize_mapper(self, exchanges=["NSE", "NFO", "BSE"]):
@@ -73,7 +77,11 @@ class UpstoxEngine:
                         # Support for -EQ and other common formats
                         if seg == "NSE_EQ" and symbol.isalpha():
                             self.instrument_map[f"{symbol}-EQ"] = key
+                        
+                        # Option expiries per underlying (expiry calendar, same pass)
+                        self._collect_expiry(item)
                 print(f"✅ Loaded {count} instruments from Complete Feed.")
+                self.expiry_master_date = datetime.now().date()
                 self.is_initialized = True
                 return
         except Exception as e:
@@ -105,6 +113,58 @@ class UpstoxEngine:
         
         self.is_initialized = True
 
+    def _collect_expiry(self, item):
+        """Adds an option contract's expiry to expiry_master[underlying_key]"""
+        if item.get('instrument_type') not in ("CE", "PE"): return
+        underlying = item.get('underlying_key')
+        expiry = item.get('expiry')
+        if not underlying or not expiry: return
+        try:
+            if isinstance(expiry, (int, float)):
+                expiry = datetime.fromtimestamp(expiry / 1000).strftime("%Y-%m-%d")
+            else:
+                expiry = str(expiry)[:10]
+        except Exception:
+            return
+        self.expiry_master.setdefault(underlying, set()).add(expiry)
+        
+        # Contract specs (lot size / strike grid) from the same rows
+        spec = self.contract_specs.setdefault(underlying, {"lot_size": None, "strikes": set()})
+        if item.get('lot_size'): spec["lot_size"] = int(item['lot_size'])
+        if item.get('strike_price'): spec["strikes"].add(float(item['strike_price']))
+
+    def get_contract_spec(self, instrument_key):
+        """(lot_size, strike_step) of an underlying's options from the instrument master; (None, None) if unknown"""
+        spec = self.contract_specs.get(instrument_key.replace(":", "|")) if instrument_key else None
+        if not spec: return None, None
+        strikes = sorted(spec["strikes"])
+        gaps = Counter(round(b - a, 2) for a, b in zip(strikes, strikes[1:]) if b > a)
+        # Most common gap = the strike step around ATM (far strikes are spaced wider)
+        step = gaps.most_common(1)[0][0] if gaps else None
+        return spec["lot_size"], step
+
+    def load_expiry_master(self):
+        """📅 Rebuilds expiry_master from the complete instrument feed (one bulk pass)"""
+        try:
+            url = "https://assets.upstox.com/market-quote/instruments/exchange/complete.json.gz"
+            response = requests.get(url, headers={"User-Agent": "Mozilla/5.0"}, timeout=60)
+            if response.status_code == 200:
+                self.expiry_master = {}
+                self.contract_specs = {}
+                with gzip.open(io.BytesIO(response.content), 'rt', encoding='utf-8') as f:
+                    for item in json.load(f):
+                        self._collect_expiry(item)
+                self.expiry_master_date = datetime.now().date()
+                print(f"✅ Expiry master loaded for {len(self.expiry_master)} underlyings.")
+        except Exception as e:
+            print(f"⚠️ Expiry master load failed: {e}")
+        return self.expiry_master
+
+    def get_expiry_dates(self, instrument_key):
+        """📅 Expiry dates from the daily expiry calendar (SDK only on a calendar miss)"""
+        from services.expiry_calendar import get_expiry_calendar
+        return get_expiry_calendar().get_expiries(self, instrument_key)
+
     def find_all_instruments(self, query):
         """Diagnostic: Find all symbols matching a query"""
         if not self.is_initialized: self.initialize_mapper()
@@ -296,6 +356,14 @@ class UpstoxEngine:
             print(f"❌ SDK Option Chain Error: {e}")
             return []
 
+    def get_option_chain_snapshot(self, instrument_key, expiry_date, underlying=None):
+        """🔗 Option chain decoded once into a columnar ChainSnapshot (HTTP fallback if SDK is empty)"""
+        from models.chain_snapshot import ChainSnapshot
+        chain = self.get_option_chain_via_sdk(instrument_key, expiry_date)
+        if not chain:
+            chain = self.get_option_chain(instrument_key, expiry_date)
+        return ChainSnapshot.from_response(chain, underlying=underlying or instrument_key, expiry=expiry_date)
+
     def get_websocket_auth_url(self):
         """
         🔐 Get Authorized WebSocket URL for Market Data Feed
@@ -17,6 +17,12 @@ class UpstoxStreamer:
         self.active_keys = set()
         self.lock = threading.Lock()
         self.is_running = False
+        self.tick_listeners = []  # fn(instrument_key, ltp) called on every tick
+
+    def add_tick_listener(self, fn):
+        """Registers fn(instrument_key, ltp) for live ticks (e.g. the scan event scheduler)"""
+        if fn not in self.tick_listeners:
+            self.tick_listeners.append(fn)
 
     def on_message(self, data):
         """Callback for incoming tick data (already converted to dict by SDK)"""
@@ -47,6 +53,12 @@ class UpstoxStreamer:
                     with self.lock:
                         LTP_CACHE[norm_key] = float(ltp)
                         LAST_UPDATE_CACHE[norm_key] = time.time()
+                    
+                    for listener in self.tick_listeners:
+                        try:
+                            listener(norm_key, float(ltp))
+                        except Exception:
+                            pass
         except Exception:
             pass
 
@@ -0,0 +1,184 @@
+"""
+Volatility Service - Daily realised-volatility table for the whole universe
+One batched daily-bar download per trading day (persisted under data/), from
+which close-to-close, Parkinson and EWMA volatilities are computed for every
+symbol at once and served from memory.
+"""
+import json
+import math
+import time
+import threading
+import logging
+from datetime import datetime, date
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+import yfinance as yf
+
+from config.config import DATA_DIR, SYMBOLS, STOCK_NAME_MAP
+
+logger = logging.getLogger("VolatilityService")
+
+VOL_FILE = DATA_DIR / "realized_vol.json"
+ESTIMATORS = ("cc", "parkinson", "ewma")
+WINDOW = 20          # bars for close-to-close / Parkinson
+EWMA_LAMBDA = 0.94   # RiskMetrics decay
+HISTORY = "90d"      # download span (EWMA warm-up)
+MIN_COVERAGE = 0.5   # fraction of symbols that must come back with a vol
+RETRY_SECONDS = 300  # back-off after a failed universe download
+
+
+def to_ticker(symbol: str) -> str:
+    """Trading symbol -> yfinance ticker (same mapping the pricer has always used)"""
+    ticker = SYMBOLS.get(symbol, symbol)
+    return ticker if ticker.startswith("^") or ticker.endswith(".NS") else f"{ticker}.NS"
+
+
+def realized_vol_table(high: pd.DataFrame, low: pd.DataFrame, close: pd.DataFrame,
+                       window: int = WINDOW, lam: float = EWMA_LAMBDA) -> pd.DataFrame:
+    """
+    Annualised realised vols (%) for every column of wide (date x symbol) OHLC frames.
+    Returns a symbol-indexed frame with one column per estimator.
+    """
+    annual = math.sqrt(252) * 100
+    log_ret = np.log(close / close.shift(1))
+    cc = log_ret.tail(window).std() * annual
+    hl = np.log(high / low) ** 2
+    parkinson = np.sqrt(hl.tail(window).mean() / (4 * math.log(2))) * annual
+    ewma = np.sqrt((log_ret ** 2).ewm(alpha=1 - lam, adjust=False, ignore_na=True).mean().iloc[-1]) * annual
+    return pd.DataFrame({"cc": cc, "parkinson": parkinson, "ewma": ewma})
+
+
+class VolatilityService:
+    """symbol -> {cc, parkinson, ewma} realised vol %, rebuilt once per day"""
+
+    def __init__(self, symbols: Optional[Iterable[str]] = None):
+        self.symbols: List[str] = list(symbols) if symbols else list(SYMBOLS) + list(STOCK_NAME_MAP)
+        self._vols: Dict[str, Dict[str, float]] = {}
+        self._day: Optional[date] = None
+        self.lock = threading.Lock()
+        self._build_lock = threading.Lock()  # one universe download at a time; readers keep self.lock
+        self._retry_at = 0.0
+        self.stats = {"hits": 0, "misses": 0, "downloads": 0}
+
+    def _download(self, symbols: List[str]) -> Dict[str, Dict[str, float]]:
+        """One batched daily download -> per-symbol vols (NaN where data is missing)"""
+        tickers = {to_ticker(s): s for s in symbols}
+        self.stats["downloads"] += 1
+        try:
+            data = yf.download(" ".join(tickers), period=HISTORY, interval="1d",
+                               group_by="column", progress=False, threads=True)
+        except Exception as e:
+            logger.error(f"Volatility download failed: {e}")
+            data = pd.DataFrame()
+
+        vols = {s: {e: float("nan") for e in ESTIMATORS} for s in symbols}
+        if data is None or data.empty:
+            return vols
+        if not isinstance(data.columns, pd.MultiIndex):  # single ticker
+            data.columns = pd.MultiIndex.from_product([data.columns, list(tickers)])
+
+        table = realized_vol_table(data["High"], data["Low"], data["Close"])
+        for ticker, row in table.iterrows():
+            if ticker in tickers:
+                vols[tickers[ticker]] = {e: float(row[e]) for e in ESTIMATORS}
+        return vols
+
+    def _load(self) -> bool:
+        try:
+            if VOL_FILE.exists():
+                saved = json.loads(VOL_FILE.read_text())
+                # An all-NaN table (written by a failed download) is ignored and rebuilt
+                if saved.get("date") == date.today().isoformat() and self._usable(saved.get("vols", {})):
+                    self._vols = saved["vols"]
+                    return True
+        except Exception as e:
+            logger.warning(f"Could not read {VOL_FILE.name}: {e}")
+        return False
+
+    def _save(self):
+        try:
+            VOL_FILE.write_text(json.dumps({"date": date.today().isoformat(), "vols": self._vols}, allow_nan=True))
+        except Exception as e:
+            logger.warning(f"Could not write {VOL_FILE.name}: {e}")
+
+    def _usable(self, vols: Dict[str, Dict[str, float]]) -> bool:
+        """A download counts only if enough symbols came back with a close-to-close vol"""
+        if not vols:
+            return False
+        ok = sum(np.isfinite(v.get("cc", float("nan"))) for v in vols.values())
+        return ok >= MIN_COVERAGE * len(vols)
+
+    def _adopt(self, vols: Dict[str, Dict[str, float]], day: date) -> bool:
+        """Installs a full-universe build as the day's table; a failed one is kept in memory only and retried"""
+        with self.lock:
+            if self._usable(vols):
+                self._vols = vols
+                self._day = day
+                self._save()
+                return True
+            for sym, vol in vols.items():
+                self._vols.setdefault(sym, vol)
+            self._retry_at = time.time() + RETRY_SECONDS
+            return False
+
+    def _merge(self, vols: Dict[str, Dict[str, float]]):
+        """Adds on-demand symbols; persisted only when the download actually returned bars"""
+        with self.lock:
+            self._vols.update(vols)
+            if self._usable(vols):
+                self._save()
+
+    def _rollover(self):
+        """Loads today's table from disk, or rebuilds it with one download (never under self.lock)"""
+        today = datetime.now().date()
+        with self.lock:
+            if self._day == today or time.time() < self._retry_at:
+                return
+        with self._build_lock:
+            with self.lock:
+                if self._day == today:
+                    return
+                if self._load():
+                    self._day = today
+                    return
+            if self._adopt(self._download(self.symbols), today):
+                logger.info(f"📈 Realised vol table built for {len(self._vols)} symbols")
+            else:
+                logger.warning(f"Volatility download came back empty - retrying in {RETRY_SECONDS}s")
+
+    def refresh(self):
+        """Forces a rebuild (e.g. pre-market job)"""
+        with self._build_lock:
+            if not self._adopt(self._download(self.symbols), datetime.now().date()):
+                logger.warning("Volatility refresh failed - keeping the current table")
+
+    def get_vol(self, symbol: str, estimator: str = "cc") -> float:
+        """Annualised realised vol % (NaN if unavailable)"""
+        symbol = symbol.replace(".NS", "")
+        self._rollover()
+        with self.lock:
+            if symbol in self._vols:
+                self.stats["hits"] += 1
+                return self._vols[symbol].get(estimator, float("nan"))
+            self.stats["misses"] += 1
+        # Outside the universe: fetched once and kept for the day (NaN included)
+        self._merge(self._download([symbol]))
+        with self.lock:
+            return self._vols[symbol].get(estimator, float("nan"))
+
+    def get_table(self) -> pd.DataFrame:
+        self._rollover()
+        with self.lock:
+            return pd.DataFrame.from_dict(self._vols, orient="index", columns=list(ESTIMATORS))
+
+
+# Singleton
+_volatility_service = None
+
+def get_volatility_service() -> VolatilityService:
+    global _volatility_service
+    if _volatility_service is None:
+        _volatility_service = VolatilityService()
+    return _volatility_service
@@ -0,0 +1,168 @@
+"""
+Work Queue - Deadline-aware priority executor for scanner work
+Tasks carry a class (index > open-trade monitoring > shortlisted stocks >
+universe sweep) and a deadline. A bounded worker pool always serves the
+highest class first; low-priority work that is already late when it reaches
+a worker is deferred once (shortlist) or shed (sweep) instead of delaying
+the work that matters. Deadlines are tighter in the 3 PM power window.
+"""
+import heapq
+import time
+import threading
+import logging
+from concurrent.futures import Future
+from enum import IntEnum
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger("WorkQueue")
+
+
+class TaskClass(IntEnum):
+    INDEX = 0       # index bias / elite index alerts
+    MONITOR = 1     # open-trade target / SL monitoring
+    SHORTLIST = 2   # movers & event-triggered stocks
+    SWEEP = 3       # full universe sweep
+
+
+# Seconds from submission
+DEADLINES = {TaskClass.INDEX: 5.0, TaskClass.MONITOR: 5.0, TaskClass.SHORTLIST: 15.0, TaskClass.SWEEP: 60.0}
+POWER_DEADLINES = {TaskClass.INDEX: 2.0, TaskClass.MONITOR: 2.0, TaskClass.SHORTLIST: 5.0, TaskClass.SWEEP: 20.0}
+MAX_WORKERS = 6
+
+
+class _Task:
+    __slots__ = ("fn", "args", "kwargs", "cls", "name", "submitted", "deadline", "future", "deferred")
+
+    def __init__(self, fn, args, kwargs, cls, name, deadline):
+        self.fn, self.args, self.kwargs = fn, args, kwargs
+        self.cls, self.name = cls, name
+        self.submitted = time.time()
+        self.deadline = self.submitted + deadline
+        self.future = Future()
+        self.deferred = False
+
+
+class DeadlineWorkQueue:
+    """(class, deadline) min-heap served by a bounded pool of daemon workers"""
+
+    def __init__(self, max_workers: int = MAX_WORKERS):
+        self.max_workers = max_workers
+        self.power_mode = False
+        self._heap: List = []
+        self._seq = 0
+        self._cond = threading.Condition()
+        self._workers: List[threading.Thread] = []
+        self.stats = {c: {"submitted": 0, "met": 0, "missed": 0, "deferred": 0, "shed": 0, "errors": 0}
+                      for c in TaskClass}
+
+    def set_power_mode(self, active: bool):
+        self.power_mode = active
+
+    def _push(self, task: _Task):
+        self._seq += 1
+        heapq.heappush(self._heap, (int(task.cls), task.deadline, self._seq, task))
+        self._cond.notify()
+
+    def submit(self, fn: Callable, *args, task_class: TaskClass = TaskClass.SWEEP,
+               deadline: Optional[float] = None, name: Optional[str] = None, **kwargs) -> Future:
+        """
+        Queues fn(*args, **kwargs). `deadline` is seconds from now (default per class / power mode).
+        Shed tasks come back as cancelled futures.
+        """
+        if deadline is None:
+            deadline = (POWER_DEADLINES if self.power_mode else DEADLINES)[task_class]
+        task = _Task(fn, args, kwargs, task_class, name or getattr(fn, "__name__", "task"), deadline)
+        with self._cond:
+            self._start()
+            self.stats[task_class]["submitted"] += 1
+            self._push(task)
+        return task.future
+
+    def map(self, fn: Callable, items, task_class: TaskClass = TaskClass.SWEEP,
+            deadline: Optional[float] = None, timeout: Optional[float] = None) -> List:
+        """Runs fn(item) for every item and waits; shed / failed / unfinished items yield None"""
+        futures = [self.submit(fn, item, task_class=task_class, deadline=deadline, name=str(item)) for item in items]
+        end = time.time() + timeout if timeout is not None else None
+        results = []
+        for fut in futures:
+            try:
+                results.append(fut.result(timeout=max(end - time.time(), 0) if end else None))
+            except Exception:
+                results.append(None)
+        return results
+
+    # --- Workers ------------------------------------------------------------
+
+    def _start(self):
+        """Lazily spawns the worker pool (caller holds the condition)"""
+        while len(self._workers) < self.max_workers:
+            t = threading.Thread(target=self._run, daemon=True, name=f"work-queue-{len(self._workers)}")
+            self._workers.append(t)
+            t.start()
+
+    def _next(self) -> _Task:
+        with self._cond:
+            while True:
+                while not self._heap:
+                    self._cond.wait()
+                task = heapq.heappop(self._heap)[-1]
+                if time.time() <= task.deadline or task.cls <= TaskClass.MONITOR:
+                    return task
+                # Late low-priority work: one second chance for the shortlist, sweep work is dropped
+                if task.cls == TaskClass.SHORTLIST and not task.deferred:
+                    task.deferred = True
+                    task.deadline = time.time() + (POWER_DEADLINES if self.power_mode else DEADLINES)[task.cls]
+                    self.stats[task.cls]["deferred"] += 1
+                    self._push(task)
+                    continue
+                self.stats[task.cls]["shed"] += 1
+                task.future.cancel()
+
+    def _run(self):
+        while True:
+            task = self._next()
+            if not task.future.set_running_or_notify_cancel():
+                continue
+            try:
+                result = task.fn(*task.args, **task.kwargs)
+            except Exception as e:
+                # A failure is neither met nor missed - it never produced a result
+                with self._cond:
+                    self.stats[task.cls]["errors"] += 1
+                logger.error(f"Task {task.name} failed: {e}")
+                task.future.set_exception(e)
+                continue
+            with self._cond:
+                on_time = time.time() <= task.deadline and not task.deferred
+                self.stats[task.cls]["met" if on_time else "missed"] += 1
+            task.future.set_result(result)
+
+    # --- Reporting ----------------------------------------------------------
+
+    def pending(self) -> int:
+        return len(self._heap)
+
+    def report(self) -> Dict[str, Dict]:
+        """Per-class counts plus the deadline-met rate of the tasks that ran (failures count against it)"""
+        with self._cond:
+            out = {}
+            for cls, s in self.stats.items():
+                ran = s["met"] + s["missed"] + s["errors"]
+                out[cls.name] = dict(s, met_rate=round(s["met"] / ran * 100, 1) if ran else None)
+            return out
+
+    def log_report(self):
+        parts = [f"{name}: {s['met_rate']}% met, {s['errors']} failed, {s['shed']} shed, {s['deferred']} deferred"
+                 for name, s in self.report().items() if s["submitted"]]
+        if parts:
+            logger.info(f"⏱ Work queue ({'POWER' if self.power_mode else 'normal'}) | " + " | ".join(parts))
+
+
+# Singleton
+_work_queue = None
+
+def get_work_queue() -> DeadlineWorkQueue:
+    global _work_queue
+    if _work_queue is None:
+        _work_queue = DeadlineWorkQueue()
+    return _work_queue
@@ -0,0 +1,46 @@
+"""Shared fixtures for the scanner test-suite"""
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def make_candles(n=300, seed=0, start="2024-01-01 09:15", freq="5min"):
+    """Random-walk OHLCV frame (lower case columns, DatetimeIndex)"""
+    rng = np.random.default_rng(seed)
+    close = 1000 + np.cumsum(rng.normal(0, 3, n))
+    open_ = close + rng.normal(0, 1, n)
+    high = np.maximum(open_, close) + rng.uniform(0, 3, n)
+    low = np.minimum(open_, close) - rng.uniform(0, 3, n)
+    volume = rng.integers(1_000, 50_000, n).astype(float)
+    idx = pd.date_range(start, periods=n, freq=freq)
+    return pd.DataFrame({"open": open_, "high": high, "low": low, "close": close, "volume": volume}, index=idx)
+
+
+@pytest.fixture
+def candles():
+    return make_candles()
+
+
+def chain_payload(strikes, ce_oi, pe_oi, spot=None, ce_ltp=None, pe_ltp=None, ce_chg=None, pe_chg=None):
+    """Upstox HTTP option-chain payload (list of per-strike dicts)"""
+    n = len(strikes)
+    ce_ltp = ce_ltp if ce_ltp is not None else [10.0] * n
+    pe_ltp = pe_ltp if pe_ltp is not None else [10.0] * n
+    ce_chg = ce_chg if ce_chg is not None else [0.0] * n
+    pe_chg = pe_chg if pe_chg is not None else [0.0] * n
+    return [
+        {
+            "strike_price": float(strikes[i]),
+            "underlying_spot_price": spot,
+            "call_options": {"instrument_key": f"CE|{strikes[i]}",
+                             "market_data": {"oi": ce_oi[i], "oi_day_change": ce_chg[i], "ltp": ce_ltp[i], "volume": 100}},
+            "put_options": {"instrument_key": f"PE|{strikes[i]}",
+                            "market_data": {"oi": pe_oi[i], "oi_day_change": pe_chg[i], "ltp": pe_ltp[i], "volume": 100}},
+        }
+        for i in range(n)
+    ]
@@ -0,0 +1,67 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from models import ChainSnapshot
+from tests.conftest import chain_payload
+
+
+def _sdk_item(strike, oi, ltp, prev_oi=None, spot=21510.0):
+    md = SimpleNamespace(oi=oi, prev_oi=prev_oi, oi_day_change=None, ltp=ltp, volume=10)
+    opt = SimpleNamespace(instrument_key=f"NSE_FO|{strike}", market_data=md, option_greeks=SimpleNamespace(iv=14.5))
+    return SimpleNamespace(strike_price=strike, underlying_spot_price=spot, call_options=opt, put_options=None)
+
+
+def test_http_payload_is_decoded_sorted_by_strike():
+    strikes = [21600, 21400, 21500]
+    snap = ChainSnapshot.from_response(chain_payload(strikes, [3, 1, 2], [30, 10, 20], spot=21480.0,
+                                                     ce_chg=[0.3, 0.1, 0.2]), "NIFTY", "2026-10-22T00:00:00")
+    assert list(snap.strike) == [21400.0, 21500.0, 21600.0]
+    assert list(snap.ce_oi) == [1.0, 2.0, 3.0]
+    assert list(snap.pe_oi) == [10.0, 20.0, 30.0]
+    assert list(snap.ce_oi_chg) == [0.1, 0.2, 0.3]
+    assert snap.expiry == "2026-10-22"
+    assert snap.spot == 21480.0
+    assert len(snap) == 3
+    assert snap.ce_present.all() and snap.pe_present.all()
+
+
+def test_sdk_objects_fall_back_to_prev_oi_and_mark_missing_sides():
+    snap = ChainSnapshot.from_response([_sdk_item(100.0, 500, 4.5, prev_oi=300), _sdk_item(90.0, 50, 9.0)])
+    assert list(snap.strike) == [90.0, 100.0]
+    assert list(snap.ce_oi_chg) == [0.0, 200.0]
+    assert list(snap.ce_iv) == [14.5, 14.5]
+    assert not snap.pe_present.any()
+    assert np.isnan(snap.pe_iv).all()
+    assert snap.spot == 21510.0
+
+
+def test_arrays_are_read_only():
+    snap = ChainSnapshot.from_response(chain_payload([100], [1], [2]))
+    with pytest.raises(ValueError):
+        snap.ce_oi[0] = 5
+    with pytest.raises(Exception):
+        snap.spot = 1.0
+
+
+def test_lookups_and_helpers():
+    strikes = [21400, 21500, 21600]
+    snap = ChainSnapshot.from_response(chain_payload(strikes, [100, 200, 300], [300, 200, 100], spot=21520.0,
+                                                     ce_ltp=[150.0, 80.0, 30.0]))
+    assert snap.find(21500) == 1
+    assert snap.find(21550) is None
+    assert snap.atm_index() == 1
+    assert snap.ltp(21600, "CE") == 30.0
+    assert snap.ltp(21700, "CE") == 0.0
+    assert snap.instrument_key(21400, "PE") == "PE|21400"
+    assert snap.pcr() == 1.0
+    assert list(snap.to_frame()["call_oi"]) == [100.0, 200.0, 300.0]
+    assert snap.to_records()[0]["PE"]["oi"] == 300.0
+
+
+def test_empty_chain():
+    snap = ChainSnapshot.from_response([])
+    assert len(snap) == 0 and not snap
+    assert snap.atm_index() is None
+    assert snap.pcr() == 0.0
@@ -0,0 +1,54 @@
+"""DailyFeatureService: downloads outside the lock, failed builds are not kept as the day's table"""
+import pytest
+
+from services import daily_features
+from services.daily_features import DailyFeatureService, FEATURE_COLUMNS
+
+
+def _features(symbols, bars=250.0):
+    return {s: {c: (bars if c == "bars" else 100.0) for c in FEATURE_COLUMNS} for s in symbols}
+
+
+@pytest.fixture
+def service(tmp_path, monkeypatch):
+    monkeypatch.setattr(daily_features, "FEATURE_FILE", tmp_path / "daily_features.json")
+    svc = DailyFeatureService(["AAA", "BBB"])
+    svc.calls = []
+    svc.bars = 250.0
+
+    def fake_download(symbols):
+        assert not svc.lock.locked()
+        svc.calls.append(list(symbols))
+        return _features(symbols, svc.bars)
+
+    monkeypatch.setattr(svc, "_download", fake_download)
+    return svc
+
+
+def test_build_and_miss_download_outside_lock(service):
+    assert service.get("AAA.NS")["bars"] == 250.0
+    table = service.get_many(["AAA", "CCC"])
+    assert list(table.index) == ["AAA", "CCC"]
+    assert service.calls == [["AAA", "BBB"], ["CCC"]]
+    assert daily_features.FEATURE_FILE.exists()
+
+
+def test_failed_build_is_not_saved_and_is_retried(service):
+    service.bars = float("nan")
+    assert service.get("AAA")["bars"] != service.get("AAA")["bars"]  # NaN served, no re-download
+    assert service.calls == [["AAA", "BBB"]]
+    assert service._day is None
+    assert not daily_features.FEATURE_FILE.exists()
+
+    service.bars = 250.0
+    service._retry_at = 0.0
+    assert service.get("AAA")["bars"] == 250.0
+    assert len(service.calls) == 2
+    assert daily_features.FEATURE_FILE.exists()
+
+
+def test_failed_refresh_keeps_current_table(service):
+    service.get("AAA")
+    service.bars = float("nan")
+    service.refresh()
+    assert service.get("BBB")["bars"] == 250.0
@@ -0,0 +1,58 @@
+from models import ChainSnapshot
+from services.chain_service import OptionChainService
+from services.event_scheduler import ScanEventScheduler
+from tests.conftest import chain_payload
+
+
+class _SequenceEngine:
+    """Serves the given snapshots one per fetch"""
+
+    def __init__(self, snapshots):
+        self.snapshots = list(snapshots)
+
+    def get_option_chain_snapshot(self, instrument_key, expiry, underlying=None):
+        return self.snapshots.pop(0)
+
+
+def _snapshot(underlying, ce_oi, pe_oi):
+    return ChainSnapshot.from_response(chain_payload([100, 110], ce_oi, pe_oi, spot=105.0), underlying, "2026-10-29")
+
+
+def _refresh_twice(scheduler, underlying, first, second):
+    service = OptionChainService(ttl=0, stale_ttl=0)
+    service.add_listener(scheduler.on_chain_refresh)
+    engine = _SequenceEngine([first, second])
+    service.get_chain(engine, f"NSE_EQ|{underlying}", "2026-10-29", underlying=underlying)
+    service.get_chain(engine, f"NSE_EQ|{underlying}", "2026-10-29", underlying=underlying)
+
+
+def test_oi_jump_between_snapshots_enqueues_watched_symbol():
+    scheduler = ScanEventScheduler()
+    scheduler.watch({"RELIANCE": "NSE_EQ|INE002A01018"})
+    _refresh_twice(scheduler, "RELIANCE", _snapshot("RELIANCE", [1000, 1000], [1000, 1000]),
+                   _snapshot("RELIANCE", [1100, 1100], [1000, 1000]))   # +5% total OI
+    assert scheduler.next_batch(timeout=0) == [("RELIANCE", ["OI"])]
+
+
+def test_small_oi_change_and_unwatched_underlyings_are_ignored():
+    scheduler = ScanEventScheduler()
+    scheduler.watch({"RELIANCE": "NSE_EQ|INE002A01018"})
+    _refresh_twice(scheduler, "RELIANCE", _snapshot("RELIANCE", [1000, 1000], [1000, 1000]),
+                   _snapshot("RELIANCE", [1010, 1000], [1000, 1000]))
+    _refresh_twice(scheduler, "NIFTY", _snapshot("NIFTY", [1000, 1000], [1000, 1000]),
+                   _snapshot("NIFTY", [5000, 5000], [1000, 1000]))
+    assert scheduler.pending() == 0
+
+
+def test_ticks_coalesce_and_serve_largest_move_first():
+    scheduler = ScanEventScheduler()
+    scheduler.watch({"A": "NSE_EQ|A", "B": "NSE_EQ|B"})
+    for key in ("NSE_EQ|A", "NSE_EQ|B"):
+        scheduler.on_tick(key, 100.0)          # reference prices
+    scheduler.on_tick("NSE_EQ|A", 100.4)
+    scheduler.on_tick("NSE_EQ|A", 100.6)       # same symbol, bigger move: upgraded, not duplicated
+    scheduler.on_tick("NSE_EQ|B", 101.0)
+    scheduler.on_bar_close(["A"])
+    assert scheduler.next_batch(timeout=0) == [("B", ["MOVE"]), ("A", ["MOVE", "BAR_5minute"])]
+    scheduler.done("A", 100.6)
+    assert scheduler.move_since_last("A", 101.1) > 0.49
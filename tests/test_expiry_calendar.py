@@ -0,0 +1,44 @@
+"""ExpiryCalendar: master download outside the lookup lock, once per day"""
+import threading
+import time
+from datetime import date, timedelta
+
+from services.expiry_calendar import ExpiryCalendar
+
+KEY = "NSE_INDEX|Nifty 50"
+
+
+class FakeEngine:
+    def __init__(self, calendar):
+        self.calendar = calendar
+        self.expiry_master = {}
+        self.expiry_master_date = None
+        self.loads = 0
+
+    def load_expiry_master(self):
+        assert not self.calendar.lock.locked()
+        self.loads += 1
+        time.sleep(0.1)
+        today = date.today()
+        self.expiry_master = {KEY: [(today + timedelta(days=d)).isoformat() for d in (14, 7, -7)]}
+        self.expiry_master_date = today
+        return self.expiry_master
+
+    def get_expiry_dates_via_sdk(self, key):
+        return []
+
+
+def test_concurrent_lookups_share_one_master_download():
+    calendar = ExpiryCalendar()
+    engine = FakeEngine(calendar)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(calendar.get_expiries(engine, KEY))) for _ in range(4)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+
+    assert engine.loads == 1
+    today = date.today()
+    expected = [(today + timedelta(days=d)).isoformat() for d in (7, 14)]
+    assert results == [expected] * 4
+    assert calendar.nearest(engine, KEY) == expected[0]
+    assert calendar.stats["rebuilds"] == 1
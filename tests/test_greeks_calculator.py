@@ -0,0 +1,74 @@
+import math
+
+import numpy as np
+import pytest
+
+from utils.greeks_calculator import (BlackScholesCalculator, bs_greeks_vec, bs_price_vec, norm_cdf, norm_cdf_pair,
+                                     norm_cdf_vec, _scalar_greeks, _scalar_price)
+
+
+def test_norm_cdf_vec_matches_erfc_to_machine_precision():
+    x = np.concatenate([np.linspace(-40, 40, 200_001), np.random.default_rng(1).normal(0, 3, 50_000)])
+    ref = np.array([0.5 * math.erfc(-v / math.sqrt(2)) for v in x])
+    out = norm_cdf_vec(x)
+    assert out.dtype == np.float64
+    assert np.max(np.abs(out - ref)) < 1e-15
+    tail = ref > 1e-300
+    assert np.max(np.abs(out - ref)[tail] / ref[tail]) < 1e-12
+
+
+def test_norm_cdf_vec_scalar_parity_and_edges():
+    x = np.linspace(-8, 8, 1601)
+    assert np.max(np.abs(norm_cdf_vec(x) - np.array([norm_cdf(v) for v in x]))) < 1e-15
+    assert list(norm_cdf_vec([np.inf, -np.inf, 0.0])) == [1.0, 0.0, 0.5]
+    assert np.isnan(norm_cdf_vec(np.nan))
+    assert norm_cdf_vec(np.ones((2, 3))).shape == (2, 3)
+
+
+def test_norm_cdf_pair_is_exactly_both_sides():
+    x = np.random.default_rng(2).normal(0, 4, 10_000)
+    cdf, cdf_minus = norm_cdf_pair(x)
+    assert np.array_equal(cdf, norm_cdf_vec(x))
+    assert np.array_equal(cdf_minus, norm_cdf_vec(-x))
+
+
+@pytest.mark.parametrize("option_type", ["CE", "PE"])
+def test_vector_price_and_greeks_match_scalar_formula(option_type):
+    spot = 21500.0
+    strikes = spot + 50 * (np.arange(200) - 100)
+    days = np.array([2.0, 9.0, 16.0, 30.0])
+    K, D = np.meshgrid(strikes, days)
+    iv = (16 + 0.002 * np.abs(K - spot)) / 100
+
+    g = bs_greeks_vec(spot, K, D / 365, 0.06, iv, option_type)
+    for k, d, v, px, delta, gamma, theta, vega, rho in zip(K.ravel(), D.ravel(), iv.ravel(), g["price"].ravel(),
+                                                          g["delta"].ravel(), g["gamma"].ravel(), g["theta"].ravel(),
+                                                          g["vega"].ravel(), g["rho"].ravel()):
+        assert px == pytest.approx(_scalar_price(spot, k, d / 365, 0.06, v, option_type), rel=1e-9, abs=1e-9)
+        ref = _scalar_greeks(spot, k, d / 365, 0.06, v, option_type)
+        assert (delta, gamma, theta, vega, rho) == pytest.approx(ref, rel=1e-9, abs=1e-12)
+
+
+def test_expired_contracts_return_intrinsic():
+    g = bs_greeks_vec(100.0, np.array([90.0, 110.0]), 0.0, 0.06, 0.2, np.array([True, False]))
+    assert list(g["price"]) == [10.0, 10.0]
+    assert list(g["delta"]) == [1.0, -1.0]
+    assert not g["gamma"].any()
+
+
+def test_calculator_wrappers_use_vector_path():
+    call = BlackScholesCalculator.call_price(21500, 21500, 7 / 365, 0.06, 0.18)
+    put = BlackScholesCalculator.put_price(21500, 21500, 7 / 365, 0.06, 0.18)
+    # Put-call parity
+    assert call - put == pytest.approx(21500 - 21500 * math.exp(-0.06 * 7 / 365), abs=1e-8)
+    assert float(bs_price_vec(21500, 21500, 7 / 365, 0.06, 0.18, "CE")) == call
+
+
+def test_price_only_matches_greeks_price():
+    rng = np.random.default_rng(3)
+    S = rng.uniform(80, 120, 500)
+    K = rng.uniform(80, 120, 500)
+    T = np.where(rng.random(500) < 0.1, 0.0, rng.uniform(1 / 365, 1.0, 500))
+    sigma = rng.uniform(0.05, 0.8, 500)
+    call = rng.random(500) < 0.5
+    assert np.array_equal(bs_price_vec(S, K, T, 0.06, sigma, call), bs_greeks_vec(S, K, T, 0.06, sigma, call)["price"])
@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+from utils.greeks_calculator import BlackScholesCalculator, bs_price_vec, implied_volatility_vec
+
+
+def test_recovers_vol_on_random_contracts():
+    rng = np.random.default_rng(7)
+    n = 20_000
+    S = 20_000.0
+    K = S * rng.uniform(0.6, 1.4, n)
+    T = rng.uniform(1 / (365 * 24), 0.5, n)
+    sigma = rng.uniform(0.05, 1.5, n)
+    call = rng.random(n) < 0.5
+    price = bs_price_vec(S, K, T, 0.06, sigma, call)
+
+    iv = implied_volatility_vec(price, S, K, T, 0.06, call)
+    intrinsic = np.where(call, np.maximum(S - K * np.exp(-0.06 * T), 0), np.maximum(K * np.exp(-0.06 * T) - S, 0))
+    solvable = price - intrinsic > 1e-6
+    assert np.isfinite(iv[solvable]).all()
+    repriced = bs_price_vec(S, K[solvable], T[solvable], 0.06, iv[solvable], call[solvable])
+    assert np.max(np.abs(repriced - price[solvable])) < 1e-6
+
+
+def test_atm_vol_is_exact_for_both_sides():
+    price_ce = bs_price_vec(21500, 21500, 7 / 365, 0.06, 0.15, "CE")
+    price_pe = bs_price_vec(21500, 21500, 7 / 365, 0.06, 0.15, "PE")
+    assert float(implied_volatility_vec(price_ce, 21500, 21500, 7 / 365, 0.06, "CE")) == pytest.approx(0.15, abs=1e-7)
+    assert float(implied_volatility_vec(price_pe, 21500, 21500, 7 / 365, 0.06, "PE")) == pytest.approx(0.15, abs=1e-7)
+
+
+def test_prices_outside_no_arbitrage_bounds_return_nan():
+    S, K, T = 100.0, 100.0, 0.1
+    iv = implied_volatility_vec(np.array([0.0, -1.0, 150.0, 5.0, 5.0]), S, K, np.array([T, T, T, 0.0, T]), 0.06,
+                                np.array(["CE", "CE", "CE", "CE", "CE"]))
+    assert np.isnan(iv[:4]).all()
+    assert np.isfinite(iv[4])
+
+
+def test_deep_itm_near_expiry_falls_back_to_bisection():
+    # Vega is ~6e-6 per vol point and time value ~1.5e-5, so raw Newton steps overshoot
+    T = 1 / 365
+    price = float(bs_price_vec(100.0, 90.0, T, 0.06, 0.5, "CE"))
+    iv = float(implied_volatility_vec(price, 100.0, 90.0, T, 0.06, "CE"))
+    assert np.isfinite(iv)
+    assert float(bs_price_vec(100.0, 90.0, T, 0.06, iv, "CE")) == pytest.approx(price, abs=1e-6)
+
+
+def test_scalar_wrapper_rounds_and_maps_failures_to_zero():
+    price = float(bs_price_vec(21500, 21800, 14 / 365, 0.06, 0.21, "CE"))
+    assert BlackScholesCalculator.implied_volatility(price, 21500, 21800, 14 / 365, 0.06, "CE") == pytest.approx(0.21, abs=1e-4)
+    assert BlackScholesCalculator.implied_volatility(0.0, 21500, 21800, 14 / 365, 0.06, "CE") == 0.0
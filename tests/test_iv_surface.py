@@ -0,0 +1,79 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from services.iv_surface import IVSurface, SPOT_RESOLVE_PCT, _expiry_datetime, _years_to
+from utils.greeks_calculator import bs_price_vec
+
+EXPIRY = (datetime.now() + timedelta(days=10)).date()
+STRIKES = 21500 + 50 * (np.arange(41) - 20)
+
+
+def _chain(spot, vol=0.15):
+    T = _years_to(_expiry_datetime(EXPIRY))
+    return bs_price_vec(spot, STRIKES, T, 0.06, vol, "CE"), bs_price_vec(spot, STRIKES, T, 0.06, vol, "PE")
+
+
+def test_small_spot_move_is_solved_against_the_new_spot():
+    surface = IVSurface("NIFTY", r=0.06)
+    ce, pe = _chain(21500)
+    assert surface.update_expiry(EXPIRY, 21500, STRIKES, ce, pe) == 2 * len(STRIKES)
+
+    spot = 21500 * 1.0009   # 0.09% move: every strike must be re-solved at the new spot
+    ce, pe = _chain(spot)
+    surface.update_expiry(EXPIRY, spot, STRIKES, ce, pe)
+    strikes, call_iv, put_iv = surface.get_chain_ivs(EXPIRY)
+    atm = np.argmin(np.abs(strikes - spot))
+    assert call_iv[atm] == pytest.approx(15.0, abs=1e-3)
+    assert put_iv[atm] == pytest.approx(15.0, abs=1e-3)
+    assert surface.get_atm_iv(EXPIRY) == pytest.approx(15.0, abs=1e-2)
+
+
+def test_unchanged_inputs_reuse_cached_ivs():
+    surface = IVSurface("NIFTY", r=0.06)
+    ce, pe = _chain(21500)
+    surface.update_expiry(EXPIRY, 21500, STRIKES, ce, pe)
+    assert surface.update_expiry(EXPIRY, 21500, STRIKES, ce, pe) == 0
+
+    ce = ce.copy()
+    ce[5] *= 1.01
+    assert surface.update_expiry(EXPIRY, 21500, STRIKES, ce, pe) == 1
+
+
+def test_new_spot_alone_reuses_ivs_until_it_drifts_past_the_tolerance():
+    surface = IVSurface("NIFTY", r=0.06)
+    ce, pe = _chain(21500)
+    surface.update_expiry(EXPIRY, 21500, STRIKES, ce, pe)
+    assert surface.update_expiry(EXPIRY, 21501, STRIKES, ce, pe) == 0
+    assert surface.update_expiry(EXPIRY, 21503, STRIKES, ce, pe) == 0
+
+    drifted = 21500 * (1 + 1.5 * SPOT_RESOLVE_PCT / 100)
+    assert surface.update_expiry(EXPIRY, drifted, STRIKES, ce, pe) == 2 * len(STRIKES)
+
+
+def test_only_changed_quotes_are_resolved_when_spot_ticks():
+    surface = IVSurface("NIFTY", r=0.06)
+    ce, pe = _chain(21500)
+    surface.update_expiry(EXPIRY, 21500, STRIKES, ce, pe)
+    ce2, pe2 = _chain(21502)
+    ce2[:10], pe2[:10] = ce[:10], pe[:10]   # far strikes did not trade
+    assert surface.update_expiry(EXPIRY, 21502, STRIKES, ce2, pe2) == 2 * (len(STRIKES) - 10)
+
+
+def test_chain_ivs_are_copies():
+    surface = IVSurface("NIFTY", r=0.06)
+    ce, pe = _chain(21500)
+    surface.update_expiry(EXPIRY, 21500, STRIKES, ce, pe)
+    strikes, call_iv, put_iv = surface.get_chain_ivs(EXPIRY)
+    strikes[:] = 0
+    assert surface.get_chain_ivs(EXPIRY)[0][0] == STRIKES[0]
+    assert len(call_iv) == len(put_iv) == len(STRIKES)
+
+
+def test_smile_lookup_interpolates_between_strikes():
+    surface = IVSurface("NIFTY", r=0.06)
+    ce, pe = _chain(21500, vol=0.2)
+    surface.update_expiry(EXPIRY, 21500, STRIKES, ce, pe)
+    ivs = surface.get_iv(np.array([21025.0, 21500.0, 21975.0]), expiry=EXPIRY)
+    assert ivs == pytest.approx([20.0, 20.0, 20.0], abs=1e-3)
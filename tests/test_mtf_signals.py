@@ -0,0 +1,92 @@
+"""get_mtf_signals budget: a slow timeframe must not hold back the others"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import pytest
+
+import am_backend_scanner as scanner
+from tests.conftest import make_candles
+
+
+class FakeEngine:
+    def __init__(self, delay=0.0, slow_interval=None):
+        self.delay = delay
+        self.slow_interval = slow_interval
+        self.release = threading.Event()
+
+    def get_intraday_candles(self, key, interval="5minute"):
+        if interval == self.slow_interval:
+            self.release.wait(10)
+        else:
+            time.sleep(self.delay)
+        return make_candles(100)
+
+    def get_historical_candles(self, key, interval="5minute", days=10):
+        return pd.DataFrame()
+
+
+@pytest.fixture
+def mtf_state(monkeypatch):
+    for name in ("MTF_CACHE", "MTF_TF_CACHE", "MTF_INFLIGHT", "MTF_STARTED"):
+        monkeypatch.setattr(scanner, name, {})
+    pools = []
+
+    def use_pool(workers):
+        pool = ThreadPoolExecutor(max_workers=workers)
+        pools.append(pool)
+        monkeypatch.setattr(scanner, "MTF_POOL", pool)
+
+    yield use_pool
+    for pool in pools:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def test_slow_timeframe_returns_partial(mtf_state):
+    mtf_state(3)
+    engine = FakeEngine(slow_interval="60minute")
+    try:
+        t0 = time.time()
+        mtf = scanner.get_mtf_signals(engine, "SLOWSYM", "KEY", budget=0.5)
+        elapsed = time.time() - t0
+    finally:
+        engine.release.set()
+
+    assert elapsed < 2.0
+    assert mtf["status"] == "partial"
+    assert mtf["late"] == ["1h"] and mtf["queued"] == []
+    assert not mtf["5m"].get("stale") and not mtf["15m"].get("stale")
+    assert mtf["1h"]["stale"]
+    assert "SLOWSYM" not in scanner.MTF_CACHE
+
+
+def test_queue_time_is_not_charged_to_the_budget(mtf_state, monkeypatch):
+    # One thread: each fetch takes 0.3s and gets 0.45s from its own start,
+    # so all three complete although the last one waits 0.6s for the thread.
+    mtf_state(1)
+    monkeypatch.setattr(scanner, "MTF_QUEUE_WAIT", 2.0)
+    engine = FakeEngine(delay=0.3)
+
+    mtf = scanner.get_mtf_signals(engine, "QUEUESYM", "KEY", budget=0.45)
+
+    assert mtf["status"] == "complete"
+    assert mtf["late"] == [] and mtf["queued"] == []
+
+
+def _partial_up(stale_1h=True):
+    tf = {"score": 4, "trend": "UP", "rsi": 65, "adx": 30, "vol": 2.0}
+    return {"5m": dict(tf), "15m": dict(tf), "1h": dict(tf, stale=stale_1h),
+            "status": "partial" if stale_1h else "complete", "late": ["1h"] if stale_1h else [], "queued": []}
+
+
+def test_stale_timeframe_does_not_count_towards_alignment():
+    complete = scanner.compute_winning_confidence_score("X", _partial_up(stale_1h=False), 1.0, 0.65)
+    partial = scanner.compute_winning_confidence_score("X", _partial_up(), 1.0, 0.65)
+    assert complete - partial == pytest.approx(1.0)
+    assert scanner.mtf_trend(_partial_up(), "1h") == "NEUTRAL"
+
+
+def test_confluence_ignores_stale_trends():
+    assert scanner.get_mtf_confluence("X", mtf_data=_partial_up(stale_1h=False)) == (3, "Strong Bullish")
+    assert scanner.get_mtf_confluence("X", mtf_data=_partial_up()) == (2, "Bullish Bias")
@@ -0,0 +1,33 @@
+"""Buildup is tracked per (underlying, expiry) chain"""
+from dataclasses import replace
+
+from models import ChainSnapshot
+from engine.option_oi_engine import OptionOIEngine
+from tests.conftest import chain_payload
+
+STRIKES = [21400, 21500, 21600]
+
+
+def _snap(underlying, expiry, ce_oi, ce_ltp, ts):
+    snap = ChainSnapshot.from_response(chain_payload(STRIKES, ce_oi, [100, 100, 100], ce_ltp=ce_ltp), underlying, expiry)
+    return replace(snap, timestamp=ts)
+
+
+def test_overlapping_strikes_of_other_chains_do_not_mix():
+    engine = OptionOIEngine()
+    engine.process_chain(_snap("NIFTY", "2026-10-22", [100, 100, 100], [10, 10, 10], 1.0))
+    # Another underlying / expiry with the same strikes and very different numbers in between
+    engine.process_chain(_snap("FINNIFTY", "2026-10-22", [900, 900, 900], [90, 90, 90], 2.0))
+    engine.process_chain(_snap("NIFTY", "2026-10-29", [5, 5, 5], [1, 1, 1], 3.0))
+
+    result = engine.process_chain(_snap("NIFTY", "2026-10-22", [120, 100, 90], [12, 10, 11], 4.0))
+
+    assert [r["CE_BUILDP"] for r in result] == ["LONG BUILDUP", "NO_CHANGE", "SHORT COVERING"]
+    assert all(r["PE_BUILDP"] == "NO_CHANGE" for r in result)
+
+
+def test_first_snapshot_reports_no_change_and_raw_lists_are_rejected():
+    engine = OptionOIEngine()
+    first = engine.process_chain(_snap("NIFTY", "2026-10-22", [100, 100, 100], [10, 10, 10], 1.0))
+    assert [r["CE_BUILDP"] for r in first] == ["NO_CHANGE"] * 3
+    assert engine.process_chain([{"strike": 21500, "CE": {"oi": 1, "ltp": 1}, "PE": {"oi": 1, "ltp": 1}}]) == []
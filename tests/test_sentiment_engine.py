@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+from models import ChainSnapshot
+from tests.conftest import chain_payload
+
+sentiment_engine = pytest.importorskip("services.sentiment_engine")
+
+
+def _brute_force_pain(strikes, ce_oi, pe_oi):
+    return np.array([sum(max(x - k, 0) * c + max(k - x, 0) * p for k, c, p in zip(strikes, ce_oi, pe_oi))
+                     for x in strikes])
+
+
+def test_max_pain_curve_matches_nested_loop():
+    rng = np.random.default_rng(4)
+    strikes = 21500 + 50 * (np.arange(120) - 60)
+    ce_oi, pe_oi = rng.integers(0, 10**6, 120).astype(float), rng.integers(0, 10**6, 120).astype(float)
+    order = rng.permutation(120)   # unsorted input
+    uniq, pain = sentiment_engine.max_pain_curve(strikes[order], ce_oi[order], pe_oi[order])
+    assert np.array_equal(uniq, strikes)
+    assert np.allclose(pain, _brute_force_pain(strikes, ce_oi, pe_oi), rtol=1e-12)
+
+
+def test_max_pain_curve_merges_duplicate_strikes_and_handles_empty():
+    uniq, pain = sentiment_engine.max_pain_curve([100, 100, 110], [1, 2, 0], [0, 0, 5])
+    assert list(uniq) == [100.0, 110.0]
+    assert list(pain) == [50.0, 30.0]   # X=100: puts 5*10; X=110: calls 3*10
+    uniq, pain = sentiment_engine.max_pain_curve([], [], [])
+    assert uniq.size == 0 and pain.size == 0
+
+
+class _FakeEngine:
+    def get_instrument_key(self, symbol):
+        return "NSE_INDEX|Nifty 50"
+
+    def get_expiry_dates(self, key):
+        return ["2026-10-22", "2026-10-29"]
+
+    def get_market_quote(self, keys, mode="ltp"):
+        return {}
+
+
+class _FakeChainService:
+    def __init__(self, chains):
+        self.chains = chains
+
+    def get_chain(self, engine, key, expiry, underlying=None):
+        return self.chains[expiry]
+
+
+def test_analyze_reports_nearest_next_and_combined_max_pain(monkeypatch):
+    strikes = [21400, 21500, 21600]
+    near = ChainSnapshot.from_response(chain_payload(strikes, [100, 500, 900], [900, 500, 100], spot=21500), "NIFTY", "2026-10-22")
+    nxt = ChainSnapshot.from_response(chain_payload(strikes, [0, 0, 1000], [5000, 0, 0], spot=21500), "NIFTY", "2026-10-29")
+    monkeypatch.setattr(sentiment_engine, "get_chain_service", lambda: _FakeChainService({"2026-10-22": near, "2026-10-29": nxt}))
+
+    eng = sentiment_engine.OptionSentimentEngine("NIFTY")
+    eng.engine = _FakeEngine()
+    result = eng.analyze()
+
+    assert result["max_pain"] == 21500.0
+    assert result["max_pain_next"] == 21400.0
+    curves = result["pain_curves"]
+    assert set(curves) == {"2026-10-22", "2026-10-29", "combined"}
+    combined = _brute_force_pain(strikes, [100, 500, 1900], [5900, 500, 100])
+    assert curves["combined"]["pain"] == pytest.approx(list(combined))
+    assert result["max_pain_combined"] == strikes[int(np.argmin(combined))]
+    assert result["pcr"] == 1.0
@@ -0,0 +1,80 @@
+"""Sharded scan parity against the in-process signal pass + shared panel lifecycle"""
+from multiprocessing import shared_memory
+
+import pytest
+
+from engine.indicators import calculate_indicators
+from scanners import sharded_scanner
+from scanners.sharded_scanner import SharedCandlePanel, scan_signals
+from scanners.stock_scanner import stock_signal
+from tests.conftest import make_candles
+
+# Seeds 12 / 34 / 41 / 56 produce signals (both sides); the rest do not
+SEEDS = [12, 34, 41, 56, 0, 1, 2, 3]
+
+
+def _universe():
+    symbols = [f"S{s}" for s in SEEDS]
+    frames_5m = {f"S{s}": make_candles(120, seed=s) for s in SEEDS}
+    frames_1m = {f"S{s}": make_candles(200, seed=1000 + s, freq="1min") for s in SEEDS}
+    return symbols, frames_5m, frames_1m
+
+
+def _in_process(frames_5m, frames_1m, symbols):
+    records = []
+    for sym in symbols:
+        df_5m = calculate_indicators(frames_5m[sym])
+        df_1m = calculate_indicators(frames_1m[sym])
+        rec = stock_signal(sym, df_5m.iloc[-1].to_dict(), df_1m.iloc[-1].to_dict(), df_1m)
+        if rec: records.append(rec)
+    return records
+
+
+def _key(records):
+    return sorted(records, key=lambda r: r.symbol)
+
+
+def test_sharded_matches_in_process():
+    symbols, frames_5m, frames_1m = _universe()
+    expected = _in_process(frames_5m, frames_1m, symbols)
+    assert len(expected) == 4
+
+    got = scan_signals(frames_5m, frames_1m, symbols, processes=2)
+
+    assert len(got) == len(expected)
+    for g, e in zip(_key(got), _key(expected)):
+        assert (g.symbol, g.side, g.strength) == (e.symbol, e.side, e.strength)
+        assert g.rsi == pytest.approx(e.rsi)
+        assert g.adx == pytest.approx(e.adx)
+        assert g.volume_ratio == pytest.approx(e.volume_ratio)
+
+
+def test_panel_leaves_caller_columns_alone():
+    df = make_candles(30).rename(columns=str.title)
+    panel = SharedCandlePanel({"A": df}, ["A"])
+    try:
+        assert list(df.columns) == ["Open", "High", "Low", "Close", "Volume"]
+        assert panel.meta["lengths"] == [30]
+    finally:
+        panel.close()
+
+
+def test_failed_panel_does_not_leak(monkeypatch):
+    created = []
+
+    class Recording(SharedCandlePanel):
+        def __init__(self, frames, symbols):
+            created.append(self)
+            super().__init__(frames, symbols)
+
+    monkeypatch.setattr(sharded_scanner, "SharedCandlePanel", Recording)
+    symbols, frames_5m, frames_1m = _universe()
+    frames_1m[symbols[0]] = frames_1m[symbols[0]].drop(columns=["volume"])
+
+    with pytest.raises(KeyError):
+        scan_signals(frames_5m, frames_1m, symbols, processes=1)
+
+    assert len(created) == 2
+    for panel in created:
+        with pytest.raises(FileNotFoundError):
+            shared_memory.SharedMemory(name=panel.shm.name)
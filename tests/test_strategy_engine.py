@@ -0,0 +1,26 @@
+"""Strategy engine on get_comprehensive_scan() rows"""
+import pytest
+
+from models.trade_models import TrendType
+from services.strategy_engine import get_strategy_engine
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    engine = get_strategy_engine()
+    monkeypatch.setattr(engine.options_pricer, "estimate_iv_from_history", lambda symbol: 18.0)
+    return engine
+
+
+def test_scan_trend_labels_map_to_trend_type(engine):
+    for label, trend in (("UP", TrendType.BULLISH), ("DOWN", TrendType.BEARISH), ("NEUTRAL", TrendType.NEUTRAL)):
+        row = {"Stock": "RELIANCE", "Price": 2500.0, "RSI": 50.0, "ADX": 30.0, "Trend": label}
+        assert engine.condition_from_scan_row(row).trend == trend
+
+
+def test_scan_rows_produce_directional_strategies(engine):
+    rows = [{"Stock": "RELIANCE", "Price": 2500.0, "RSI": 55.0, "ADX": 30.0, "Trend": "UP"},
+            {"Stock": "TCS", "Price": 3500.0, "RSI": 45.0, "ADX": 30.0, "Trend": "DOWN"}]
+    table = engine.get_batch_recommendations([engine.condition_from_scan_row(r) for r in rows], 7)
+    picks = dict(zip(table["Symbol"], table["Strategy"]))
+    assert picks == {"RELIANCE": "LONG_CALL", "TCS": "LONG_PUT"}
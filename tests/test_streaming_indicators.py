@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+from engine.indicators import calculate_indicators as sma_indicators
+from engine.streaming_indicators import StreamingIndicatorEngine, IndicatorState, STYLE_SMA, STYLE_WILDER, advance
+from tests.conftest import make_candles
+
+SMA_COLUMNS = ["rsi", "ema20", "atr", "plus_di", "minus_di", "adx", "vwap"]
+WILDER_COLUMNS = ["EMA20", "EMA50", "EMA200", "VWAP", "RSI", "ADX", "ATR", "Supertrend", "StochRSI", "VolRatio"]
+
+
+def _close(a, b):
+    return (np.isnan(a) and np.isnan(b)) or a == pytest.approx(b, rel=1e-9, abs=1e-9)
+
+
+def test_sma_style_matches_batch_on_every_row(candles):
+    batch = sma_indicators(candles.copy())
+    state = IndicatorState(STYLE_SMA)
+    for i, bar in enumerate(candles[["open", "high", "low", "close", "volume"]].itertuples(index=False)):
+        row = advance(state, bar)
+        for col in SMA_COLUMNS:
+            assert _close(row[col], batch[col].iloc[i]), (i, col)
+
+
+def test_wilder_style_matches_market_engine_last_row(candles):
+    market_engine = pytest.importorskip("services.market_engine")
+    batch = market_engine.calculate_indicators(candles.rename(columns=str.title))
+    row = StreamingIndicatorEngine(state_file="").sync("X", "5minute", candles, style=STYLE_WILDER)
+    for col in WILDER_COLUMNS:
+        assert _close(row[col], float(batch[col].iloc[-1])), col
+
+
+def test_sync_only_folds_new_bars_and_keeps_forming_bar_uncommitted(candles):
+    engine = StreamingIndicatorEngine(state_file="")
+    engine.sync("X", "5minute", candles.iloc[:200], style=STYLE_SMA)
+    assert engine.states[("X", "5minute")].n == 199   # last bar is the forming one
+
+    row = engine.sync("X", "5minute", candles, style=STYLE_SMA)
+    assert engine.states[("X", "5minute")].n == len(candles) - 1
+    batch = sma_indicators(candles.copy()).iloc[-1]
+    for col in SMA_COLUMNS:
+        assert _close(row[col], batch[col]), col
+
+
+def test_sync_rebuilds_when_the_frame_start_moves(candles):
+    engine = StreamingIndicatorEngine(state_file="")
+    engine.sync("X", "5minute", candles, style=STYLE_SMA)
+    shifted = candles.iloc[50:]
+    row = engine.sync("X", "5minute", shifted, style=STYLE_SMA)
+    batch = sma_indicators(shifted.copy()).iloc[-1]
+    for col in SMA_COLUMNS:
+        assert _close(row[col], batch[col]), col
+
+
+def test_state_round_trips_through_disk(tmp_path):
+    df = make_candles(120, seed=3)
+    path = str(tmp_path / "state.json")
+    engine = StreamingIndicatorEngine(state_file=path)
+    expected = engine.sync("X", "5minute", df, style=STYLE_WILDER)
+    assert engine.save_state()
+
+    restored = StreamingIndicatorEngine(state_file=path)
+    assert restored.load_state() == 1
+    row = restored.sync("X", "5minute", df, style=STYLE_WILDER)
+    for col in WILDER_COLUMNS:
+        assert _close(row[col], expected[col]), col
@@ -0,0 +1,83 @@
+"""PositionBook locking / exits and the forced flush at shutdown"""
+import threading
+
+import pytest
+
+from models.trade_models import OptionType, Position, Trade
+from services import trading_engine
+from services.trading_engine import PositionBook
+
+
+def _position(pid, symbol="NIFTY", strike=21500.0):
+    return Position(trade_id=pid, symbol=symbol, option_type=OptionType.CE, strike_price=strike,
+                    quantity=50, avg_price=100.0, id=pid)
+
+
+def _trade(stop_loss=None, target=None):
+    return Trade(strategy_id=1, symbol="NIFTY", option_type=OptionType.CE, strike_price=21500.0,
+                 entry_price=100.0, quantity=50, stop_loss=stop_loss, target=target)
+
+
+def test_reprice_returns_exit_ids_and_prices():
+    book = PositionBook()
+    book.add(_position(1), _trade(target=150.0))
+    book.add(_position(2, strike=22500.0), _trade(stop_loss=90.0))
+    book.add(_position(3, symbol="BANKNIFTY"), _trade(target=150.0))
+
+    exits = book.reprice("NIFTY", 21700.0, 7 / 365, 0.06, 0.15)
+
+    assert [(pid, reason) for pid, _, reason in exits] == [(1, "Target Reached"), (2, "Stop Loss Hit")]
+    assert exits[0][1] == float(book.price[0])
+    assert len(book.take_dirty()) == 2 and not book.take_dirty()
+
+
+def test_concurrent_add_remove_and_reprice_stay_aligned():
+    book = PositionBook()
+    errors = []
+
+    def churn(base):
+        try:
+            for i in range(base, base + 100):
+                book.add(_position(i))
+                book.reprice("NIFTY", 21500.0, 7 / 365, 0.06, 0.15)
+                book.remove(i)
+        except Exception as e:  # pragma: no cover - surfaced by the assert below
+            errors.append(e)
+
+    threads = [threading.Thread(target=churn, args=(k * 1000,)) for k in range(4)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+
+    assert not errors
+    assert len(book) == 0 and len(book.price) == 0 and book.greeks.shape[0] == 0
+
+
+class FakeDB:
+    def __init__(self):
+        self.batches = []
+
+    def get_positions(self, active_only=True):
+        return [_position(1)]
+
+    def get_trades_by_ids(self, ids):
+        return {}
+
+    def update_positions_batch(self, positions):
+        self.batches.append(positions)
+
+
+def test_exit_hook_forces_the_pending_flush(monkeypatch):
+    hooks = []
+    db = FakeDB()
+    monkeypatch.setattr(trading_engine, "get_db_manager", lambda: db)
+    monkeypatch.setattr(trading_engine, "get_options_pricer", lambda: None)
+    monkeypatch.setattr(trading_engine.atexit, "register", lambda fn, *a, **kw: hooks.append((fn, kw)))
+
+    engine = trading_engine.TradingEngine()
+    engine.update_positions("NIFTY", 21520.0, 7, iv=15.0)
+    engine.book.reprice("NIFTY", 21530.0, 7 / 365, 0.06, 0.15)  # inside the throttle window
+    assert len(db.batches) == 1
+
+    (fn, kw), = hooks
+    fn(**kw)
+    assert len(db.batches) == 2
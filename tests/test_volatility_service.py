@@ -0,0 +1,50 @@
+"""VolatilityService: downloads outside the lock, failed builds are not kept as the day's table"""
+import pytest
+
+from services import volatility_service
+from services.volatility_service import VolatilityService, ESTIMATORS
+
+
+@pytest.fixture
+def service(tmp_path, monkeypatch):
+    monkeypatch.setattr(volatility_service, "VOL_FILE", tmp_path / "realized_vol.json")
+    svc = VolatilityService(["AAA", "BBB"])
+    svc.calls = []
+    svc.vol = 22.0
+
+    def fake_download(symbols):
+        assert not svc.lock.locked()
+        svc.calls.append(list(symbols))
+        return {s: {e: svc.vol for e in ESTIMATORS} for s in symbols}
+
+    monkeypatch.setattr(svc, "_download", fake_download)
+    return svc
+
+
+def test_build_and_miss_download_outside_lock(service):
+    assert service.get_vol("AAA.NS") == 22.0
+    assert service.get_vol("CCC", "ewma") == 22.0
+    assert service.calls == [["AAA", "BBB"], ["CCC"]]
+    assert volatility_service.VOL_FILE.exists()
+
+
+def test_failed_build_is_not_saved_and_is_retried(service):
+    service.vol = float("nan")
+    assert service.get_vol("AAA") != service.get_vol("AAA")  # NaN served, no re-download
+    assert service.calls == [["AAA", "BBB"]]
+    assert service._day is None
+    assert not volatility_service.VOL_FILE.exists()
+
+    service.vol = 22.0
+    service._retry_at = 0.0
+    assert service.get_vol("AAA") == 22.0
+    assert len(service.calls) == 2
+
+
+def test_saved_nan_table_is_not_loaded(service):
+    service.vol = float("nan")
+    service._vols = {"AAA": {e: float("nan") for e in ESTIMATORS}}
+    service._save()
+
+    fresh = VolatilityService(["AAA", "BBB"])
+    assert not fresh._load()
@@ -0,0 +1,63 @@
+import threading
+import time
+
+from services.work_queue import DeadlineWorkQueue, TaskClass
+
+
+def _blocked_queue():
+    """Single-worker queue whose worker is parked until the returned event is set"""
+    queue = DeadlineWorkQueue(max_workers=1)
+    release, started = threading.Event(), threading.Event()
+
+    def park():
+        started.set()
+        release.wait(5)
+
+    queue.submit(park, task_class=TaskClass.INDEX)
+    assert started.wait(5)
+    return queue, release
+
+
+def test_higher_class_runs_first():
+    queue, release = _blocked_queue()
+    order = []
+    futures = [queue.submit(order.append, cls.name, task_class=cls, deadline=10)
+               for cls in (TaskClass.SWEEP, TaskClass.SHORTLIST, TaskClass.MONITOR, TaskClass.INDEX)]
+    release.set()
+    for fut in futures:
+        fut.result(timeout=5)
+    assert order == ["INDEX", "MONITOR", "SHORTLIST", "SWEEP"]
+
+
+def test_late_sweep_is_shed_and_late_shortlist_deferred_once():
+    queue, release = _blocked_queue()
+    sweep = queue.submit(lambda: "sweep", task_class=TaskClass.SWEEP, deadline=0.01)
+    shortlist = queue.submit(lambda: "shortlist", task_class=TaskClass.SHORTLIST, deadline=0.01)
+    monitor = queue.submit(lambda: "monitor", task_class=TaskClass.MONITOR, deadline=0.01)
+    time.sleep(0.05)
+    release.set()
+
+    assert monitor.result(timeout=5) == "monitor"        # monitoring is never shed
+    assert shortlist.result(timeout=5) == "shortlist"    # second chance with a fresh deadline
+    assert sweep.cancelled()
+
+    report = queue.report()
+    assert report["SWEEP"]["shed"] == 1
+    assert report["SHORTLIST"]["deferred"] == 1
+    assert report["SHORTLIST"]["missed"] == 1            # ran, but only after deferral
+    assert report["MONITOR"]["missed"] == 1
+
+
+def test_map_collects_results_and_maps_failures_to_none():
+    queue = DeadlineWorkQueue(max_workers=2)
+    assert queue.map(lambda x: x * 2, [1, 2, 3], task_class=TaskClass.MONITOR, timeout=5) == [2, 4, 6]
+
+    def boom(_):
+        raise ValueError("x")
+
+    assert queue.map(boom, [1], task_class=TaskClass.MONITOR, timeout=5) == [None]
+    report = queue.report()
+    assert report["MONITOR"]["errors"] == 1
+    assert report["MONITOR"]["met"] + report["MONITOR"]["missed"] == 3   # the failure is neither
+    assert report["MONITOR"]["met_rate"] == round(report["MONITOR"]["met"] / 4 * 100, 1)
+    assert report["MONITOR"]["met_rate"] <= 75.0
@@ -1,11 +1,17 @@
 from .greeks_calculator import (
     BlackScholesCalculator,
     calculate_option_price,
-    calculate_greeks
+    calculate_greeks,
+    bs_price_vec,
+    bs_greeks_vec,
+    implied_volatility_vec
 )
 
 __all__ = [
     'BlackScholesCalculator',
     'calculate_option_price',
-    'calculate_greeks'
+    'calculate_greeks',
+    'bs_price_vec',
+    'bs_greeks_vec',
+    'implied_volatility_vec'
 ]
@@ -3,9 +3,13 @@ Black-Scholes Option Pricing and Greeks Calculator
 Institutional-quality implementation for accurate option valuation
 """
 import math
-from typing import Tuple
+import time
+from typing import Dict, Tuple, Union
+import numpy as np
 from models import Greeks
 
+ArrayLike = Union[float, np.ndarray]
+
 def norm_cdf(x: float) -> float:
     """Cumulative distribution function for the standard normal distribution"""
     return (1.0 + math.erf(x / math.sqrt(2.0))) / 2.0
@@ -14,6 +18,245 @@ def norm_pdf(x: float) -> float:
     """Probability density function for the standard normal distribution"""
     return (1.0 / math.sqrt(2.0 * math.pi)) * math.exp(-0.5 * x**2)
 
+# W. J. Cody's rational Chebyshev approximations for the normal CDF (ANORM,
+# TOMS 715): float64 NumPy only, ~1e-15 from math.erf, no SciPy needed
+_CDF_A = (2.2352520354606839287e00, 1.6102823106855587881e02, 1.0676894854603709582e03,
+          1.8154981253343561249e04, 6.5682337918207449113e-2)
+_CDF_B = (4.7202581904688241870e01, 9.7609855173777669322e02, 1.0260932208618978205e04,
+          4.5507789335026729956e04)
+_CDF_C = (3.9894151208813466764e-1, 8.8831497943883759412e00, 9.3506656132177855979e01,
+          5.9727027639480026226e02, 2.4945375852903726711e03, 6.8481904505362823326e03,
+          1.1602651437647350124e04, 9.8427148383839780218e03, 1.0765576773720192317e-8)
+_CDF_D = (2.2266688044328115691e01, 2.3538790178262499861e02, 1.5193775994075548050e03,
+          6.4855582982667607550e03, 1.8615571640885098091e04, 3.4900952721145977266e04,
+          3.8912003286093271411e04, 1.9685429676859990727e04)
+_CDF_P = (2.1589853405795699e-1, 1.274011611602473639e-1, 2.2235277870649807e-2,
+          1.421619193227893466e-3, 2.9112874951168792e-5, 2.307344176494017303e-2)
+_CDF_Q = (1.28426009614491121e00, 4.68238212480865118e-1, 6.59881378689285515e-2,
+          3.78239633202758244e-3, 7.29751555083966205e-5)
+_SQRT_1_2PI = 0.39894228040143267794
+
+_CDF_BLOCK = 1 << 15  # elements per pass, keeps the Horner temporaries in cache
+
+def _rational(z: np.ndarray, num_c, den_c, lead: float) -> np.ndarray:
+    """Horner pass for one of Cody's (numerator, denominator) pairs, in place on fresh arrays"""
+    num = lead * z
+    den = z.copy()
+    for a, b in zip(num_c[:-1], den_c[:-1]):
+        num += a; num *= z
+        den += b; den *= z
+    num += num_c[-1]
+    den += den_c[-1]
+    num /= den
+    return num
+
+def _lower_tail(y: np.ndarray) -> np.ndarray:
+    """Phi(-y) for a flat block of y >= 0; each of the three ranges is filled by index"""
+    out = np.empty_like(y)
+    near = y <= 0.66291
+    far = y > 5.656854248747  # sqrt(32)
+
+    idx = np.flatnonzero(near)
+    if idx.size:
+        yn = y.take(idx)
+        out.put(idx, 0.5 - yn * _rational(yn * yn, _CDF_A[:4], _CDF_B, _CDF_A[4]))
+
+    idx = np.flatnonzero(~(near | far))
+    if idx.size:
+        ym = y.take(idx)
+        tail = _rational(ym, _CDF_C[:8], _CDF_D, _CDF_C[8])
+        tail *= np.exp(-0.5 * ym * ym)
+        out.put(idx, tail)
+
+    idx = np.flatnonzero(far)
+    if idx.size:
+        yf = y.take(idx)
+        xsq = 1.0 / (yf * yf)
+        tail = _SQRT_1_2PI - xsq * _rational(xsq, _CDF_P[:5], _CDF_Q, _CDF_P[5])
+        tail *= np.exp(-0.5 * yf * yf)
+        tail /= yf
+        out.put(idx, tail)
+    return out
+
+def _tails(x: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(N(-|x|), 1 - N(-|x|), x > 0 as 0/1) - multiplying by the 0/1 mask selects exactly"""
+    x = np.clip(np.asarray(x, dtype=float), -40.0, 40.0)  # exactly 0 / 1 beyond, NaN passes through
+    flat = x.ravel()
+    lower = np.empty_like(flat)
+    for i in range(0, flat.size, _CDF_BLOCK):
+        lower[i:i + _CDF_BLOCK] = _lower_tail(np.abs(flat[i:i + _CDF_BLOCK]))
+    lower = lower.reshape(x.shape)  # NaN falls through to the middle range and stays NaN
+    return lower, 1.0 - lower, (x > 0).astype(float)
+
+def norm_cdf_vec(x: np.ndarray) -> np.ndarray:
+    """Vectorized standard normal CDF"""
+    lower, upper, pos = _tails(x)
+    return upper * pos + lower * (1.0 - pos)
+
+def norm_cdf_pair(x: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """(N(x), N(-x)) from a single tail evaluation"""
+    lower, upper, pos = _tails(x)
+    neg = 1.0 - pos
+    return upper * pos + lower * neg, lower * pos + upper * neg
+
+def norm_pdf_vec(x: np.ndarray) -> np.ndarray:
+    """Vectorized standard normal PDF"""
+    x = np.asarray(x, dtype=float)
+    return (1.0 / math.sqrt(2.0 * math.pi)) * np.exp(-0.5 * x**2)
+
+def _is_call(option_type, shape) -> np.ndarray:
+    """Accepts "CE"/"PE", an array of them, or a boolean array (True = call)"""
+    arr = np.asarray(option_type)
+    if arr.dtype == bool:
+        return np.broadcast_to(arr, shape)
+    return np.broadcast_to(arr == "CE", shape)
+
+def bs_greeks_vec(S: ArrayLike, K: ArrayLike, T: ArrayLike, r: ArrayLike, sigma: ArrayLike,
+                  option_type="CE", q: ArrayLike = 0.0) -> Dict[str, np.ndarray]:
+    """
+    Vectorized Black-Scholes price and Greeks
+
+    All inputs broadcast against each other (spots, strikes, expiries in years,
+    rates, vols, option types). Expired contracts (T <= 0) or zero vol return
+    intrinsic value with the same delta convention as the scalar calculator.
+
+    Returns:
+        Dict of arrays: price, delta, gamma, theta (daily), vega (per 1% IV), rho (per 1% rate)
+    """
+    S, K, T, r, sigma, q = np.broadcast_arrays(*(np.asarray(x, dtype=float) for x in (S, K, T, r, sigma, q)))
+    call = _is_call(option_type, S.shape)
+    live = (T > 0) & (sigma > 0)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sqrt_t = np.sqrt(np.where(live, T, 1.0))
+        vol = np.where(live, sigma, 1.0)
+        d1 = (np.log(S / K) + (r - q + 0.5 * vol ** 2) * T) / (vol * sqrt_t)
+        d2 = d1 - vol * sqrt_t
+        d1 = np.where(live, d1, 0.0)
+        d2 = np.where(live, d2, 0.0)
+
+        disc_q = np.exp(-q * T)
+        disc_r = np.exp(-r * T)
+        nd1, nd1_minus = norm_cdf_pair(d1)
+        nd2, nd2_minus = norm_cdf_pair(d2)
+        pdf_d1 = norm_pdf_vec(d1)
+
+        call_px = S * disc_q * nd1 - K * disc_r * nd2
+        put_px = K * disc_r * nd2_minus - S * disc_q * nd1_minus
+        price = np.where(call, call_px, put_px)
+        price = np.where(live, np.maximum(0.0, price), np.where(call, np.maximum(0.0, S - K), np.maximum(0.0, K - S)))
+
+        delta = np.where(call, disc_q * nd1, -disc_q * nd1_minus)
+        gamma = (disc_q * pdf_d1) / (S * vol * sqrt_t)
+        term1 = -(S * pdf_d1 * vol * disc_q) / (2 * sqrt_t)
+        theta = np.where(call,
+                         term1 - r * K * disc_r * nd2 + q * S * disc_q * nd1,
+                         term1 + r * K * disc_r * nd2_minus - q * S * disc_q * nd1_minus) / 365
+        vega = (S * disc_q * pdf_d1 * sqrt_t) / 100
+        rho = np.where(call, K * T * disc_r * nd2, -(K * T * disc_r * nd2_minus)) / 100
+
+    expired_delta = np.where(call, np.where(S > K, 1.0, 0.0), np.where(S < K, -1.0, 0.0))
+    zero = np.zeros_like(S)
+    return {
+        "price": price,
+        "delta": np.where(live, delta, expired_delta),
+        "gamma": np.where(live, gamma, zero),
+        "theta": np.where(live, theta, zero),
+        "vega": np.where(live, vega, zero),
+        "rho": np.where(live, rho, zero),
+    }
+
+def _premium_d1(S, K, T, r, sigma, call, q, sqrt_t):
+    """Live-contract premium and d1 - the premium formula shared by pricing, scenarios and the IV solver"""
+    d1 = (np.log(S / K) + (r - q + 0.5 * sigma ** 2) * T) / (sigma * sqrt_t)
+    d2 = d1 - sigma * sqrt_t
+    disc_q, disc_r = np.exp(-q * T), np.exp(-r * T)
+    nd1, nd1_minus = norm_cdf_pair(d1)
+    nd2, nd2_minus = norm_cdf_pair(d2)
+    price = np.where(call, S * disc_q * nd1 - K * disc_r * nd2, K * disc_r * nd2_minus - S * disc_q * nd1_minus)
+    return price, d1
+
+def bs_price_vec(S: ArrayLike, K: ArrayLike, T: ArrayLike, r: ArrayLike, sigma: ArrayLike,
+                 option_type="CE", q: ArrayLike = 0.0) -> np.ndarray:
+    """
+    Vectorized Black-Scholes premium only (no Greeks)
+
+    Broadcasts like bs_greeks_vec and returns the same prices; expired contracts
+    (T <= 0) or zero vol return intrinsic value.
+    """
+    S, K, T, r, sigma, q = np.broadcast_arrays(*(np.asarray(x, dtype=float) for x in (S, K, T, r, sigma, q)))
+    call = _is_call(option_type, S.shape)
+    live = (T > 0) & (sigma > 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sqrt_t = np.sqrt(np.where(live, T, 1.0))
+        price, _ = _premium_d1(S, K, T, r, np.where(live, sigma, 1.0), call, q, sqrt_t)
+    intrinsic = np.where(call, np.maximum(0.0, S - K), np.maximum(0.0, K - S))
+    return np.where(live, np.maximum(0.0, price), intrinsic)
+
+def _bs_price_vega(S, K, T, r, sigma, call, q):
+    """Price and raw vega (per 1.0 vol) only - the inner loop of the IV solver"""
+    sqrt_t = np.sqrt(T)
+    price, d1 = _premium_d1(S, K, T, r, sigma, call, q, sqrt_t)
+    vega = S * np.exp(-q * T) * norm_pdf_vec(d1) * sqrt_t
+    return price, vega
+
+def implied_volatility_vec(price: ArrayLike, S: ArrayLike, K: ArrayLike, T: ArrayLike, r: ArrayLike = 0.06,
+                           option_type="CE", q: ArrayLike = 0.0, tol: float = 1e-6, max_iter: int = 100,
+                           vol_lo: float = 1e-4, vol_hi: float = 5.0) -> np.ndarray:
+    """
+    Vectorized implied volatility (annual, as a fraction)
+
+    Safeguarded Newton-Raphson: every element keeps a [lo, hi] bracket that is
+    tightened after each repricing; a Newton step that leaves the bracket or
+    hits a near-zero vega (deep ITM/OTM, last days to expiry) falls back to
+    bisection, so each element always converges.
+
+    Returns NaN where no IV exists: T <= 0, non-positive price, or a price
+    outside the no-arbitrage bounds.
+    """
+    price, S, K, T, r, q = np.broadcast_arrays(*(np.asarray(x, dtype=float) for x in (price, S, K, T, r, q)))
+    call = _is_call(option_type, S.shape)
+    iv = np.full(S.shape, np.nan)
+
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        disc_s = S * np.exp(-q * T)
+        disc_k = K * np.exp(-r * T)
+        lower = np.where(call, np.maximum(0.0, disc_s - disc_k), np.maximum(0.0, disc_k - disc_s))
+        upper = np.where(call, disc_s, disc_k)
+        ok = (T > 0) & (price > 0) & (S > 0) & (K > 0) & (price > lower) & (price < upper)
+        if not ok.any():
+            return iv
+
+        idx = np.flatnonzero(ok.ravel())
+        p, s, k, t, rr, qq, c = (a.ravel()[idx] for a in (price, S, K, T, r, q, call))
+        lo = np.full(idx.shape, vol_lo)
+        hi = np.full(idx.shape, vol_hi)
+        # Brenner-Subrahmanyam seed (ATM approximation)
+        sigma = np.clip(np.sqrt(2 * np.pi / t) * p / s, 0.05, 2.0)
+        done = np.zeros(idx.shape, dtype=bool)
+
+        for _ in range(max_iter):
+            act = ~done
+            if not act.any():
+                break
+            model, vega = _bs_price_vega(s[act], k[act], t[act], rr[act], sigma[act], c[act], qq[act])
+            diff = model - p[act]
+            converged = np.abs(diff) < tol
+
+            # Price is increasing in vol: tighten the bracket
+            lo_a = np.where(diff < 0, sigma[act], lo[act])
+            hi_a = np.where(diff > 0, sigma[act], hi[act])
+            newton = sigma[act] - diff / vega
+            bad = ~np.isfinite(newton) | (vega < 1e-8) | (newton <= lo_a) | (newton >= hi_a)
+            step = np.where(bad, 0.5 * (lo_a + hi_a), newton)
+
+            lo[act], hi[act] = lo_a, hi_a
+            sigma[act] = np.where(converged, sigma[act], step)
+            done[act] = converged | ((hi_a - lo_a) < 1e-10)
+
+        iv.ravel()[idx] = sigma
+    return iv
+
 class BlackScholesCalculator:
     """
     Black-Scholes-Merton model for European options
@@ -52,15 +295,7 @@ class BlackScholesCalculator:
         
         Formula: C = S * e^(-qT) * N(d1) - K * e^(-rT) * N(d2)
         """
-        if T <= 0:
-            return max(0, S - K)
-        
-        d1, d2 = cls.calculate_d1_d2(S, K, T, r, sigma, q)
-        
-        call_price = (S * math.exp(-q * T) * norm_cdf(d1) - 
-                     K * math.exp(-r * T) * norm_cdf(d2))
-        
-        return max(0, call_price)
+        return float(bs_price_vec(S, K, T, r, sigma, "CE", q))
     
     @classmethod
     def put_price(cls, S: float, K: float, T: float, r: float, sigma: float, q: float = 0.0) -> float:
@@ -69,15 +304,7 @@ class BlackScholesCalculator:
         
         Formula: P = K * e^(-rT) * N(-d2) - S * e^(-qT) * N(-d1)
         """
-        if T <= 0:
-            return max(0, K - S)
-        
-        d1, d2 = cls.calculate_d1_d2(S, K, T, r, sigma, q)
-        
-        put_price = (K * math.exp(-r * T) * norm_cdf(-d2) - 
-                    S * math.exp(-q * T) * norm_cdf(-d1))
-        
-        return max(0, put_price)
+        return float(bs_price_vec(S, K, T, r, sigma, "PE", q))
     
     @classmethod
     def calculate_greeks(cls, S: float, K: float, T: float, r: float, sigma: float, 
@@ -97,60 +324,20 @@ class BlackScholesCalculator:
         Returns:
             Greeks object with delta, gamma, theta, vega, rho
         """
-        if T <= 0:
-            # Option expired - intrinsic value only
-            if option_type == "CE":
-                delta = 1.0 if S > K else 0.0
-            else:
-                delta = -1.0 if S < K else 0.0
-            
-            return Greeks(delta=delta, gamma=0, theta=0, vega=0, rho=0)
-        
-        d1, d2 = cls.calculate_d1_d2(S, K, T, r, sigma, q)
-        
-        # Delta
-        if option_type == "CE":
-            delta = math.exp(-q * T) * norm_cdf(d1)
-        else:
-            delta = -math.exp(-q * T) * norm_cdf(-d1)
-        
-        # Gamma (same for both call and put)
-        gamma = (math.exp(-q * T) * norm_pdf(d1)) / (S * sigma * math.sqrt(T))
-        
-        # Theta (time decay)
-        term1 = -(S * norm_pdf(d1) * sigma * math.exp(-q * T)) / (2 * math.sqrt(T))
-        
-        if option_type == "CE":
-            term2 = -r * K * math.exp(-r * T) * norm_cdf(d2)
-            term3 = q * S * math.exp(-q * T) * norm_cdf(d1)
-            theta = (term1 + term2 + term3) / 365  # Daily theta
-        else:
-            term2 = r * K * math.exp(-r * T) * norm_cdf(-d2)
-            term3 = -q * S * math.exp(-q * T) * norm_cdf(-d1)
-            theta = (term1 + term2 + term3) / 365  # Daily theta
-        
-        # Vega (same for both)
-        vega = (S * math.exp(-q * T) * norm_pdf(d1) * math.sqrt(T)) / 100  # Per 1% change in IV
-        
-        # Rho
-        if option_type == "CE":
-            rho = (K * T * math.exp(-r * T) * norm_cdf(d2)) / 100  # Per 1% change in rate
-        else:
-            rho = -(K * T * math.exp(-r * T) * norm_cdf(-d2)) / 100
-        
+        g = bs_greeks_vec(S, K, T, r, sigma, option_type, q)
         return Greeks(
-            delta=round(delta, 4),
-            gamma=round(gamma, 4),
-            theta=round(theta, 4),
-            vega=round(vega, 4),
-            rho=round(rho, 4)
+            delta=round(float(g["delta"]), 4),
+            gamma=round(float(g["gamma"]), 4),
+            theta=round(float(g["theta"]), 4),
+            vega=round(float(g["vega"]), 4),
+            rho=round(float(g["rho"]), 4)
         )
     
     @classmethod
     def implied_volatility(cls, option_price: float, S: float, K: float, T: float, 
                           r: float, option_type: str = "CE", q: float = 0.0) -> float:
         """
-        Calculate Implied Volatility using Newton-Raphson method
+        Calculate Implied Volatility (safeguarded Newton-Raphson, see implied_volatility_vec)
         
         Args:
             option_price: Market price of option
@@ -161,40 +348,10 @@ class BlackScholesCalculator:
         Returns:
             Implied Volatility (annual)
         """
-        if T <= 0:
+        sigma = implied_volatility_vec(option_price, S, K, T, r, option_type, q, tol=0.0001)
+        if not np.isfinite(sigma):
             return 0.0
-        
-        # Initial guess
-        sigma = 0.3  # 30% IV
-        max_iterations = 100
-        tolerance = 0.0001
-        
-        for _ in range(max_iterations):
-            if option_type == "CE":
-                price = cls.call_price(S, K, T, r, sigma, q)
-            else:
-                price = cls.put_price(S, K, T, r, sigma, q)
-            
-            diff = price - option_price
-            
-            if abs(diff) < tolerance:
-                return round(sigma, 4)
-            
-            # Vega for Newton-Raphson
-            d1, _ = cls.calculate_d1_d2(S, K, T, r, sigma, q)
-            vega = S * math.exp(-q * T) * norm_pdf(d1) * math.sqrt(T)
-            
-            if vega < 0.0001:  # Avoid division by very small number
-                break
-            
-            # Update sigma
-            sigma = sigma - diff / vega
-            
-            # Ensure sigma stays positive
-            if sigma <= 0:
-                sigma = 0.01
-        
-        return round(sigma, 4)
+        return round(float(sigma), 4)
 
 def calculate_option_price(spot: float, strike: float, days_to_expiry: int, 
                           iv: float, option_type: str = "CE", 
@@ -243,6 +400,64 @@ def calculate_greeks(spot: float, strike: float, days_to_expiry: int,
     
     return BlackScholesCalculator.calculate_greeks(spot, strike, T, risk_free_rate, sigma, option_type)
 
+def benchmark_chain(n_strikes: int = 200, n_expiries: int = 4, spot: float = 21500, repeat: int = 5) -> Dict[str, float]:
+    """
+    ⏱ Compares scalar loop vs vectorized pricing on an n_strikes x n_expiries chain (CE + PE)
+    Returns timings in milliseconds and the max abs price difference.
+    """
+    strikes = spot + 50 * (np.arange(n_strikes) - n_strikes // 2)
+    days = np.array([2, 9, 16, 30][:n_expiries] + [30 + 7 * i for i in range(max(0, n_expiries - 4))], dtype=float)
+    K, D = np.meshgrid(strikes, days)
+    iv = 16 + 0.002 * np.abs(K - spot)  # simple smile
+
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        loop_px = [_scalar_price(spot, k, d / 365, 0.06, v / 100, ot)
+                   for k, d, v in zip(K.ravel(), D.ravel(), iv.ravel()) for ot in ("CE", "PE")]
+        for k, d, v in zip(K.ravel(), D.ravel(), iv.ravel()):
+            for ot in ("CE", "PE"):
+                _scalar_greeks(spot, k, d / 365, 0.06, v / 100, ot)
+    loop_ms = (time.perf_counter() - t0) / repeat * 1000
+
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        ce = bs_greeks_vec(spot, K, D / 365, 0.06, iv / 100, "CE")
+        pe = bs_greeks_vec(spot, K, D / 365, 0.06, iv / 100, "PE")
+    vec_ms = (time.perf_counter() - t0) / repeat * 1000
+
+    vec_px = np.stack([ce["price"].ravel(), pe["price"].ravel()], axis=1).ravel()
+    return {
+        "contracts": n_strikes * n_expiries * 2,
+        "loop_ms": round(loop_ms, 2),
+        "vector_ms": round(vec_ms, 2),
+        "speedup": round(loop_ms / vec_ms, 1) if vec_ms else 0.0,
+        "max_abs_diff": float(np.max(np.abs(np.array(loop_px) - vec_px))),
+    }
+
+def _scalar_price(S, K, T, r, sigma, option_type="CE"):
+    """Reference pure-math price (the pre-vectorization formula), used by the benchmark"""
+    d1 = (math.log(S / K) + (r + 0.5 * sigma ** 2) * T) / (sigma * math.sqrt(T))
+    d2 = d1 - sigma * math.sqrt(T)
+    if option_type == "CE":
+        return max(0, S * norm_cdf(d1) - K * math.exp(-r * T) * norm_cdf(d2))
+    return max(0, K * math.exp(-r * T) * norm_cdf(-d2) - S * norm_cdf(-d1))
+
+def _scalar_greeks(S, K, T, r, sigma, option_type="CE"):
+    """Reference pure-math Greeks (the pre-vectorization formula), used by the benchmark"""
+    d1 = (math.log(S / K) + (r + 0.5 * sigma ** 2) * T) / (sigma * math.sqrt(T))
+    d2 = d1 - sigma * math.sqrt(T)
+    delta = norm_cdf(d1) if option_type == "CE" else -norm_cdf(-d1)
+    gamma = norm_pdf(d1) / (S * sigma * math.sqrt(T))
+    term1 = -(S * norm_pdf(d1) * sigma) / (2 * math.sqrt(T))
+    if option_type == "CE":
+        theta = (term1 - r * K * math.exp(-r * T) * norm_cdf(d2)) / 365
+        rho = K * T * math.exp(-r * T) * norm_cdf(d2) / 100
+    else:
+        theta = (term1 + r * K * math.exp(-r * T) * norm_cdf(-d2)) / 365
+        rho = -K * T * math.exp(-r * T) * norm_cdf(-d2) / 100
+    vega = S * norm_pdf(d1) * math.sqrt(T) / 100
+    return delta, gamma, theta, vega, rho
+
 # Quick test function
 if __name__ == "__main__":
     # Test with NIFTY example
@@ -280,3 +495,10 @@ if __name__ == "__main__":
     print(f"  Theta: ₹{put_greeks.theta:.2f} (daily decay)")
     print(f"  Vega: ₹{put_greeks.vega:.2f} (per 1% IV change)")
     print("=" * 50)
+    
+    # Vectorized chain benchmark
+    bench = benchmark_chain(200, 4)
+    print(f"CHAIN BENCHMARK ({bench['contracts']} contracts, 200 strikes x 4 expiries):")
+    print(f"  Scalar loop: {bench['loop_ms']} ms | Vectorized: {bench['vector_ms']} ms | Speedup: {bench['speedup']}x")
+    print(f"  Max price diff: {bench['max_abs_diff']:.2e}")
+    print("=" * 50)
@@ -0,0 +1,104 @@
+"""
+Indicator Cache - Key-based LRU memoization for indicator frames
+Entries are keyed by (instrument, timeframe, last bar timestamp, indicator set)
+instead of hashing the whole DataFrame, so a lookup is O(1) and the same cache
+serves the Streamlit app and the backend scanners.
+"""
+import threading
+from collections import OrderedDict
+
+
+class IndicatorCache:
+    """Bounded LRU cache of computed indicator DataFrames"""
+
+    def __init__(self, max_entries=512, max_bytes=256 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (df, nbytes)
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def make_key(df, outputs, instrument=None, timeframe=None):
+        """
+        Cache key for a candle frame. The last bar's close/volume are part of the
+        key so a still-forming candle (same timestamp, new price) is recomputed.
+        Without an instrument the first bar stands in for the identity.
+        """
+        cols = {c.lower(): i for i, c in enumerate(df.columns)}
+        close_i, vol_i = cols.get('close'), cols.get('volume')
+        last_close = df.iat[-1, close_i] if close_i is not None else None
+        last_vol = df.iat[-1, vol_i] if vol_i is not None else None
+        if instrument is None:
+            first_close = df.iat[0, close_i] if close_i is not None else None
+            instrument = ("anon", df.index[0], first_close)
+        outputs_key = outputs if isinstance(outputs, str) else tuple(outputs)
+        return (instrument, timeframe, len(df), df.index[-1], last_close, last_vol, outputs_key)
+
+    def get(self, key):
+        with self.lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, df):
+        try:
+            nbytes = int(df.memory_usage(index=True, deep=True).sum())
+        except Exception:
+            nbytes = 0
+        with self.lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._entries[key] = (df, nbytes)
+            self._bytes += nbytes
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                _, (_, freed) = self._entries.popitem(last=False)
+                self._bytes -= freed
+                self.evictions += 1
+
+    def get_or_compute(self, df, outputs, compute_fn, instrument=None, timeframe=None):
+        """Returns a copy of the cached frame, computing and storing it on a miss"""
+        try:
+            key = self.make_key(df, outputs, instrument, timeframe)
+        except Exception:
+            return compute_fn(df, outputs)
+        cached = self.get(key)
+        if cached is None:
+            cached = compute_fn(df, outputs)
+            self.put(key, cached)
+        return cached.copy()
+
+    def clear(self):
+        with self.lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self.lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / total * 100, 1) if total else 0.0,
+            }
+
+
+# Singleton
+_indicator_cache = None
+
+def get_indicator_cache():
+    global _indicator_cache
+    if _indicator_cache is None:
+        _indicator_cache = IndicatorCache()
+    return _indicator_cache
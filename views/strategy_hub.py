@@ -83,6 +83,25 @@ def render_strategy_hub(data):
     except:
         st.info("Additional strategy layers loading...")
 
+    st.markdown("---")
+    st.markdown("#### 🌐 Universe Strategy Board")
+    sdf = data.get('sdf')
+    if sdf is None or sdf.empty:
+        st.info("Strategy board fills after the first universe scan.")
+    else:
+        try:
+            from services.strategy_engine import get_strategy_engine
+            from services.market_engine import get_days_to_expiry
+            engine_s = get_strategy_engine()
+            markets = [engine_s.condition_from_scan_row(row) for row in sdf.to_dict('records') if row.get('Price')]
+            board = engine_s.get_batch_recommendations(markets, get_days_to_expiry())
+            if board.empty:
+                st.info("No strategy setups across the universe right now.")
+            else:
+                st.dataframe(board.head(25), use_container_width=True, hide_index=True)
+        except Exception as e:
+            st.info(f"Strategy board unavailable: {e}")
+
     final_cl = "#00e676" if "CALL" in pro_signal else "#ff1744" if "PUT" in pro_signal else "#ffd740"
     st.markdown(f"""
     <div style="background:linear-gradient(135deg,#0d1b2a,#1b2838);border:2px solid {final_cl};border-radius:12px;padding:20px;text-align:center;">